@@ -0,0 +1,34 @@
+"""composite (user_id, date, id) index for keyset-paginated task listing
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # build without locking writes on large PostgreSQL tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_user_date_id",
+            "tasks",
+            ["user_id", "date", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_tasks_user_date_id", table_name="tasks", postgresql_concurrently=True)
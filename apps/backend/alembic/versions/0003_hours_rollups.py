@@ -0,0 +1,47 @@
+"""hours rollup tables for reporting
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+Populate after upgrading with POST /api/reports/rebuild.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hours_user_project_day",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("project", sa.String(), nullable=False),
+        sa.Column("day", sa.String(), nullable=False),
+        sa.Column("billing_status", sa.String(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "project", "day", "billing_status"),
+    )
+    op.create_table(
+        "hours_project_period",
+        sa.Column("project", sa.String(), nullable=False),
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("period_start", sa.String(), nullable=False),
+        sa.Column("billing_status", sa.String(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("project", "period", "period_start", "billing_status"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hours_project_period")
+    op.drop_table("hours_user_project_day")
@@ -0,0 +1,48 @@
+"""edit requests table for the SQL storage backend
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "edit_requests",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("task_id", sa.String(), nullable=False),
+        sa.Column("employee_id", sa.String(), nullable=False),
+        sa.Column("employee_name", sa.String(), nullable=False),
+        sa.Column("date", sa.String(), nullable=False),
+        sa.Column("original_hours", sa.Float(), nullable=True),
+        sa.Column("proposed_hours", sa.Float(), nullable=True),
+        sa.Column("proposed_project", sa.String(), nullable=True),
+        sa.Column("proposed_task_name", sa.String(), nullable=True),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("resolved_by", sa.String(), nullable=True),
+        sa.Column("resolved_at", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+        sa.ForeignKeyConstraint(["employee_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_edit_requests_status_date", "edit_requests", ["status", "date", "id"])
+    op.create_index("ix_edit_requests_employee_status_date", "edit_requests", ["employee_id", "status", "date", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_edit_requests_employee_status_date", table_name="edit_requests")
+    op.drop_index("ix_edit_requests_status_date", table_name="edit_requests")
+    op.drop_table("edit_requests")
@@ -0,0 +1,40 @@
+"""full-text search index over task name and project (PostgreSQL)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# expression index, so PostgreSQL maintains it on every INSERT / UPDATE without a trigger
+# or stored column; must match app.models.task_model.search_document
+SEARCH_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_search ON tasks "
+    "USING gin (to_tsvector('english'::regconfig, (task_name || ' ') || project))"
+)
+
+
+def upgrade() -> None:
+    # other dialects search with a LIKE stand-in (see app.services.search_service)
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute(SEARCH_INDEX)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_search")
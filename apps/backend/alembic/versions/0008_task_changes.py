@@ -0,0 +1,37 @@
+"""task change log for delta sync
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_changes",
+        sa.Column("seq", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("task_id", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    op.create_index("ix_task_changes_user_seq", "task_changes", ["user_id", "seq"])
+    op.create_index("ix_task_changes_changed_at", "task_changes", ["changed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_changes_changed_at", table_name="task_changes")
+    op.drop_index("ix_task_changes_user_seq", table_name="task_changes")
+    op.drop_table("task_changes")
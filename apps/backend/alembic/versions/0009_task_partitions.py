@@ -0,0 +1,130 @@
+"""tasks: real DATE work_date column; monthly range partitions on PostgreSQL
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+On PostgreSQL the tasks table is rebuilt as PARTITION BY RANGE (work_date)
+with one partition per month holding data (plus the next three) and a
+default partition, and every row is copied across. This takes an exclusive
+lock on tasks for the duration: run it in a maintenance window. Rows whose
+date does not start with YYYY-MM-DD take the day they were created. The
+primary key becomes (id, work_date), so edit_requests.task_id loses its
+foreign key. Afterwards `python -m app.cli maintain-partitions` keeps
+upcoming months partitioned.
+
+Other databases (SQLite) gain the work_date column, filled the same way, and
+have tasks and edit_requests rebuilt with the same primary key and without the
+foreign key.
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = "id, user_id, project, task_name, hour, billing_status, date, status, edit_request_pending, created_at"
+WORK_DATE = (
+    "CASE WHEN date ~ '^\\d{4}-\\d{2}-\\d{2}' THEN substr(date, 1, 10)::date "
+    "ELSE coalesce(created_at::date, current_date) END"
+)
+# SQLite spelling of WORK_DATE
+SQLITE_WORK_DATE = (
+    "CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*' THEN substr(date, 1, 10) "
+    "ELSE coalesce(date(created_at), date('now')) END"
+)
+MONTHS_AHEAD = 3
+# names SQLite's unnamed constraints, so batch mode can find them
+NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+TASK_FK = "fk_edit_requests_task_id_tasks"
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_tasks_id", "tasks", ["id"])
+    op.create_index("ix_tasks_user_date_id", "tasks", ["user_id", "date", "id"])
+    op.create_index("ix_tasks_project_date", "tasks", ["project", "date"])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        op.add_column("tasks", sa.Column("work_date", sa.Date(), nullable=True))
+        op.execute(f"UPDATE tasks SET work_date = {SQLITE_WORK_DATE}")
+        with op.batch_alter_table("tasks") as batch:
+            batch.alter_column("work_date", existing_type=sa.Date(), nullable=False)
+            batch.create_primary_key("pk_tasks", ["id", "work_date"])
+        with op.batch_alter_table("edit_requests", naming_convention=NAMING) as batch:
+            batch.drop_constraint(TASK_FK, type_="foreignkey")
+        return
+
+    op.execute("ALTER TABLE edit_requests DROP CONSTRAINT IF EXISTS edit_requests_task_id_fkey")
+    op.execute("ALTER TABLE tasks RENAME TO tasks_unpartitioned")
+    op.execute("ALTER TABLE tasks_unpartitioned RENAME CONSTRAINT tasks_pkey TO tasks_unpartitioned_pkey")
+    op.execute(
+        "CREATE TABLE tasks (LIKE tasks_unpartitioned INCLUDING DEFAULTS, work_date date NOT NULL, "
+        "PRIMARY KEY (id, work_date), FOREIGN KEY (user_id) REFERENCES users (id)) "
+        "PARTITION BY RANGE (work_date)"
+    )
+    low, high = bind.execute(sa.text(f"SELECT min({WORK_DATE}), max({WORK_DATE}) FROM tasks_unpartitioned")).one()
+    month = (low or date.today()).replace(day=1)
+    last = date.today().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    last = max(last, (high or last).replace(day=1))
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE tasks_p{month:%Y_%m} PARTITION OF tasks "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+    op.execute("CREATE TABLE tasks_default PARTITION OF tasks DEFAULT")
+    op.execute(f"INSERT INTO tasks ({COLUMNS}, work_date) SELECT {COLUMNS}, {WORK_DATE} FROM tasks_unpartitioned")
+    # dropping the old table frees its index names for the partitioned ones
+    op.execute("DROP TABLE tasks_unpartitioned")
+    _create_indexes()
+    op.execute(
+        "CREATE INDEX ix_tasks_search ON tasks "
+        "USING gin (to_tsvector('english'::regconfig, (task_name || ' ') || project))"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        with op.batch_alter_table("tasks") as batch:
+            batch.create_primary_key("pk_tasks", ["id"])
+            batch.drop_column("work_date")
+        with op.batch_alter_table("edit_requests") as batch:
+            batch.create_foreign_key(TASK_FK, "tasks", ["task_id"], ["id"])
+        return
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    op.execute("ALTER TABLE tasks_partitioned RENAME CONSTRAINT tasks_pkey TO tasks_partitioned_pkey")
+    op.execute(
+        "CREATE TABLE tasks (LIKE tasks_partitioned INCLUDING DEFAULTS, PRIMARY KEY (id), "
+        "FOREIGN KEY (user_id) REFERENCES users (id))"
+    )
+    op.execute("ALTER TABLE tasks DROP COLUMN work_date")
+    op.execute(f"INSERT INTO tasks ({COLUMNS}) SELECT {COLUMNS} FROM tasks_partitioned")
+    op.execute("DROP TABLE tasks_partitioned CASCADE")
+    _create_indexes()
+    op.execute(
+        "CREATE INDEX ix_tasks_search ON tasks "
+        "USING gin (to_tsvector('english'::regconfig, (task_name || ' ') || project))"
+    )
+    op.execute(
+        "ALTER TABLE edit_requests ADD CONSTRAINT edit_requests_task_id_fkey "
+        "FOREIGN KEY (task_id) REFERENCES tasks (id) NOT VALID"
+    )
@@ -0,0 +1,38 @@
+"""per-user daily hours rollup for utilization / overtime analytics
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+Filled from hours_user_project_day, so no rebuild is needed after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hours_user_day",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("day", sa.String(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    op.execute(
+        "INSERT INTO hours_user_day (user_id, day, hours, task_count) "
+        "SELECT user_id, day, SUM(hours), SUM(task_count) FROM hours_user_project_day GROUP BY user_id, day"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hours_user_day")
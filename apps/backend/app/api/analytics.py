@@ -0,0 +1,48 @@
+# backend/app/api/analytics.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from app.core.auth_middleware import get_current_user
+from app.core.read_routing import get_read_db
+from app.services.analytics_service import utilization, overtime, billable_ratio
+
+router = APIRouter()
+
+# admin-only; ranges are widened to whole Monday-Sunday weeks and default to the last 53 weeks
+
+def _require_admin(current: dict):
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+@router.get("/utilization")
+async def get_utilization(userId: str | None = None, project: str | None = None,
+                          date_from: date | None = None, date_to: date | None = None,
+                          current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # hours per user per week against weekly capacity
+    _require_admin(current)
+    try:
+        return await utilization(db, date_from, date_to, userId, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/overtime")
+async def get_overtime(userId: str | None = None, project: str | None = None,
+                       date_from: date | None = None, date_to: date | None = None,
+                       limit: int = Query(500, ge=1, le=5000),
+                       current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # weeks over capacity and days over the daily limit, most overtime first
+    _require_admin(current)
+    try:
+        return await overtime(db, date_from, date_to, userId, project, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/billable")
+async def get_billable_ratio(project: str | None = None, date_from: date | None = None, date_to: date | None = None,
+                             current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # billable share of hours per project, with the hours per billing status
+    _require_admin(current)
+    try:
+        return await billable_ratio(db, date_from, date_to, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
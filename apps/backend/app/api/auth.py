@@ -1,8 +1,7 @@
 # backend/app/api/auth.py
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.core.config import settings
-from jose import jwt
+from app.core.auth_middleware import create_access_token
 
 router = APIRouter()
 
@@ -21,5 +20,5 @@ async def login(payload: LoginPayload):
     u = DEV_USERS.get(payload.username)
     if not u or payload.password != u["password"]:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = jwt.encode({"sub": u["id"], "role": u["role"]}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    token = create_access_token(u["id"], u["role"])
     return {"token": token, "user": {"id": u["id"], "name": payload.username, "role": u["role"]}}
@@ -0,0 +1,62 @@
+# backend/app/api/events.py
+import json
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.auth_middleware import get_current_user, get_token, verify_token
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.core.events import events, user_channel, ADMIN_CHANNEL
+
+router = APIRouter()
+
+# ticket -> principal; an unused ticket simply expires
+_tickets = make_cache("stream_tickets", settings.EVENTS_MAX_STREAMS, settings.EVENTS_TICKET_SECONDS)
+
+async def _stream_user(authorization: str | None = Header(default=None), ticket: str | None = Query(None)):
+    # browsers' EventSource cannot send headers, so it passes a ticket instead; URLs end up in
+    # access logs, so a ticket is short-lived and single-use and the JWT never goes in the query
+    if authorization or not ticket:
+        return await verify_token(await get_token(authorization))
+    principal = await _tickets.pop(ticket)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Invalid or used stream ticket")
+    return principal
+
+def _frame(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+async def _stream(channels):
+    # subscribed here rather than in the route, so a stream that never starts never leaks a queue
+    sub = events.subscribe(channels)
+    try:
+        # a (re)connected client may have missed notices, so it starts with a full refetch
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n" + _frame({"type": "ready"})
+        while True:
+            event = await sub.next(settings.EVENTS_HEARTBEAT_SECONDS)
+            # comments keep proxies from closing an idle stream
+            yield ": keep-alive\n\n" if event is None else _frame(event)
+    finally:
+        events.unsubscribe(sub)
+
+@router.post("/ticket")
+async def stream_ticket(current=Depends(get_current_user)):
+    # for GET /api/events?ticket=...; redeemable once, within expires_in seconds
+    ticket = secrets.token_urlsafe(32)
+    await _tickets.set(ticket, current)
+    return {"ticket": ticket, "expires_in": settings.EVENTS_TICKET_SECONDS}
+
+@router.get("/")
+async def stream_events(current=Depends(_stream_user)):
+    # text/event-stream of change notices: the user's own tasks and edit requests, plus every
+    # edit request for admins; on a notice (or "resync") refetch with If-None-Match
+    if events.streams >= settings.EVENTS_MAX_STREAMS:
+        raise HTTPException(status_code=503, detail="Too many open event streams", headers={"Retry-After": "30"})
+    channels = [user_channel(current["id"])]
+    if current.get("role") == "admin":
+        channels.append(ADMIN_CHANNEL)
+    return StreamingResponse(
+        _stream(channels),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
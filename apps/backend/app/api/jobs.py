@@ -0,0 +1,72 @@
+# backend/app/api/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
+from app.core.auth_middleware import get_current_user
+from app.core.database import get_async_db
+from app.models.job_model import ArchivePeriodCreate, BillingTransitionCreate, JobOut
+from app.services.job_service import enqueue_job, get_job, list_jobs, cancel_job
+from app.storage.base import UnsupportedBackend
+
+router = APIRouter()
+
+def _require_admin(current: dict):
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+async def _enqueue(db: AsyncSession, job_type: str, params: dict, current: dict) -> dict:
+    try:
+        return await enqueue_job(db, job_type, params, created_by=current["id"])
+    except UnsupportedBackend as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/billing_transition", status_code=202, response_model=JobOut)
+async def start_billing_transition(
+    payload: BillingTransitionCreate,
+    current=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # month-end billing status change; runs in the background, poll GET /jobs/{id} for progress
+    _require_admin(current)
+    return await _enqueue(db, "billing_transition", payload.model_dump(mode="json"), current)
+
+@router.post("/archive_period", status_code=202, response_model=JobOut)
+async def start_archive_period(
+    payload: ArchivePeriodCreate,
+    current=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # move a closed month's tasks to the archive (GET /api/tasks/archive/{month}); the job fails
+    # with the reason if the month has not ended or still has unbilled tasks
+    _require_admin(current)
+    return await _enqueue(db, "archive_period", payload.model_dump(mode="json"), current)
+
+@router.get("/", response_model=List[JobOut])
+async def get_jobs(
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"] | None = None,
+    type: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    current=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    _require_admin(current)
+    return await list_jobs(db, status=status, job_type=type, limit=limit)
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_status(job_id: str, current=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    _require_admin(current)
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{job_id}/cancel", response_model=JobOut)
+async def cancel_job_route(job_id: str, current=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    # queued jobs are cancelled at once; running ones stop after the chunk in progress
+    _require_admin(current)
+    job = await cancel_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in ("succeeded", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return job
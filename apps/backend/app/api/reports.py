@@ -0,0 +1,53 @@
+# backend/app/api/reports.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
+from datetime import date
+from app.core.auth_middleware import get_current_user
+from app.core.database import get_async_db
+from app.core.read_routing import get_read_db
+from app.services.analytics_service import analytics_cache
+from app.services.report_service import daily_hours, user_totals, project_hours, rebuild_rollups
+from app.storage.base import UnsupportedBackend
+
+router = APIRouter()
+
+def _require_admin(current: dict):
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+@router.get("/daily")
+async def get_daily_hours(userId: str | None = None, project: str | None = None,
+                          date_from: date | None = None, date_to: date | None = None,
+                          current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # employees may only see their own days; admins may filter by any user or none
+    if current.get("role") != "admin":
+        if userId and userId != current["id"]:
+            raise HTTPException(status_code=403, detail="Admin only")
+        userId = current["id"]
+    return await daily_hours(db, userId, project, date_from, date_to)
+
+@router.get("/users")
+async def get_user_totals(project: str | None = None, date_from: date | None = None, date_to: date | None = None,
+                          current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    _require_admin(current)
+    return await user_totals(db, project, date_from, date_to)
+
+@router.get("/projects")
+async def get_project_hours(period: Literal["week", "month"] = "month", project: str | None = None,
+                            date_from: date | None = None, date_to: date | None = None,
+                            current=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    _require_admin(current)
+    return await project_hours(db, period, project, date_from, date_to)
+
+@router.post("/rebuild")
+async def rebuild(current=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    # full recompute from the tasks table and the archived months, for backfills or after out-of-band edits
+    _require_admin(current)
+    try:
+        count = await rebuild_rollups(db)
+    except UnsupportedBackend as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # out-of-band edits never reached the change log that analytics results are keyed by
+    await analytics_cache.clear()
+    return {"message": "Rollups rebuilt", "tasks": count}
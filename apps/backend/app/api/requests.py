@@ -1,102 +1,113 @@
 # backend/app/api/requests.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Literal
+from datetime import date
 from app.core.auth_middleware import get_current_user
-from app.models.request_model import EditRequestCreate
-from app.core.firestore_client import users_root
-from uuid import uuid4
-from datetime import datetime
+from app.core.etag import not_modified
+from app.core.responses import fast_response
+from app.core.versions import REQUESTS_SCOPE
+from app.models.request_model import EditRequestCreate, BulkResolvePayload
+from app.services.request_service import (
+    resolve_requests, submit_edit_request, list_requests, pending_count, RequestConflict,
+    NOT_FOUND, NOT_PENDING, TASK_NOT_FOUND,
+)
+from app.storage.base import Storage, TooManyWrites, get_storage, get_read_storage
 
 router = APIRouter()
 
+_SKIP_ERRORS = {
+    NOT_FOUND: (404, "Request not found"),
+    NOT_PENDING: (400, "Request not pending"),
+    TASK_NOT_FOUND: (404, "Task not found"),
+}
+
+def _require_admin(current: dict):
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+async def _resolve(request_ids, decision: str, current: dict, storage: Storage) -> dict:
+    # a backend that commits one atomic batch per call takes at most this many requests at once
+    cap = storage.max_requests_per_call
+    if cap is not None and len(set(request_ids)) > cap:
+        raise HTTPException(status_code=413, detail=f"At most {cap} requests per call with STORAGE_BACKEND={storage.backend}")
+    try:
+        return await resolve_requests(request_ids, decision, current["id"], storage)
+    except RequestConflict:
+        raise HTTPException(status_code=409, detail="Request was modified concurrently, retry")
+    except TooManyWrites as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+async def _resolve_one(request_id: str, decision: str, current: dict, storage: Storage):
+    outcome = await _resolve([request_id], decision, current, storage)
+    reason = outcome["skipped"].get(request_id)
+    if reason:
+        status_code, detail = _SKIP_ERRORS[reason]
+        raise HTTPException(status_code=status_code, detail=detail)
+
 @router.post("/{task_id}/request_edit")
-async def request_edit(task_id: str, payload: EditRequestCreate, current=Depends(get_current_user)):
+async def request_edit(task_id: str, payload: EditRequestCreate, current=Depends(get_current_user),
+                       storage: Storage = Depends(get_storage)):
     # employee requests edit for own task
-    user_id = current["id"]
-    # find task doc
-    task_doc_ref = users_root().document(user_id).collection("tasks").document(task_id)
-    task_doc = task_doc_ref.get()
-    if not task_doc.exists:
+    req_payload = await submit_edit_request(current["id"], task_id, payload, storage)
+    if req_payload is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    task_data = task_doc.to_dict()
-    # create an edit request under requests collection at top-level
-    # structure: artifacts/{appId}/requests/{requestId}
-    app_id = None
-    root = users_root(app_id).parent  # artifacts/{appId}
-    requests_col = root.collection("requests")
-    req_id = str(uuid4())
-    req_payload = {
-        "id": req_id,
-        "taskId": task_id,
-        "employeeId": user_id,
-        "employeeName": task_data.get("userId", user_id),
-        "date": datetime.utcnow().isoformat(),
-        "originalHours": task_data.get("hour"),
-        "proposedHours": payload.proposedHour,
-        "proposedProject": payload.proposedProject,
-        "proposedTaskName": payload.proposedTaskName,
-        "reason": getattr(payload, "reason", None),
-        "status": "pending"
-    }
-    requests_col.document(req_id).set(req_payload)
-    # mark task as having pending edit
-    task_doc_ref.update({"edit_request_pending": True})
     return {"message": "Edit request submitted", "request": req_payload}
 
 @router.get("/")
-async def get_all_requests(current=Depends(get_current_user)):
-    if current.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin only")
-    root = users_root().parent
-    docs = root.collection("requests").stream()
-    out = []
-    for d in docs:
-        data = d.to_dict()
-        data["id"] = d.id
-        out.append(data)
-    return out
+async def get_all_requests(
+    request: Request,
+    response: Response,
+    status: Literal["pending", "approved", "rejected"] | None = None,
+    employeeId: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    current=Depends(get_current_user),
+    storage: Storage = Depends(get_read_storage),
+):
+    # newest first; pass back next_cursor as ?cursor= to get the following page
+    _require_admin(current)
+    unchanged = await not_modified(request, response, [REQUESTS_SCOPE])
+    if unchanged:
+        return unchanged
+    try:
+        page = await list_requests(
+            storage, limit, cursor, status=status, employee_id=employeeId, date_from=date_from, date_to=date_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fast_response(page, response)
+
+@router.get("/pending_count")
+async def get_pending_count(request: Request, response: Response, employeeId: str | None = None,
+                            current=Depends(get_current_user), storage: Storage = Depends(get_read_storage)):
+    _require_admin(current)
+    unchanged = await not_modified(request, response, [REQUESTS_SCOPE])
+    if unchanged:
+        return unchanged
+    return {"pending": await pending_count(storage, employeeId)}
+
+@router.post("/bulk_approve")
+async def bulk_approve(payload: BulkResolvePayload, current=Depends(get_current_user), storage: Storage = Depends(get_storage)):
+    _require_admin(current)
+    outcome = await _resolve(payload.requestIds, "approved", current, storage)
+    return {"message": f"{len(outcome['resolved'])} requests approved", **outcome}
+
+@router.post("/bulk_reject")
+async def bulk_reject(payload: BulkResolvePayload, current=Depends(get_current_user), storage: Storage = Depends(get_storage)):
+    _require_admin(current)
+    outcome = await _resolve(payload.requestIds, "rejected", current, storage)
+    return {"message": f"{len(outcome['resolved'])} requests rejected", **outcome}
 
 @router.post("/{request_id}/approve")
-async def approve_request(request_id: str, current=Depends(get_current_user)):
-    if current.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin only")
-    root = users_root().parent
-    req_ref = root.collection("requests").document(request_id)
-    req_doc = req_ref.get()
-    if not req_doc.exists:
-        raise HTTPException(status_code=404, detail="Request not found")
-    req_data = req_doc.to_dict()
-    if req_data.get("status") != "pending":
-        raise HTTPException(status_code=400, detail="Request not pending")
-    # update the task document with proposed values
-    task_ref = users_root().document(req_data["employeeId"]).collection("tasks").document(req_data["taskId"])
-    update_payload = {}
-    if req_data.get("proposedHours") is not None:
-        update_payload["hour"] = req_data["proposedHours"]
-    if req_data.get("proposedProject") is not None:
-        update_payload["project"] = req_data["proposedProject"]
-    if req_data.get("proposedTaskName") is not None:
-        update_payload["taskName"] = req_data["proposedTaskName"]
-    update_payload["status"] = "approved"
-    update_payload["edit_request_pending"] = False
-    task_ref.update(update_payload)
-    # update request
-    req_ref.update({"status": "approved", "resolvedBy": current["id"], "resolvedAt": datetime.utcnow().isoformat()})
+async def approve_request(request_id: str, current=Depends(get_current_user), storage: Storage = Depends(get_storage)):
+    _require_admin(current)
+    await _resolve_one(request_id, "approved", current, storage)
     return {"message": "Request approved"}
 
 @router.post("/{request_id}/reject")
-async def reject_request(request_id: str, current=Depends(get_current_user)):
-    if current.get("role") != "admin":
-        raise HTTPException(status_code=403, detail="Admin only")
-    root = users_root().parent
-    req_ref = root.collection("requests").document(request_id)
-    req_doc = req_ref.get()
-    if not req_doc.exists:
-        raise HTTPException(status_code=404, detail="Request not found")
-    req_data = req_doc.to_dict()
-    if req_data.get("status") != "pending":
-        raise HTTPException(status_code=400, detail="Request not pending")
-    # unmark the task pending flag
-    task_ref = users_root().document(req_data["employeeId"]).collection("tasks").document(req_data["taskId"])
-    task_ref.update({"edit_request_pending": False})
-    req_ref.update({"status": "rejected", "resolvedBy": current["id"], "resolvedAt": datetime.utcnow().isoformat()})
+async def reject_request(request_id: str, current=Depends(get_current_user), storage: Storage = Depends(get_storage)):
+    _require_admin(current)
+    await _resolve_one(request_id, "rejected", current, storage)
     return {"message": "Request rejected"}
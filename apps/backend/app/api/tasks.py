@@ -1,23 +1,198 @@
 # backend/app/api/tasks.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.auth_middleware import get_current_user
-from app.models.task_model import TaskCreate
+from app.core.config import settings
+from app.core.etag import not_modified
+from app.core.read_routing import get_read_db
+from app.core.responses import fast_response
+from app.core.versions import task_scope
+from app.models.task_model import TaskChanges, TaskCreate, TaskPage, TaskSearchResult, TasksCreated
 from app.services.task_service import add_tasks, fetch_tasks
+from app.services.idempotency_service import IdempotencyMismatch, MAX_KEY_LENGTH
+from app.services.export_service import stream_tasks
+from app.services.archive_service import archived_months, is_archived, parse_month, stream_archive
+from app.storage.archive_store import ArchiveNotConfigured
+from app.services.search_service import search_tasks
+from app.services.sync_service import task_changes, CursorExpired
+from app.storage.base import Storage, TooManyWrites, UnsupportedBackend, get_storage, get_read_storage, require_sql
 
 router = APIRouter()
 
-@router.post("/")
-async def create_tasks(payload: List[TaskCreate], current=Depends(get_current_user)):
+@router.post("/", response_model=TasksCreated)
+async def create_tasks(
+    payload: List[TaskCreate],
+    response: Response,
+    on_duplicate: Literal["insert", "skip", "update"] | None = None,
+    idempotency_key: str | None = Header(default=None, max_length=MAX_KEY_LENGTH),
+    current=Depends(get_current_user),
+    storage: Storage = Depends(get_storage),
+):
     # Employee or admin may create tasks (admins might create on behalf of user later)
+    # Clients that retry should send an Idempotency-Key; on_duplicate=skip|update dedupes on
+    # (date, project, taskName) for clients that cannot, and for backfill imports
+    max_rows = settings.TASK_MAX_ROWS_PER_REQUEST
+    if storage.max_tasks_per_call is not None:
+        # Firestore: one atomic batch per submission, so its SQL side can commit with it
+        max_rows = min(max_rows, storage.max_tasks_per_call)
+    if len(payload) > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} tasks per request")
     tasks_payload = [t.dict() for t in payload]
-    created = add_tasks(current["id"], tasks_payload)
-    return {"message": "Tasks saved", "created": created}
+    try:
+        body, replayed = await add_tasks(current["id"], tasks_payload, storage,
+                                         on_duplicate=on_duplicate or settings.TASK_ON_DUPLICATE,
+                                         idempotency_key=idempotency_key)
+    except IdempotencyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    except TooManyWrites as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return fast_response(body, response)
 
-@router.get("/")
-async def get_tasks(userId: str | None = None, current=Depends(get_current_user)):
+@router.get("/", response_model=TaskPage)
+async def get_tasks(
+    request: Request,
+    response: Response,
+    userId: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    project: str | None = None,
+    status: str | None = None,
+    billing_status: str | None = None,
+    current=Depends(get_current_user),
+    storage: Storage = Depends(get_read_storage),
+):
+    # keyset-paginated; pass back next_cursor as ?cursor= to get the following page
+    if userId and current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    unchanged = await not_modified(request, response, [task_scope(userId or current["id"])])
+    if unchanged:
+        return unchanged
     try:
-        tasks = fetch_tasks(current, userId)
+        page = await fetch_tasks(
+            current, storage, userId, limit=limit, cursor=cursor,
+            date_from=date_from, date_to=date_to, project=project,
+            status=status, billing_status=billing_status,
+        )
     except PermissionError:
         raise HTTPException(status_code=403, detail="Admin only")
-    return tasks
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fast_response(page, response)
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    response: Response,
+    since: int | None = Query(None, ge=0),
+    userId: str | None = None,
+    limit: int = Query(500, ge=1, le=5000),
+    current=Depends(get_current_user),
+    storage: Storage = Depends(get_storage),
+):
+    # delta sync: tasks written after cursor `since`, plus the cursor to send next time.
+    # Without since, only the starting cursor: fetch it before the initial full load via GET /.
+    # Always on the primary: a lagging replica could let the cursor pass changes it has not replayed
+    if userId and current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    try:
+        changes = await task_changes(storage, userId or current["id"], since, limit=limit)
+    except CursorExpired:
+        raise HTTPException(status_code=410, detail="Cursor expired, reload all tasks")
+    return fast_response(changes, response)
+
+@router.get("/export")
+async def export_tasks(
+    format: Literal["csv", "ndjson"] = "csv",
+    userId: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    project: str | None = None,
+    current=Depends(get_current_user),
+):
+    # admin-only bulk export for payroll/billing; streamed, never materialized in memory
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    # checked before the response starts: the stream itself can no longer change the status
+    try:
+        require_sql("Task exports")
+    except UnsupportedBackend as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_tasks(format, userId, date_from=date_from, date_to=date_to, project=project),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+@router.get("/search", response_model=TaskSearchResult)
+async def search(
+    response: Response,
+    q: str | None = Query(None, max_length=200),
+    userId: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    facets: bool = True,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    project: str | None = None,
+    status: str | None = None,
+    billing_status: str | None = None,
+    current=Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # admin-only; q matches task name and project ("quoted phrase", -excluded, or on PostgreSQL),
+    # results newest first with per project / user / month counts of all matches
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    try:
+        result = await search_tasks(
+            db, q, userId, limit=limit, cursor=cursor, facets=facets,
+            date_from=date_from, date_to=date_to, project=project,
+            status=status, billing_status=billing_status,
+        )
+    except UnsupportedBackend as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fast_response(result, response)
+
+@router.get("/archive")
+async def list_archive(current=Depends(get_current_user)):
+    # months moved out of the tasks table by the archive_period job
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return await archived_months()
+
+@router.get("/archive/{month}")
+async def export_archive(
+    month: str,
+    format: Literal["csv", "ndjson"] = "csv",
+    userId: str | None = None,
+    project: str | None = None,
+    current=Depends(get_current_user),
+):
+    # admin-only; one archived month in the export format, streamed from its compressed file
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    try:
+        start = parse_month(month)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+    try:
+        archived = await is_archived(start)
+    except ArchiveNotConfigured as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not archived:
+        raise HTTPException(status_code=404, detail="Month not archived")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_archive(start, format, userId, project),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks-{month}.{format}"'},
+    )
@@ -1,35 +1,47 @@
 # backend/app/api/users.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from app.core.auth_middleware import get_current_user
+from app.core.etag import not_modified
+from app.core.responses import fast_response
+from app.core.versions import USERS_SCOPE
 from app.models.user_model import UserCreate, UserPublic
-from app.crud.user_crud import create_user_doc, list_users, get_user
+from app.storage.base import Storage, get_storage, get_read_storage
 
 router = APIRouter()
 
-@router.post("/")
-async def create_user(payload: UserCreate, current=Depends(get_current_user)):
+@router.post("/", response_model=UserPublic)
+async def create_user(payload: UserCreate, current=Depends(get_current_user), storage: Storage = Depends(get_storage)):
     if current.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Only admin may create users")
-    created = create_user_doc({
+    created = await storage.users.create({
         "userId": payload.userId,
         "firstName": payload.firstName,
         "lastName": payload.lastName,
         "role": payload.role
     })
-    return created
+    return fast_response(created)
 
-@router.get("/")
-async def get_all_users(current=Depends(get_current_user)):
+@router.get("/", response_model=List[UserPublic])
+async def get_all_users(request: Request, response: Response, current=Depends(get_current_user),
+                        storage: Storage = Depends(get_read_storage)):
     if current.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
-    return list_users()
+    unchanged = await not_modified(request, response, [USERS_SCOPE])
+    if unchanged:
+        return unchanged
+    return fast_response(await storage.users.list(), response)
 
-@router.get("/{id}")
-async def get_user_profile(id: str, current=Depends(get_current_user)):
+@router.get("/{id}", response_model=UserPublic)
+async def get_user_profile(id: str, request: Request, response: Response, current=Depends(get_current_user),
+                           storage: Storage = Depends(get_read_storage)):
     # allow admins or the user themselves to view
     if current.get("role") != "admin" and current.get("id") != id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    u = get_user(id)
+    unchanged = await not_modified(request, response, [USERS_SCOPE])
+    if unchanged:
+        return unchanged
+    u = await storage.users.get(id)
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
-    return u
+    return fast_response(u, response)
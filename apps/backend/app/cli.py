@@ -0,0 +1,46 @@
+# backend/app/cli.py
+"""
+Maintenance commands, run from apps/backend:
+
+    python -m app.cli create-schema   # create missing tables (scratch / dev databases)
+    python -m app.cli warm-up         # check the DB (and Firestore) connections
+    python -m app.cli maintain-partitions   # add upcoming monthly task partitions (PostgreSQL; daily cron)
+
+Deployments apply schema changes with `alembic upgrade head` instead.
+"""
+import argparse
+import asyncio
+import time
+
+def create_schema():
+    from app.core.database import Base, engine
+    # every model module must be imported so its table is registered
+    from app.models import task_model, user_model, report_model, job_model, idempotency_model, request_model, change_model  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+    print(f"created missing tables on {engine.url.render_as_string(hide_password=True)}")
+
+def warm_up():
+    from app.main import warm_up as warm_up_app
+    t0 = time.perf_counter()
+    asyncio.run(warm_up_app())
+    print(f"storage reachable ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+
+def maintain_partitions():
+    from app.core.database import AsyncSessionLocal
+    from app.services.partition_service import ensure_partitions
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await ensure_partitions(db)
+    created = asyncio.run(run())
+    print(f"created partitions: {', '.join(created)}" if created else "partitions up to date")
+
+COMMANDS = {"create-schema": create_schema, "warm-up": warm_up, "maintain-partitions": maintain_partitions}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    COMMANDS[parser.parse_args().command]()
+
+if __name__ == "__main__":
+    main()
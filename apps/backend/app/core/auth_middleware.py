@@ -1,8 +1,78 @@
 # backend/app/core/auth_middleware.py
 from fastapi import Depends, HTTPException, Header
 from jose import jwt, JWTError
+from app.core.cache import TTLCache
 from app.core.config import settings
-from typing import Dict
+from app.core.jwt_keys import keys, KeysUnavailable
+from app.core.metrics import timed
+from typing import Callable, Dict, List
+import time
+
+# verified token -> principal; entries never outlive the token's exp
+_token_cache = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_CACHE_TTL)
+# locally revoked tokens, remembered until they would have expired anyway
+_revoked = TTLCache(maxsize=100_000, ttl=settings.JWT_EXPIRATION_MINUTES * 60 or 24 * 3600)
+# revocation hooks: fn(token, principal) -> True when the token must be rejected
+_revocation_checks: List[Callable[[str, Dict], bool]] = []
+
+def register_revocation_check(check: Callable[[str, Dict], bool]):
+    """Add a hook consulted on every request, cached or not (e.g. a denylist lookup)"""
+    _revocation_checks.append(check)
+
+def revoke_token(token: str, ttl: float | None = None):
+    entry = _token_cache.get(token)
+    _token_cache.delete(token)
+    if ttl is None and entry and entry["exp"] is not None:
+        ttl = entry["exp"] - time.time()
+    _revoked.set(token, True, ttl=ttl)
+
+def revoke_subject(user_id: str) -> int:
+    """Evict every cached token of a user so the next request re-verifies it"""
+    return _token_cache.delete_where(lambda _, entry: entry["id"] == user_id)
+
+def clear_token_cache():
+    _token_cache.clear()
+
+def token_cache_stats() -> Dict[str, int]:
+    return _token_cache.stats()
+
+def create_access_token(user_id: str, role: str) -> str:
+    claims = {"sub": user_id, "role": role}
+    if settings.JWT_EXPIRATION_MINUTES > 0:
+        claims["exp"] = int(time.time()) + settings.JWT_EXPIRATION_MINUTES * 60
+    return jwt.encode(claims, keys.signing_key(), algorithm=settings.JWT_ALGORITHM)
+
+async def _decode(token: str) -> Dict:
+    try:
+        payload = jwt.decode(token, await keys.verification_key(token), algorithms=[settings.JWT_ALGORITHM])
+    except (JWTError, KeyError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except KeysUnavailable:
+        raise HTTPException(status_code=503, detail="Token signing keys unavailable")
+    user_id = payload.get("sub")
+    role = payload.get("role")
+    if not user_id or not role:
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+    return {"id": user_id, "role": role, "exp": payload.get("exp")}
+
+async def verify_token(token: str) -> Dict:
+    """Verified principal for a token, served from cache while the token is valid"""
+    if _revoked.get(token):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    entry = _token_cache.get(token)
+    now = time.time()
+    if entry is None or (entry["exp"] is not None and entry["exp"] <= now):
+        entry = await _decode(token)
+        ttl = settings.JWT_CACHE_TTL
+        if entry["exp"] is not None:
+            ttl = min(ttl, entry["exp"] - now)
+        _token_cache.set(token, entry, ttl=ttl)
+    principal = {"id": entry["id"], "role": entry["role"]}
+    for check in _revocation_checks:
+        if check(token, principal):
+            revoke_token(token)
+            raise HTTPException(status_code=401, detail="Token revoked")
+    return principal
 
 async def get_token(authorization: str | None = Header(default=None)):
     if not authorization:
@@ -13,12 +83,5 @@ async def get_token(authorization: str | None = Header(default=None)):
     return parts[1]
 
 async def get_current_user(token: str = Depends(get_token)) -> Dict:
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        role = payload.get("role")
-        if not user_id or not role:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
-        return {"id": user_id, "role": role}
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    with timed("auth"):
+        return await verify_token(token)
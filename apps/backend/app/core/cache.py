@@ -0,0 +1,248 @@
+# backend/app/core/cache.py
+"""
+Caching primitives: an in-process TTL/LRU cache, and async read-through
+caches over it or over Redis (CACHE_BACKEND=memory|redis)
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.core.config import settings
+
+# imported by load_redis() when a Redis backend is built, so the memory backend boots without them
+redis = None
+aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+def load_redis():
+    """(redis, redis.asyncio), imported on first use"""
+    global redis, aioredis
+    if aioredis is None:
+        try:
+            import redis as redis_module
+            import redis.asyncio as aioredis_module
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        redis, aioredis = redis_module, aioredis_module
+    return redis, aioredis
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a live entry"""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING or entry[1] <= time.monotonic():
+            return default
+        return entry[0]
+
+    def delete_where(self, predicate) -> int:
+        """Drop every entry whose (key, value) matches predicate"""
+        with self._lock:
+            doomed = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class MemoryCache:
+    """
+    Async read-through cache over a per-process TTLCache.
+    Cached values are shared, so callers must treat them as read-only.
+    """
+    backend = "memory"
+
+    def __init__(self, namespace: str, maxsize: int, ttl: float):
+        self.namespace = namespace
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return self._cache.get(key, default)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._cache.set(key, value, ttl)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """Cached value for key, else loader()'s result (cached unless None)"""
+        value = await self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            if value is not None:
+                await self.set(key, value, ttl)
+        return value
+
+    async def delete(self, *keys: str):
+        self.invalidate(*keys)
+
+    async def pop(self, key: str, default: Any = None) -> Any:
+        """Take an entry out atomically: of concurrent callers at most one gets it"""
+        return self._cache.pop(key, default)
+
+    def invalidate(self, *keys: str):
+        """Synchronous delete, for code that does not run on the event loop"""
+        for key in keys:
+            self._cache.delete(key)
+
+    async def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "namespace": self.namespace, **self._cache.stats()}
+
+class RedisCache(MemoryCache):
+    """
+    Read-through cache shared by every worker through Redis; values are JSON.
+    Redis errors are logged and treated as misses so reads fall back to the database.
+    """
+    backend = "redis"
+
+    def __init__(self, namespace: str, url: str, ttl: float):
+        load_redis()
+        self.namespace = namespace
+        self.ttl = ttl
+        self._url = url
+        self._client = aioredis.from_url(url)
+        self._sync_client = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{settings.APP_ID}:{self.namespace}:{key}"
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = await self._client.get(self._key(key))
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning("redis cache get failed: %s", e)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        try:
+            await self._client.set(self._key(key), json.dumps(value, default=str), px=int(ttl * 1000))
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning("redis cache set failed: %s", e)
+
+    async def pop(self, key: str, default: Any = None) -> Any:
+        try:
+            # GET and DEL in one MULTI, so no other worker can read the entry in between
+            async with self._client.pipeline(transaction=True) as pipe:
+                raw, _ = await pipe.get(self._key(key)).delete(self._key(key)).execute()
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning("redis cache pop failed: %s", e)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await self._client.delete(*(self._key(k) for k in keys))
+        except (redis.RedisError, OSError) as e:
+            # a failed invalidation leaves stale entries until their TTL runs out
+            self.errors += 1
+            logger.error("redis cache invalidation failed: %s", e)
+
+    def invalidate(self, *keys: str):
+        if not keys:
+            return
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self._url)
+        try:
+            self._sync_client.delete(*(self._key(k) for k in keys))
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.error("redis cache invalidation failed: %s", e)
+
+    async def clear(self):
+        try:
+            async for key in self._client.scan_iter(match=self._key("*")):
+                await self._client.delete(key)
+        except (redis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.error("redis cache clear failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "namespace": self.namespace, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+def make_cache(namespace: str, maxsize: int, ttl: float) -> MemoryCache:
+    """Read-through cache on the configured CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(namespace, settings.REDIS_URL, ttl)
+    return MemoryCache(namespace, maxsize, ttl)
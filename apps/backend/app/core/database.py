@@ -1,12 +1,50 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, describe_pool
+from app.core.metrics import instrument_engine
+
+def to_async_url(url: str) -> str:
+    """Swap a sync driver URL for its asyncio driver (asyncpg / aiosqlite)"""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Engine/pool keyword arguments for the configured production profile"""
+    options = {"echo": settings.DB_ECHO}
+    dialect = url.split("://", 1)[0].split("+")[0]
+    if dialect == "sqlite":
+        # sqlite keeps SQLAlchemy's default pool for file / memory databases
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if dialect in ("postgresql", "postgres") and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
 
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=True,  # Set to False in production
-    future=True
+    future=True,
+    **engine_options(settings.DATABASE_URL)
 )
 
 # Session factory
@@ -17,6 +55,43 @@ SessionLocal = sessionmaker(
     future=True
 )
 
+# Async engine used by the routers so DB I/O does not block the event loop
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+
+# per-request query counts / time for the timing middleware and /metrics
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
+# Read replicas: async engines only, for the GET routes that read through app.core.read_routing
+REPLICA_URLS = [to_async_url(u.strip()) for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip()]
+replica_engines = [create_async_engine(url, **engine_options(url, is_async=True)) for url in REPLICA_URLS]
+for _i, _replica in enumerate(replica_engines):
+    instrument_engine(_replica.sync_engine, f"replica{_i}")
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Server-side UTC timestamp; one value per statement (per transaction on PostgreSQL)
+class utcnow(FunctionElement):
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 # Base class for models
 Base = declarative_base()
 
@@ -27,3 +102,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency for FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status() -> dict:
+    """Occupancy and checkout-wait metrics for the engines' pools"""
+    status = {
+        "sync": describe_pool(engine.pool),
+        "async": describe_pool(async_engine.sync_engine.pool),
+    }
+    for i, replica in enumerate(replica_engines):
+        status[f"replica{i}"] = describe_pool(replica.sync_engine.pool)
+    return status
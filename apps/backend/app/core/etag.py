@@ -0,0 +1,63 @@
+# backend/app/core/etag.py
+"""
+Conditional GET: strong ETags and Last-Modified derived from the version
+counters in app.core.versions, checked before the handler queries anything.
+"""
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from app.core.read_routing import read_your_writes_seconds
+from app.core.versions import versions
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 requires for If-None-Match
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+def _modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return True
+    return int(last_modified) > since
+
+async def not_modified(request: Request, response: Response, scopes: Iterable[str]) -> Optional[Response]:
+    """
+    A 304 response when the client's If-None-Match / If-Modified-Since still hold for
+    the given scopes; otherwise None, with ETag / Last-Modified set on `response`.
+    The ETag also covers the URL, so each page and filter combination has its own.
+    """
+    current = await versions.get(scopes)
+    if current is None:
+        return None
+    state = "|".join(f"{s}={v}" for s, (v, _) in sorted(current.items()))
+    digest = hashlib.sha256(f"{versions.epoch}|{state}|{request.url.path}?{request.url.query}".encode())
+    last_modified = max(lm for _, lm in current.values())
+    if getattr(request.state, "read_replica", False) and time.time() - last_modified < read_your_writes_seconds():
+        # the replica may not have the write behind this version yet: answer without validators
+        return None
+    headers = {
+        "ETag": f'"{digest.hexdigest()[:32]}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    # HTTP dates have one-second resolution: only advertise a Last-Modified whose second is over,
+    # so a second write in the same second can never be mistaken for "not modified"
+    if time.time() >= int(last_modified) + 1:
+        headers["Last-Modified"] = formatdate(int(last_modified), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        unchanged = _etag_matches(if_none_match, headers["ETag"])
+    elif if_modified_since is not None:
+        unchanged = not _modified_since(if_modified_since, last_modified)
+    else:
+        unchanged = False
+    if unchanged:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
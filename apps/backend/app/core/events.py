@@ -0,0 +1,173 @@
+# backend/app/core/events.py
+"""
+Pub/sub hub behind the server-sent events stream (GET /api/events).
+
+Writers publish small change notices ({"type": ..., ids}) to a channel once
+their change has committed: "user:{id}" reaches that user's streams,
+"admin" every admin's. Clients react by refetching with a conditional GET,
+so a notice never has to carry the data itself.
+
+Each open stream has a bounded queue. A subscriber that falls
+EVENTS_QUEUE_SIZE notices behind has its backlog replaced by a single
+"resync" notice, so a slow client never holds memory or slows publishers.
+With CACHE_BACKEND=memory notices only reach streams held by this process;
+CACHE_BACKEND=redis relays them through one Redis pub/sub channel so every
+worker (and a separate job worker process) reaches every stream.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+from app.core.cache import load_redis
+from app.core.config import settings
+from app.core.metrics import registry, Counter
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CHANNEL = "admin"
+RESYNC = {"type": "resync"}
+
+# seconds to wait before resubscribing after the Redis connection drops
+RELAY_RETRY_SECONDS = 1.0
+
+events_published = registry.register(Counter(
+    "events_published_total", "Change notices published", ("type",)))
+events_resyncs = registry.register(Counter(
+    "events_resyncs_total", "Streams whose backlog overflowed or whose relay reconnected, told to resync"))
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+class Subscription:
+    """One open stream: its channels and a bounded queue of pending notices"""
+    def __init__(self, channels: Iterable[str], maxsize: int):
+        self.channels = frozenset(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def offer(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self):
+        # what was queued is stale now anyway: the client refetches everything it shows
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC)
+        events_resyncs.inc()
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """The next notice, or None after `timeout` seconds without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class MemoryEvents:
+    """Delivers notices to the streams of this process"""
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.streams = 0
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        sub = Subscription(channels, settings.EVENTS_QUEUE_SIZE)
+        for channel in sub.channels:
+            self._subscribers[channel].add(sub)
+        self.streams += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for channel in sub.channels:
+            subs = self._subscribers.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[channel]
+        self.streams -= 1
+
+    def deliver(self, channel: str, event: dict):
+        for sub in list(self._subscribers.get(channel, ())):
+            sub.offer(event)
+
+    def resync_all(self):
+        for sub in {s for subs in self._subscribers.values() for s in subs}:
+            sub.resync()
+
+    async def publish(self, channel: str, event: dict):
+        events_published.inc(event["type"])
+        self.deliver(channel, event)
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"streams": self.streams, "channels": len(self._subscribers)}
+
+class RedisEvents(MemoryEvents):
+    """Publishes through a Redis channel; a relay task per process delivers what arrives on it"""
+    def __init__(self, url: str):
+        super().__init__()
+        self._redis, aioredis = load_redis()
+        self._key = f"{settings.APP_ID}:events"
+        self._client = aioredis.from_url(url)
+        self._relay: Optional[asyncio.Task] = None
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        # the relay starts with the first stream, so processes that only publish never listen
+        if self._relay is None or self._relay.done():
+            self._relay = asyncio.create_task(self._run_relay())
+        return super().subscribe(channels)
+
+    async def publish(self, channel: str, event: dict):
+        events_published.inc(event["type"])
+        try:
+            await self._client.publish(self._key, json.dumps({"channel": channel, "event": event}))
+        except (self._redis.RedisError, OSError) as e:
+            # other workers miss this one; local streams still get it
+            logger.warning("event relay publish failed: %s", e)
+            self.deliver(channel, event)
+
+    async def _run_relay(self):
+        connected_before = False
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self._key)
+                    if connected_before:
+                        # notices published while we were away are lost
+                        self.resync_all()
+                    connected_before = True
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        self.deliver(payload["channel"], payload["event"])
+            except asyncio.CancelledError:
+                raise
+            except (self._redis.RedisError, OSError, ValueError) as e:
+                logger.warning("event relay disconnected, retrying: %s", e)
+                await asyncio.sleep(RELAY_RETRY_SECONDS)
+
+    async def close(self):
+        if self._relay is not None:
+            self._relay.cancel()
+            await asyncio.gather(self._relay, return_exceptions=True)
+            self._relay = None
+
+def _make_events():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisEvents(settings.REDIS_URL)
+    return MemoryEvents()
+
+events = _make_events()
+
+async def notify(channels: Iterable[str], event_type: str, **data):
+    """Publish one notice to each channel; never fails the caller's (already committed) write"""
+    event = {"type": event_type, **data}
+    for channel in dict.fromkeys(channels):
+        try:
+            await events.publish(channel, event)
+        except Exception:
+            logger.exception("publishing %s to %s failed", event_type, channel)
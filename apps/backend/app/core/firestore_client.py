@@ -1,11 +1,27 @@
 # backend/app/core/firestore_client.py
+import asyncio
+import logging
 import os
+import threading
+import time
 from app.core.config import settings
+from app.core.metrics import firestore_latency, record_span
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+def _connect():
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+    except ImportError:
+        # Fallback to mock client for development
+        logger.warning("firebase-admin not installed, using the in-process Firestore emulator")
+        from app.core.firestore_client_mock import db as mock_db
+        return mock_db
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-    
     # Initialize firebase admin
     cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
     if cred_path:
@@ -17,14 +33,30 @@ try:
         # rely on environment credentials (GCP) or default
         if not firebase_admin._apps:
             firebase_admin.initialize_app()
+    logger.info("Using Firebase Firestore client")
+    return firestore.client()
+
+def init_firestore():
+    """The Firestore client, created on first call (firebase_admin and grpc are slow to import)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _connect()
+    return _client
+
+class _LazyClient:
+    """Module-level `db` that initializes the real client on first attribute access"""
+    def __getattr__(self, name):
+        return getattr(init_firestore(), name)
+
+db = _LazyClient()
 
-    db = firestore.client()
-    print("✅ Using Firebase Firestore client")
-    
-except ImportError:
-    # Fallback to mock client for development
-    print("⚠️  firebase-admin not installed, using mock client")
-    from app.core.firestore_client_mock import db
+# Firestore caps a batch / transaction at 500 writes
+MAX_BATCH_WRITES = 500
+# order_by directions (same values as firestore.Query.ASCENDING / DESCENDING)
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
 
 def base_collection(app_id: str | None = None):
     app_id = app_id or settings.APP_ID
@@ -32,3 +64,43 @@ def base_collection(app_id: str | None = None):
 
 def users_root(app_id: str | None = None):
     return base_collection(app_id).collection("users")
+
+def get_all(refs: list) -> dict:
+    """Fetch many documents in one round-trip; snapshots keyed by document id"""
+    start = time.perf_counter()
+    snaps = {snap.id: snap for snap in db.get_all(refs)}
+    firestore_latency.observe(time.perf_counter() - start, "get_all")
+    return snaps
+
+def new_batch():
+    """A WriteBatch: up to MAX_BATCH_WRITES writes committed atomically"""
+    return db.batch()
+
+def count(query) -> int:
+    """Server-side COUNT aggregation; no documents are transferred"""
+    result = query.count().get()
+    return int(result[0][0].value)
+
+def unchanged_since(snapshot):
+    """Write precondition: fail the batch if the document changed after it was read"""
+    if getattr(snapshot, "update_time", None) is None:
+        return None
+    return db.write_option(last_update_time=snapshot.update_time)
+
+def failed_precondition():
+    """Exception raised when a write precondition fails, for whichever client is in use"""
+    try:
+        from google.api_core.exceptions import FailedPrecondition
+    except ImportError:
+        from app.core.firestore_client_mock import FailedPrecondition
+    return FailedPrecondition
+
+async def offload(fn, *args, **kwargs):
+    """Run a blocking Firestore call in a worker thread so it does not stall the event loop"""
+    start = time.perf_counter()
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        firestore_latency.observe(elapsed, getattr(fn, "__name__", "call").lstrip("_"))
+        record_span("firestore", elapsed)
@@ -1,85 +1,916 @@
 # backend/app/core/firestore_client_mock.py
 """
-Mock Firestore client for development when Firebase Admin is not available
+In-process Firestore emulator, used when Firebase Admin is not available.
+
+Mirrors the subset of the google-cloud-firestore API this app relies on:
+hierarchical paths (artifacts/{appId}/users/{uid}/tasks/{taskId}), documents
+with create/update times, queries with where / order_by / limit / offset /
+start_at / start_after / end_at / end_before / count, collection groups,
+get_all, write batches, transactions and write preconditions.
+
+Fields used in queries get a secondary index per collection (built on first
+use, maintained on every write), so equality / in / range filters only touch
+matching documents instead of scanning the whole collection.
+
+Environment:
+    FIRESTORE_MOCK_SNAPSHOT    JSON file loaded on start and written by save_snapshot()
+    FIRESTORE_MOCK_AUTOSAVE    "true" to save the snapshot at interpreter exit
+    FIRESTORE_MOCK_LATENCY_MS  simulated round-trip latency per RPC, for load tests
 """
+import atexit
+import bisect
+import copy
+import functools
 import json
 import os
-from typing import Dict, Any, List
-from datetime import datetime
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Iterable, Optional
+from uuid import uuid4
 
-class MockDocumentReference:
-    def __init__(self, data: Dict[str, Any] = None):
-        self.data = data or {}
-        self.id = f"mock_id_{datetime.now().timestamp()}"
-    
-    def get(self):
-        return MockDocumentSnapshot(exists=bool(self.data), data=self.data)
-    
-    def set(self, data: Dict[str, Any]):
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+# a batch / transaction commits at most this many writes
+MAX_WRITES = 500
+
+_OPERATORS = {"==", "!=", "<", "<=", ">", ">=", "in", "not-in", "array-contains", "array-contains-any"}
+_RANGE_OPERATORS = {"<", "<=", ">", ">="}
+_LIST_OPERATORS = {"in", "not-in", "array-contains-any"}
+# filters the secondary indexes answer exactly
+_INDEXED_OPERATORS = _RANGE_OPERATORS | {"==", "in"}
+
+# sentinels, mirroring firestore.DELETE_FIELD / firestore.SERVER_TIMESTAMP
+DELETE_FIELD = object()
+SERVER_TIMESTAMP = object()
+
+# same names as google.api_core.exceptions, so callers can catch either
+class MockFirestoreError(Exception):
+    pass
+
+class NotFound(MockFirestoreError):
+    pass
+
+class AlreadyExists(MockFirestoreError):
+    pass
+
+class FailedPrecondition(MockFirestoreError):
+    pass
+
+class Aborted(MockFirestoreError):
+    pass
+
+class InvalidArgument(MockFirestoreError):
+    pass
+
+# ---------------------------------------------------------------------------
+# values: Firestore orders by type first, then by value
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+def _type_rank(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, MockDocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    return 9
+
+def _sort_key(value) -> tuple:
+    rank = _type_rank(value)
+    if rank == 6:
+        return (rank, value.path)
+    if rank >= 8:
+        return (rank, json.dumps(value, sort_keys=True, default=str))
+    return (rank, value)
+
+def _compare(a, b) -> int:
+    ka, kb = _sort_key(a), _sort_key(b)
+    return (ka > kb) - (ka < kb)
+
+def _get_field(data: Dict[str, Any], field_path: str):
+    node = data
+    for part in field_path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return _MISSING
+        node = node[part]
+    return node
+
+def _set_field(data: Dict[str, Any], field_path: str, value):
+    parts = field_path.split(".")
+    node = data
+    for part in parts[:-1]:
+        if not isinstance(node.get(part), dict):
+            node[part] = {}
+        node = node[part]
+    node[parts[-1]] = value
+
+def _delete_field(data: Dict[str, Any], field_path: str):
+    parts = field_path.split(".")
+    node = data
+    for part in parts[:-1]:
+        node = node.get(part)
+        if not isinstance(node, dict):
+            return
+    node.pop(parts[-1], None)
+
+def _resolve_value(value, now):
+    return now if value is SERVER_TIMESTAMP else copy.deepcopy(value)
+
+def _merge(base: Dict[str, Any], data: Dict[str, Any], now):
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            base.pop(key, None)
+        elif isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value, now)
+        else:
+            base[key] = _resolve_value(value, now)
+
+def _matches(value, op: str, operand) -> bool:
+    if value is _MISSING:
+        return False
+    if op == "==":
+        return _sort_key(value) == _sort_key(operand)
+    if op == "!=":
+        return value is not None and _sort_key(value) != _sort_key(operand)
+    if op in _RANGE_OPERATORS:
+        # range filters only match values of the operand's type
+        if _type_rank(value) != _type_rank(operand):
+            return False
+        c = _compare(value, operand)
+        return {"<": c < 0, "<=": c <= 0, ">": c > 0, ">=": c >= 0}[op]
+    if op == "in":
+        return any(_sort_key(value) == _sort_key(o) for o in operand)
+    if op == "not-in":
+        return value is not None and all(_sort_key(value) != _sort_key(o) for o in operand)
+    if op == "array-contains":
+        return isinstance(value, list) and any(_sort_key(v) == _sort_key(operand) for v in value)
+    return isinstance(value, list) and any(_sort_key(v) == _sort_key(o) for v in value for o in operand)
+
+def _position(keys: list, cursor: list, orders: list) -> int:
+    """Where a row sorts relative to a cursor in query order: <0 before, 0 at, >0 after"""
+    for k, ck, (_, direction) in zip(keys, cursor, orders):
+        if ck is None:
+            break
+        if k != ck:
+            return (1 if k > ck else -1) * (-1 if direction == DESCENDING else 1)
+    return 0
+
+def _cursor_bound(bound):
+    """(values, inclusive) cursor -> (sort keys, inclusive); None entries match anything"""
+    if bound is None:
+        return None
+    values, inclusive = bound
+    return [None if v is _MISSING else _sort_key(v) for v in values], inclusive
+
+def _after_start(keys: list, start, orders: list) -> bool:
+    if start is None:
+        return True
+    cursor, inclusive = start
+    p = _position(keys, cursor, orders)
+    return p > 0 or (inclusive and p == 0)
+
+def _before_end(keys: list, end, orders: list) -> bool:
+    if end is None:
+        return True
+    cursor, inclusive = end
+    p = _position(keys, cursor, orders)
+    return p < 0 or (inclusive and p == 0)
+
+# ---------------------------------------------------------------------------
+# storage
+# ---------------------------------------------------------------------------
+
+class _StoredDocument:
+    __slots__ = ("data", "create_time", "update_time")
+
+    def __init__(self, data: Dict[str, Any], create_time: datetime, update_time: datetime):
         self.data = data
-        return self
-    
-    def update(self, data: Dict[str, Any]):
-        self.data.update(data)
-        return self
-    
-    def delete(self):
-        self.data = {}
-        return self
+        self.create_time = create_time
+        self.update_time = update_time
 
-class MockDocumentSnapshot:
-    def __init__(self, exists: bool = True, data: Dict[str, Any] = None):
-        self._exists = exists
-        self.data = data or {}
-        self.id = f"mock_id_{datetime.now().timestamp()}"
-    
-    def exists(self) -> bool:
-        return self._exists
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return self.data
-
-class MockCollectionReference:
+class _FieldIndex:
+    """Secondary index on one field of one collection: value -> document ids"""
     def __init__(self):
-        self.documents = {}
-    
-    def document(self, doc_id: str = None) -> MockDocumentReference:
-        if doc_id is None:
-            doc_id = f"auto_id_{datetime.now().timestamp()}"
-        
-        if doc_id not in self.documents:
-            self.documents[doc_id] = MockDocumentReference()
-        return self.documents[doc_id]
-    
-    def add(self, data: Dict[str, Any]) -> tuple:
-        doc_id = f"auto_id_{datetime.now().timestamp()}"
-        doc_ref = MockDocumentReference(data)
-        doc_ref.id = doc_id
-        self.documents[doc_id] = doc_ref
-        return (None, doc_ref)  # (timestamp, doc_ref)
-    
-    def stream(self):
-        for doc_id, doc_ref in self.documents.items():
-            yield MockDocumentSnapshot(exists=True, data=doc_ref.data)
-    
-    def get(self):
-        return list(self.stream())
-    
-    def where(self, field: str, operator: str, value: Any):
-        # Simple mock implementation
+        self.by_value: Dict[tuple, set] = defaultdict(set)
+        # documents whose value has no hashable key and so are only found by scanning
+        self.unindexed = 0
+        self._sorted: Optional[List[tuple]] = None
+
+    @staticmethod
+    def _key(value) -> Optional[tuple]:
+        if value is _MISSING:
+            return None
+        key = _sort_key(value)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def add(self, doc_id: str, value):
+        key = self._key(value)
+        if key is not None:
+            self.by_value[key].add(doc_id)
+            self._sorted = None
+        elif value is not _MISSING:
+            self.unindexed += 1
+
+    def remove(self, doc_id: str, value):
+        key = self._key(value)
+        if key is None and value is not _MISSING:
+            self.unindexed -= 1
+        ids = self.by_value.get(key) if key is not None else None
+        if ids is not None:
+            ids.discard(doc_id)
+            if not ids:
+                del self.by_value[key]
+            self._sorted = None
+
+    def equal(self, value) -> set:
+        key = self._key(value)
+        return self.by_value.get(key, set()) if key is not None else set()
+
+    def sorted_keys(self) -> List[tuple]:
+        if self._sorted is None:
+            self._sorted = sorted(self.by_value)
+        return self._sorted
+
+    def range(self, op: str, value) -> set:
+        key = self._key(value)
+        if key is None:
+            return set()
+        keys = self.sorted_keys()
+        # only values of the operand's type take part in a range filter
+        lo = bisect.bisect_left(keys, key[0], key=lambda k: k[0])
+        hi = bisect.bisect_right(keys, key[0], key=lambda k: k[0])
+        if op == "<":
+            selected = keys[lo:bisect.bisect_left(keys, key, lo, hi)]
+        elif op == "<=":
+            selected = keys[lo:bisect.bisect_right(keys, key, lo, hi)]
+        elif op == ">":
+            selected = keys[bisect.bisect_right(keys, key, lo, hi):hi]
+        else:
+            selected = keys[bisect.bisect_left(keys, key, lo, hi):hi]
+        out = set()
+        for k in selected:
+            out |= self.by_value[k]
+        return out
+
+# ---------------------------------------------------------------------------
+# documents
+# ---------------------------------------------------------------------------
+
+class MockDocumentSnapshot:
+    def __init__(self, reference: "MockDocumentReference", data: Optional[Dict[str, Any]],
+                 create_time: datetime = None, update_time: datetime = None, read_time: datetime = None):
+        self.reference = reference
+        self.id = reference.id
+        # exists is a property on real Firestore snapshots, not a method
+        self.exists = data is not None
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+class MockWriteResult:
+    def __init__(self, update_time: datetime):
+        self.update_time = update_time
+
+class MockDocumentReference:
+    def __init__(self, client: "MockFirestoreClient", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def __eq__(self, other):
+        return isinstance(other, MockDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"MockDocumentReference({self.path!r})"
+
+    @property
+    def parent(self) -> "MockCollectionReference":
+        return MockCollectionReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name: str) -> "MockCollectionReference":
+        return MockCollectionReference(self._client, f"{self.path}/{name}")
+
+    def collections(self) -> List["MockCollectionReference"]:
+        return [MockCollectionReference(self._client, p) for p in self._client._subcollections(self.path)]
+
+    def get(self, field_paths=None, transaction: "MockTransaction" = None) -> MockDocumentSnapshot:
+        return self._client._get(self, transaction)
+
+    def create(self, document_data: Dict[str, Any]) -> MockWriteResult:
+        return self._client._commit([("create", self, document_data, None)])[0]
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> MockWriteResult:
+        return self._client._commit([("set", self, document_data, merge)])[0]
+
+    def update(self, field_updates: Dict[str, Any], option=None) -> MockWriteResult:
+        return self._client._commit([("update", self, field_updates, option)])[0]
+
+    def delete(self, option=None) -> MockWriteResult:
+        return self._client._commit([("delete", self, None, option)])[0]
+
+class _Precondition:
+    def __init__(self, exists: Optional[bool] = None, last_update_time: datetime = None):
+        self.exists = exists
+        self.last_update_time = last_update_time
+
+# ---------------------------------------------------------------------------
+# queries
+# ---------------------------------------------------------------------------
+
+class MockAggregationResult:
+    def __init__(self, value: int, alias: str = "count"):
+        self.alias = alias
+        self.value = value
+
+class MockAggregationQuery:
+    def __init__(self, query: "MockQuery", alias: str = "count"):
+        self._query = query
+        self._alias = alias
+
+    def get(self, transaction=None):
+        # same nesting as the real client: [[AggregationResult]]
+        return [[MockAggregationResult(self._query._client._count(self._query), self._alias)]]
+
+class MockQuery:
+    """Immutable query over one collection, or over every collection with a given id"""
+    def __init__(self, client: "MockFirestoreClient", collection_path: str, all_descendants: bool = False,
+                 filters=(), orders=(), limit_to: int = None, offset_by: int = 0, start=None, end=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._all_descendants = all_descendants
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit_to
+        self._offset = offset_by
+        # cursors: (values, inclusive)
+        self._start = start
+        self._end = end
+
+    def _copy(self, **changes) -> "MockQuery":
+        state = {
+            "all_descendants": self._all_descendants, "filters": self._filters, "orders": self._orders,
+            "limit_to": self._limit, "offset_by": self._offset, "start": self._start, "end": self._end,
+        }
+        state.update(changes)
+        return MockQuery(self._client, self._collection_path, **state)
+
+    def where(self, field_path: str = None, op_string: str = None, value: Any = None, *, filter=None) -> "MockQuery":
+        # accepts both where("status", "==", "x") and where(filter=FieldFilter("status", "==", "x"))
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in _OPERATORS:
+            raise InvalidArgument(f"Unsupported operator: {op_string}")
+        if op_string in _LIST_OPERATORS and not isinstance(value, (list, tuple)):
+            raise InvalidArgument(f"'{op_string}' requires a list value")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "MockQuery":
+        if direction not in (ASCENDING, DESCENDING):
+            raise InvalidArgument(f"Invalid direction: {direction}")
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "MockQuery":
+        return self._copy(limit_to=count)
+
+    def offset(self, num_to_skip: int) -> "MockQuery":
+        return self._copy(offset_by=num_to_skip)
+
+    def _cursor(self, document_fields) -> list:
+        if isinstance(document_fields, MockDocumentSnapshot):
+            # a snapshot positions on every order field plus the document path
+            data = document_fields._data or {}
+            orders = self._effective_orders()
+            return [_get_field(data, f) for f, _ in orders[:-1]] + [document_fields.reference.path]
+        if isinstance(document_fields, dict):
+            return [document_fields.get(f, _MISSING) for f, _ in self._orders]
+        return list(document_fields)
+
+    def start_at(self, document_fields) -> "MockQuery":
+        return self._copy(start=(self._cursor(document_fields), True))
+
+    def start_after(self, document_fields) -> "MockQuery":
+        return self._copy(start=(self._cursor(document_fields), False))
+
+    def end_at(self, document_fields) -> "MockQuery":
+        return self._copy(end=(self._cursor(document_fields), True))
+
+    def end_before(self, document_fields) -> "MockQuery":
+        return self._copy(end=(self._cursor(document_fields), False))
+
+    def count(self, alias: str = "count") -> MockAggregationQuery:
+        return MockAggregationQuery(self._copy(limit_to=None, offset_by=0), alias)
+
+    def stream(self, transaction: "MockTransaction" = None):
+        return iter(self._client._run_query(self, transaction))
+
+    def get(self, transaction: "MockTransaction" = None) -> List[MockDocumentSnapshot]:
+        return list(self.stream(transaction))
+
+    def _effective_orders(self) -> list:
+        # like Firestore: inequality fields are ordered implicitly, ties break on the document path
+        orders = list(self._orders)
+        ordered = {f for f, _ in orders}
+        for field, op, _ in self._filters:
+            if (op in _RANGE_OPERATORS or op in ("!=", "not-in")) and field not in ordered:
+                orders.append((field, ASCENDING))
+                ordered.add(field)
+        direction = orders[-1][1] if orders else ASCENDING
+        return orders + [("__name__", direction)]
+
+class MockCollectionReference(MockQuery):
+    def __init__(self, client: "MockFirestoreClient", path: str):
+        super().__init__(client, path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> Optional[MockDocumentReference]:
+        if "/" not in self.path:
+            return None
+        return MockDocumentReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def document(self, document_id: str = None) -> MockDocumentReference:
+        return MockDocumentReference(self._client, f"{self.path}/{document_id or _auto_id()}")
+
+    def add(self, document_data: Dict[str, Any], document_id: str = None) -> tuple:
+        ref = self.document(document_id)
+        result = ref.create(document_data)
+        return (result.update_time, ref)
+
+    def list_documents(self) -> List[MockDocumentReference]:
+        return [MockDocumentReference(self._client, f"{self.path}/{i}") for i in self._client._children(self.path)]
+
+def _auto_id() -> str:
+    # 20 characters, like Firestore auto ids; random, so concurrent adds never collide
+    return uuid4().hex[:20]
+
+# ---------------------------------------------------------------------------
+# batches and transactions
+# ---------------------------------------------------------------------------
+
+class MockWriteBatch:
+    """Buffers writes and applies them all-or-nothing on commit, like a Firestore WriteBatch"""
+    def __init__(self, client: "MockFirestoreClient"):
+        self._client = client
+        self._writes = []
+
+    def _add(self, write: tuple):
+        if len(self._writes) >= MAX_WRITES:
+            raise InvalidArgument(f"At most {MAX_WRITES} writes are allowed per commit")
+        self._writes.append(write)
+
+    def create(self, reference: MockDocumentReference, document_data: Dict[str, Any]):
+        self._add(("create", reference, document_data, None))
+
+    def set(self, reference: MockDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._add(("set", reference, document_data, merge))
+
+    def update(self, reference: MockDocumentReference, field_updates: Dict[str, Any], option=None):
+        self._add(("update", reference, field_updates, option))
+
+    def delete(self, reference: MockDocumentReference, option=None):
+        self._add(("delete", reference, None, option))
+
+    def commit(self) -> List[MockWriteResult]:
+        writes, self._writes = self._writes, []
+        return self._client._commit(writes)
+
+    def __enter__(self):
         return self
 
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+
+class MockTransaction(MockWriteBatch):
+    """Optimistic transaction: documents read through it must be unchanged at commit"""
+    def __init__(self, client: "MockFirestoreClient", max_attempts: int = 5, read_only: bool = False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._reads: Dict[str, Optional[datetime]] = {}
+
+    def _record_read(self, path: str, update_time: Optional[datetime]):
+        self._reads.setdefault(path, update_time)
+
+    def _add(self, write: tuple):
+        if self._read_only:
+            raise InvalidArgument("Cannot write in a read-only transaction")
+        super()._add(write)
+
+    def _reset(self):
+        self._writes, self._reads = [], {}
+
+    def commit(self) -> List[MockWriteResult]:
+        writes, reads = self._writes, self._reads
+        self._reset()
+        return self._client._commit(writes, reads)
+
+def transactional(fn):
+    """Mirror of firestore.transactional: run fn(transaction, ...) and commit, retrying on contention"""
+    @functools.wraps(fn)
+    def wrapper(transaction: MockTransaction, *args, **kwargs):
+        for attempt in range(transaction._max_attempts):
+            transaction._reset()
+            result = fn(transaction, *args, **kwargs)
+            try:
+                transaction.commit()
+                return result
+            except Aborted:
+                if attempt == transaction._max_attempts - 1:
+                    raise
+    return wrapper
+
+# ---------------------------------------------------------------------------
+# client
+# ---------------------------------------------------------------------------
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    if isinstance(value, MockDocumentReference):
+        return {"__ref__": value.path}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    return value
+
 class MockFirestoreClient:
-    def __init__(self):
-        self.collections = {}
-    
-    def collection(self, name: str) -> MockCollectionReference:
-        if name not in self.collections:
-            self.collections[name] = MockCollectionReference()
-        return self.collections[name]
+    def __init__(self, snapshot_path: str = None, latency_ms: float = 0.0):
+        self._lock = threading.RLock()
+        self._docs: Dict[str, _StoredDocument] = {}
+        # collection path -> ids of the documents that exist in it
+        self._collections: Dict[str, set] = defaultdict(set)
+        # collection path -> field path -> secondary index
+        self._indexes: Dict[str, Dict[str, _FieldIndex]] = defaultdict(dict)
+        self._last_time = datetime.fromtimestamp(0, timezone.utc)
+        self.latency = latency_ms / 1000.0
+        # rpcs / reads / writes / queries / docs_scanned / index_lookups, for benchmarks
+        self.stats: Dict[str, int] = defaultdict(int)
+        self.snapshot_path = snapshot_path
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.load_snapshot(snapshot_path)
+
+    def collection(self, *path: str) -> MockCollectionReference:
+        full = "/".join(path)
+        if full.count("/") % 2:
+            raise InvalidArgument(f"Not a collection path: {full}")
+        return MockCollectionReference(self, full)
+
+    def document(self, *path: str) -> MockDocumentReference:
+        full = "/".join(path)
+        if full.count("/") % 2 == 0:
+            raise InvalidArgument(f"Not a document path: {full}")
+        return MockDocumentReference(self, full)
+
+    def collection_group(self, collection_id: str) -> MockQuery:
+        return MockQuery(self, collection_id, all_descendants=True)
+
+    def collections(self) -> List[MockCollectionReference]:
+        return [MockCollectionReference(self, p) for p in self._subcollections("")]
+
+    def get_all(self, references: Iterable[MockDocumentReference], field_paths=None, transaction=None):
+        self._round_trip()
+        with self._lock:
+            snaps = [self._snapshot(ref, transaction) for ref in references]
+        return iter(snaps)
+
+    def batch(self) -> MockWriteBatch:
+        return MockWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> MockTransaction:
+        return MockTransaction(self, max_attempts, read_only)
+
+    def write_option(self, **kwargs) -> _Precondition:
+        if len(kwargs) != 1 or next(iter(kwargs)) not in ("exists", "last_update_time"):
+            raise TypeError("write_option() takes exactly one of exists= or last_update_time=")
+        return _Precondition(**kwargs)
+
+    def reset(self):
+        with self._lock:
+            self._docs.clear()
+            self._collections.clear()
+            self._indexes.clear()
+            self.stats.clear()
+
+    def save_snapshot(self, path: str = None):
+        path = path or self.snapshot_path
+        with self._lock:
+            payload = {
+                p: {"data": _encode(d.data), "create_time": d.create_time.isoformat(),
+                    "update_time": d.update_time.isoformat()}
+                for p, d in self._docs.items()
+            }
+        # write then rename, so a crash never leaves a truncated snapshot
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def load_snapshot(self, path: str = None):
+        path = path or self.snapshot_path
+        with open(path) as f:
+            payload = json.load(f)
+        with self._lock:
+            self.reset()
+            for doc_path, doc in payload.items():
+                stored = _StoredDocument(self._decode(doc["data"]), datetime.fromisoformat(doc["create_time"]),
+                                         datetime.fromisoformat(doc["update_time"]))
+                self._docs[doc_path] = stored
+                collection_path, doc_id = doc_path.rsplit("/", 1)
+                self._collections[collection_path].add(doc_id)
+                self._last_time = max(self._last_time, stored.update_time)
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if "__datetime__" in value:
+                return datetime.fromisoformat(value["__datetime__"])
+            if "__bytes__" in value:
+                return bytes.fromhex(value["__bytes__"])
+            if "__ref__" in value:
+                return MockDocumentReference(self, value["__ref__"])
+            return {k: self._decode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        return value
+
+    def _round_trip(self):
+        self.stats["rpcs"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _now(self) -> datetime:
+        # strictly increasing, so update_time works as a document version for preconditions
+        now = datetime.now(timezone.utc)
+        if now <= self._last_time:
+            now = self._last_time + timedelta(microseconds=1)
+        self._last_time = now
+        return now
+
+    def _children(self, collection_path: str) -> List[str]:
+        with self._lock:
+            return sorted(self._collections.get(collection_path, ()))
+
+    def _subcollections(self, doc_path: str) -> List[str]:
+        prefix = f"{doc_path}/" if doc_path else ""
+        depth = prefix.count("/")
+        with self._lock:
+            return sorted(p for p, ids in self._collections.items()
+                          if ids and p.startswith(prefix) and p.count("/") == depth)
+
+    def _snapshot(self, ref: MockDocumentReference, transaction: MockTransaction = None) -> MockDocumentSnapshot:
+        stored = self._docs.get(ref.path)
+        self.stats["reads"] += 1
+        if transaction is not None:
+            transaction._record_read(ref.path, stored.update_time if stored else None)
+        if stored is None:
+            return MockDocumentSnapshot(ref, None, read_time=self._last_time)
+        return MockDocumentSnapshot(ref, copy.deepcopy(stored.data), stored.create_time,
+                                    stored.update_time, self._last_time)
+
+    def _get(self, ref: MockDocumentReference, transaction: MockTransaction = None) -> MockDocumentSnapshot:
+        self._round_trip()
+        with self._lock:
+            return self._snapshot(ref, transaction)
+
+    def _index(self, collection_path: str, field_path: str) -> _FieldIndex:
+        index = self._indexes[collection_path].get(field_path)
+        if index is None:
+            index = _FieldIndex()
+            for doc_id in self._collections.get(collection_path, ()):
+                index.add(doc_id, _get_field(self._docs[f"{collection_path}/{doc_id}"].data, field_path))
+            self._indexes[collection_path][field_path] = index
+            self.stats["indexes_built"] += 1
+        return index
+
+    def _reindex(self, path: str, old: Optional[Dict], new: Optional[Dict]):
+        collection_path, doc_id = path.rsplit("/", 1)
+        if new is not None:
+            self._collections[collection_path].add(doc_id)
+        else:
+            self._collections[collection_path].discard(doc_id)
+        for field_path, index in self._indexes.get(collection_path, {}).items():
+            if old is not None:
+                index.remove(doc_id, _get_field(old, field_path))
+            if new is not None:
+                index.add(doc_id, _get_field(new, field_path))
+
+    def _query_collections(self, query: MockQuery) -> List[str]:
+        if not query._all_descendants:
+            return [query._collection_path]
+        return [p for p in self._collections if p.rsplit("/", 1)[-1] == query._collection_path]
+
+    def _candidates(self, collection_path: str, filters) -> Iterable[str]:
+        """Document ids that can match, narrowed through the indexes of ==, in and range filters"""
+        ids = None
+        for field, op, value in filters:
+            if op == "==":
+                hit = self._index(collection_path, field).equal(value)
+            elif op == "in":
+                index = self._index(collection_path, field)
+                hit = set().union(*(index.equal(v) for v in value))
+            elif op in _RANGE_OPERATORS:
+                hit = self._index(collection_path, field).range(op, value)
+            else:
+                continue
+            self.stats["index_lookups"] += 1
+            ids = set(hit) if ids is None else ids & hit
+            if not ids:
+                return ()
+        return self._collections.get(collection_path, ()) if ids is None else ids
+
+    def _matching(self, query: MockQuery) -> List[tuple]:
+        out = []
+        for collection_path in self._query_collections(query):
+            for doc_id in list(self._candidates(collection_path, query._filters)):
+                path = f"{collection_path}/{doc_id}"
+                stored = self._docs[path]
+                self.stats["docs_scanned"] += 1
+                if all(_matches(_get_field(stored.data, f), op, v) for f, op, v in query._filters):
+                    out.append((path, stored))
+        return out
+
+    def _sorted_rows(self, query: MockQuery, orders: list, start, end) -> List[tuple]:
+        """Every matching (keys, path, stored) row in query order, between the cursors"""
+        rows = []
+        for path, stored in self._matching(query):
+            values = [path if f == "__name__" else _get_field(stored.data, f) for f, _ in orders]
+            # documents without an order_by field are not returned, as in Firestore
+            if _MISSING not in values:
+                rows.append(([_sort_key(v) for v in values], path, stored))
+        # stable sorts from the last order to the first give the combined ordering
+        for i in reversed(range(len(orders))):
+            rows.sort(key=lambda r: r[0][i], reverse=orders[i][1] == DESCENDING)
+        return [r for r in rows if _after_start(r[0], start, orders) and _before_end(r[0], end, orders)]
+
+    def _index_scan(self, query: MockQuery, orders: list, start, end, want: int) -> Optional[List[tuple]]:
+        """
+        Rows read in order off the index of the single order_by field, stopping after `want`,
+        the way Firestore serves order_by + limit. None when the query needs a full sort.
+        """
+        if query._all_descendants or len(orders) != 2:
+            return None
+        (field, direction), collection_path = orders[0], query._collection_path
+        index = self._index(collection_path, field)
+        if index.unindexed:
+            return None
+        candidates = self._candidates(collection_path, query._filters)
+        if len(candidates) * 8 < len(self._collections.get(collection_path, ())):
+            # a selective filter leaves few documents; sorting them beats walking the whole index
+            return None
+        descending = direction == DESCENDING
+        rows = []
+        for key in (reversed(index.sorted_keys()) if descending else index.sorted_keys()):
+            # ties break on the document path, i.e. the id within one collection
+            for doc_id in sorted(index.by_value[key], reverse=descending):
+                if doc_id not in candidates:
+                    continue
+                path = f"{collection_path}/{doc_id}"
+                stored = self._docs[path]
+                self.stats["docs_scanned"] += 1
+                if not all(_matches(_get_field(stored.data, f), op, v) for f, op, v in query._filters):
+                    continue
+                keys = [key, _sort_key(path)]
+                if not _after_start(keys, start, orders):
+                    continue
+                if not _before_end(keys, end, orders) or len(rows) >= want:
+                    return rows
+                rows.append((keys, path, stored))
+        return rows
+
+    def _run_query(self, query: MockQuery, transaction: MockTransaction = None) -> List[MockDocumentSnapshot]:
+        self._round_trip()
+        with self._lock:
+            orders = query._effective_orders()
+            start, end = _cursor_bound(query._start), _cursor_bound(query._end)
+            rows = None
+            if query._limit is not None:
+                rows = self._index_scan(query, orders, start, end, query._offset + query._limit)
+            if rows is None:
+                rows = self._sorted_rows(query, orders, start, end)
+            rows = rows[query._offset:]
+            if query._limit is not None:
+                rows = rows[:query._limit]
+            self.stats["queries"] += 1
+            self.stats["reads"] += max(len(rows), 1)  # Firestore bills one read for an empty result
+            snaps = []
+            for _, path, stored in rows:
+                if transaction is not None:
+                    transaction._record_read(path, stored.update_time)
+                snaps.append(MockDocumentSnapshot(MockDocumentReference(self, path), copy.deepcopy(stored.data),
+                                                  stored.create_time, stored.update_time, self._last_time))
+            return snaps
+
+    def _count(self, query: MockQuery) -> int:
+        if query._start or query._end:
+            return len(self._run_query(query))
+        self._round_trip()
+        with self._lock:
+            self.stats["queries"] += 1
+            if all(op in _INDEXED_OPERATORS for _, op, _ in query._filters):
+                # answered from the indexes alone, without touching any document
+                matched = sum(len(self._candidates(c, query._filters)) for c in self._query_collections(query))
+            else:
+                matched = len(self._matching(query))
+            # aggregations bill one read per 1000 index entries
+            self.stats["reads"] += matched // 1000 + 1
+            return matched
+
+    def _check_precondition(self, path: str, stored: Optional[_StoredDocument], option):
+        if not isinstance(option, _Precondition):
+            return
+        if option.exists is not None and option.exists != (stored is not None):
+            raise NotFound(path) if option.exists else AlreadyExists(path)
+        if option.last_update_time is not None and (stored is None or stored.update_time != option.last_update_time):
+            raise FailedPrecondition(f"{path} was modified after it was read")
+
+    def _apply(self, kind: str, path: str, stored: Optional[_StoredDocument], data, option, now) -> Optional[Dict]:
+        """Document data after one write, or None once deleted"""
+        if kind == "delete":
+            self._check_precondition(path, stored, option)
+            return None
+        if kind == "create" and stored is not None:
+            raise AlreadyExists(path)
+        if kind == "update":
+            if stored is None:
+                raise NotFound(f"No document to update: {path}")
+            self._check_precondition(path, stored, option)
+            new = copy.deepcopy(stored.data)
+            # update() takes dotted field paths
+            for field_path, value in data.items():
+                if value is DELETE_FIELD:
+                    _delete_field(new, field_path)
+                else:
+                    _set_field(new, field_path, _resolve_value(value, now))
+            return new
+        new = copy.deepcopy(stored.data) if stored is not None and option is True else {}
+        _merge(new, data, now)
+        return new
+
+    def _commit(self, writes: List[tuple], reads: Dict[str, Optional[datetime]] = None) -> List[MockWriteResult]:
+        if len(writes) > MAX_WRITES:
+            raise InvalidArgument(f"At most {MAX_WRITES} writes are allowed per commit")
+        self._round_trip()
+        with self._lock:
+            for path, update_time in (reads or {}).items():
+                stored = self._docs.get(path)
+                if (stored.update_time if stored else None) != update_time:
+                    raise Aborted(f"Transaction contention on {path}")
+            now = self._now()
+            # stage every write first, so a failing one leaves nothing half-written
+            staged: Dict[str, Optional[_StoredDocument]] = {}
+            for kind, ref, data, option in writes:
+                current = staged[ref.path] if ref.path in staged else self._docs.get(ref.path)
+                new = self._apply(kind, ref.path, current, data, option, now)
+                staged[ref.path] = None if new is None else _StoredDocument(
+                    new, current.create_time if current else now, now)
+            for path, new in staged.items():
+                old = self._docs.pop(path, None)
+                if new is not None:
+                    self._docs[path] = new
+                self._reindex(path, old.data if old else None, new.data if new else None)
+            self.stats["writes"] += len(writes)
+            return [MockWriteResult(now) for _ in writes]
 
 # Create a mock database instance
-db = MockFirestoreClient()
+db = MockFirestoreClient(
+    snapshot_path=os.getenv("FIRESTORE_MOCK_SNAPSHOT") or None,
+    latency_ms=float(os.getenv("FIRESTORE_MOCK_LATENCY_MS", "0")),
+)
+if db.snapshot_path and os.getenv("FIRESTORE_MOCK_AUTOSAVE", "false").lower() == "true":
+    atexit.register(db.save_snapshot)
 
-print("🚧 Using mock Firestore client for development")
-print("   Install firebase-admin for production use")
\ No newline at end of file
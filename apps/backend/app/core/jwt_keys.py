@@ -0,0 +1,121 @@
+# backend/app/core/jwt_keys.py
+"""
+Signing / verification keys for JWTs.
+HS* algorithms use JWT_SECRET. Asymmetric algorithms use a PEM key pair or
+a JWKS endpoint; parsed keys are cached so each verification skips PEM/JWK
+parsing, and the JWKS document is refetched only after JWT_JWKS_TTL or when
+a token carries an unknown kid. Fetches are async and never block the event
+loop: an expired key set keeps serving while it is refetched in the
+background, and a failed fetch keeps the last good one.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+import httpx
+from jose import jwk, jwt
+from jose.exceptions import JOSEError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# never refetch the JWKS more often than this, even for unknown kids
+JWKS_MIN_REFRESH_SECONDS = 30
+JWKS_FETCH_TIMEOUT = 5.0
+
+def _is_symmetric(algorithm: str) -> bool:
+    return algorithm.upper().startswith("HS")
+
+def _read_pem(value: str) -> str:
+    # accept either inline PEM or a path to a PEM file
+    if value and "-----BEGIN" not in value and os.path.isfile(value):
+        with open(value) as f:
+            return f.read()
+    return value
+
+class KeysUnavailable(Exception):
+    """The JWKS endpoint could not be fetched and no key set was ever loaded from it"""
+
+class KeySet:
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        self._public_key = None
+        self._private_key = None
+        self._jwks: Dict[Optional[str], object] = {}
+        self._jwks_fetched_at = 0.0
+        # last fetch attempt, successful or not: failures are retried at the same pace
+        self._jwks_tried_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    def signing_key(self):
+        if _is_symmetric(self.algorithm):
+            return settings.JWT_SECRET
+        if self._private_key is None:
+            if not settings.JWT_PRIVATE_KEY:
+                raise RuntimeError(f"JWT_PRIVATE_KEY is required to sign {self.algorithm} tokens")
+            self._private_key = jwk.construct(_read_pem(settings.JWT_PRIVATE_KEY), self.algorithm)
+        return self._private_key
+
+    async def verification_key(self, token: str):
+        if _is_symmetric(self.algorithm):
+            return settings.JWT_SECRET
+        if settings.JWT_JWKS_URL:
+            return await self._jwks_key(jwt.get_unverified_header(token).get("kid"))
+        if self._public_key is None:
+            if not settings.JWT_PUBLIC_KEY:
+                raise RuntimeError(f"JWT_PUBLIC_KEY or JWT_JWKS_URL is required to verify {self.algorithm} tokens")
+            self._public_key = jwk.construct(_read_pem(settings.JWT_PUBLIC_KEY), self.algorithm)
+        return self._public_key
+
+    def _lookup(self, kid: Optional[str]):
+        key = self._jwks.get(kid)
+        if key is None and kid is None and len(self._jwks) == 1:
+            key = next(iter(self._jwks.values()))
+        return key
+
+    async def _jwks_key(self, kid: Optional[str]):
+        now = time.monotonic()
+        key = self._lookup(kid)
+        if now - self._jwks_tried_at > JWKS_MIN_REFRESH_SECONDS:
+            if key is None:
+                # a new kid (key rotation): wait for the fetch, without blocking the event loop
+                await asyncio.shield(self._start_refresh())
+                key = self._lookup(kid)
+            elif now - self._jwks_fetched_at > settings.JWT_JWKS_TTL:
+                # expired but known: keep serving it while the refetch runs in the background
+                self._start_refresh()
+        if key is None:
+            if not self._jwks:
+                raise KeysUnavailable(f"No signing keys loaded from {settings.JWT_JWKS_URL}")
+            raise KeyError(f"Unknown signing key id: {kid}")
+        return key
+
+    def _start_refresh(self) -> asyncio.Task:
+        # concurrent misses share one fetch
+        if self._refresh is None or self._refresh.done():
+            self._jwks_tried_at = time.monotonic()
+            self._refresh = asyncio.get_running_loop().create_task(self._refresh_jwks())
+        return self._refresh
+
+    async def _refresh_jwks(self):
+        """Refetch the JWKS; on any failure the last good key set stays in use"""
+        try:
+            async with httpx.AsyncClient(timeout=JWKS_FETCH_TIMEOUT) as client:
+                response = await client.get(settings.JWT_JWKS_URL)
+            response.raise_for_status()
+            document = response.json()
+            if not isinstance(document, dict) or not isinstance(document.get("keys"), list):
+                raise ValueError("not a JWKS document")
+            jwks = {
+                k.get("kid"): jwk.construct(k, k.get("alg", self.algorithm))
+                for k in document["keys"] if isinstance(k, dict)
+            }
+        except (httpx.HTTPError, ValueError, JOSEError) as e:
+            logger.warning("JWKS refresh from %s failed, keeping %d known keys: %s",
+                           settings.JWT_JWKS_URL, len(self._jwks), e)
+            return
+        self._jwks = jwks
+        self._jwks_fetched_at = time.monotonic()
+
+keys = KeySet(settings.JWT_ALGORITHM)
@@ -0,0 +1,188 @@
+# backend/app/core/metrics.py
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain thread-safe objects kept in one registry
+and rendered by GET /metrics. While a request is being served, a RequestStats
+in a context variable collects how much of its time went to the database,
+Firestore, token verification and JSON rendering (spans), so per-request
+query counts and costs can be told apart from the route's total latency.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+
+# latency histogram upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# queries-per-request bounds; the top buckets are where N+1 loops land
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = ()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {v:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts..., count, sum]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return series[-2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                running = 0
+                for bound, n in zip(self.buckets, series):
+                    running += n
+                    le = _labels(self.labelnames, labels, f'le="{bound:g}"')
+                    lines.append(f"{self.name}_bucket{le} {running}")
+                le = _labels(self.labelnames, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {series[-2]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]:.6f}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", ("method", "route")))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS))
+request_span_seconds = registry.register(Histogram(
+    "http_request_span_seconds", "Per-request time spent in db / firestore / auth / serialize", ("method", "route", "span")))
+db_queries = registry.register(Counter(
+    "db_queries_total", "SQL statements executed", ("engine",)))
+db_query_latency = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine",)))
+firestore_latency = registry.register(Histogram(
+    "firestore_call_duration_seconds", "Firestore call time, including the worker-thread hop", ("op",)))
+slow_requests = registry.register(Counter(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS", ("method", "route")))
+
+class RequestStats:
+    """Per-request accumulator; mutated in place so worker threads report into it too"""
+    __slots__ = ("start", "queries", "spans")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        # span name -> [calls, seconds]
+        self.spans: Dict[str, list] = {}
+
+    def add(self, span: str, seconds: float):
+        entry = self.spans.get(span)
+        if entry is None:
+            self.spans[span] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+def begin_request() -> Tuple[RequestStats, contextvars.Token]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+def end_request(token: contextvars.Token):
+    _current.reset(token)
+
+def current_request() -> Optional[RequestStats]:
+    return _current.get()
+
+def record_span(span: str, seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        stats.add(span, seconds)
+
+@contextmanager
+def timed(span: str):
+    """Attribute the enclosed block's wall time to `span` of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(span, time.perf_counter() - start)
+
+def instrument_engine(engine, name: str):
+    """Count and time every statement of a (sync) engine; pass async_engine.sync_engine for async"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_queries.inc(name)
+        db_query_latency.observe(elapsed, name)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.add("db", elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
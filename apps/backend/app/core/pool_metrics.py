@@ -0,0 +1,93 @@
+# backend/app/core/pool_metrics.py
+"""
+Checkout-wait instrumentation for the SQLAlchemy connection pools.
+Records how long callers wait for a pooled connection so the pool can be
+sized from measured latency instead of guesses.
+"""
+import threading
+import time
+from typing import Dict
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+
+# histogram upper bounds, in seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class CheckoutWaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.buckets = [0] * len(WAIT_BUCKETS)
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.count += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+                    break
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, n in zip(WAIT_BUCKETS, self.buckets):
+                running += n
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = self.count
+            return {
+                "checkouts": self.count,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_max": round(self.max_wait, 6),
+                "wait_seconds_mean": round(self.total_wait / self.count, 6) if self.count else 0.0,
+                "wait_seconds_buckets": cumulative,
+            }
+
+class _InstrumentedMixin:
+    @property
+    def checkout_stats(self) -> CheckoutWaitStats:
+        stats = self.__dict__.get("_checkout_stats")
+        if stats is None:
+            stats = self.__dict__["_checkout_stats"] = CheckoutWaitStats()
+        return stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_stats.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_stats.observe(time.perf_counter() - start)
+        return conn
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+def describe_pool(pool: Pool) -> Dict:
+    """Current occupancy plus checkout-wait stats for a pool"""
+    out = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, _InstrumentedMixin):
+        out.update(pool.checkout_stats.snapshot())
+    return out
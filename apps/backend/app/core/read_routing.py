@@ -0,0 +1,199 @@
+# backend/app/core/read_routing.py
+"""
+Read-replica routing for read-only GET routes.
+
+Routes that take their session from get_read_db (or their repositories from
+get_read_storage) read from one of DATABASE_REPLICA_URLS, round-robin,
+unless:
+- the caller made a successful write request within the read-your-writes
+  window: ReadYourWritesMiddleware bumps the caller's writes:{id} scope in
+  app.core.versions before the write's response goes out, so with
+  CACHE_BACKEND=redis this holds across workers
+- no replica's lag, measured in the background every
+  DB_REPLICA_LAG_CHECK_SECONDS, is within DB_REPLICA_MAX_LAG_SECONDS (a
+  replica that cannot be reached, or was not measured recently, counts as
+  lagging)
+in which case the primary serves the read. Everything else keeps using
+get_async_db.
+
+A replica may still be missing writes made by other users. The window lasts
+at least max lag + two checks, so any such write is one that was versioned
+inside the window, and conditional GETs served by a replica send no
+validators for scopes changed that recently (app.core.etag). That way a
+client never caches old rows under a new version's ETag.
+
+Lag on PostgreSQL: zero once the replica has replayed the primary's WAL
+position (read just before), otherwise the age of its last replayed
+transaction. Other databases, and servers that are not standbys, report no
+lag. To try it locally, point DATABASE_REPLICA_URLS at a second PostgreSQL
+instance or at a read-only copy of a SQLite database
+(sqlite:///file:replica.db?mode=ro&uri=true).
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.auth_middleware import get_current_user, verify_token
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine, replica_engines
+from app.core.metrics import registry, Counter
+from app.core.versions import versions, writer_scope
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_PRIMARY_LSN = text("SELECT pg_current_wal_lsn()::text")
+_REPLICA_LAG = text(
+    "SELECT pg_is_in_recovery() AS standby, "
+    "pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn) AS caught_up, "
+    "EXTRACT(EPOCH FROM clock_timestamp() - pg_last_xact_replay_timestamp()) AS behind"
+)
+
+db_reads = registry.register(Counter(
+    "db_reads_total", "Sessions handed out by get_read_db: replica, or primary and why", ("target",)))
+
+def read_your_writes_seconds() -> float:
+    """How long after a write reads of it stay on the primary"""
+    return max(settings.DB_READ_YOUR_WRITES_SECONDS,
+               settings.DB_REPLICA_MAX_LAG_SECONDS + 2 * settings.DB_REPLICA_LAG_CHECK_SECONDS)
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # seconds behind the primary; None until measured, inf when unreachable
+        self.lag: Optional[float] = None
+        self.measured_at = 0.0
+
+    def usable(self, now: float) -> bool:
+        return (self.lag is not None and self.lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+                and now - self.measured_at <= 2 * settings.DB_REPLICA_LAG_CHECK_SECONDS)
+
+async def _primary_lsn() -> Optional[str]:
+    if async_engine.dialect.name != "postgresql":
+        return None
+    async with async_engine.connect() as conn:
+        return (await conn.execute(_PRIMARY_LSN)).scalar()
+
+async def _replica_lag(engine: AsyncEngine, lsn: Optional[str]) -> float:
+    async with engine.connect() as conn:
+        if engine.dialect.name != "postgresql":
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+        row = (await conn.execute(_REPLICA_LAG, {"lsn": lsn})).one()
+    if not row.standby or row.caught_up:
+        return 0.0
+    return math.inf if row.behind is None else max(float(row.behind), 0.0)
+
+class ReadRouter:
+    """Picks the replica for a read; lag is measured off the request path"""
+    def __init__(self, engines: List[AsyncEngine]):
+        self.replicas = [Replica(f"replica{i}", e) for i, e in enumerate(engines)]
+        self._next = 0
+        self._probe: Optional[asyncio.Task] = None
+        self._probed_at = 0.0
+
+    async def _measure_one(self, replica: Replica, lsn: Optional[str], started: float):
+        try:
+            lag = await asyncio.wait_for(_replica_lag(replica.engine, lsn), settings.DB_REPLICA_MAX_LAG_SECONDS)
+        except asyncio.TimeoutError:
+            lag = math.inf
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("replica %s unreachable, reading from the primary: %s", replica.name, e)
+            lag = math.inf
+        # stamped with the start: the replica was at least this fresh then
+        replica.lag, replica.measured_at = lag, started
+
+    async def measure(self):
+        started = time.monotonic()
+        try:
+            lsn = await _primary_lsn()
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("primary WAL position unavailable: %s", e)
+            lsn = None
+        await asyncio.gather(*(self._measure_one(r, lsn, started) for r in self.replicas))
+
+    def _refresh(self):
+        now = time.monotonic()
+        if (self._probe is None or self._probe.done()) and now - self._probed_at >= settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            self._probed_at = now
+            self._probe = asyncio.create_task(self.measure())
+
+    def pick(self) -> Optional[Replica]:
+        """The next replica within the lag limit, or None"""
+        self._refresh()
+        now = time.monotonic()
+        fresh = [r for r in self.replicas if r.usable(now)]
+        if not fresh:
+            return None
+        self._next = (self._next + 1) % len(fresh)
+        return fresh[self._next]
+
+    async def choose(self, user_id: str) -> Optional[Replica]:
+        """Where `user_id`'s read goes: a replica, or None for the primary"""
+        replica = self.pick()
+        if replica is None:
+            db_reads.inc("primary_lagging")
+            return None
+        scope = writer_scope(user_id)
+        current = await versions.get([scope])
+        if current is None or time.time() - current[scope][1] < read_your_writes_seconds():
+            db_reads.inc("primary_recent_write")
+            return None
+        db_reads.inc("replica")
+        return replica
+
+    def stats(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        return {
+            r.name: {"lag": r.lag, "measured_ago": round(now - r.measured_at, 3) if r.measured_at else None,
+                     "usable": r.usable(now)}
+            for r in self.replicas
+        }
+
+read_router = ReadRouter(replica_engines)
+
+async def get_read_db(request: Request, current=Depends(get_current_user)):
+    """FastAPI dependency for read-only routes: a session on a fresh replica, or on the primary"""
+    replica = await read_router.choose(current["id"]) if read_router.replicas else None
+    request.state.read_replica = replica is not None
+    if replica is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    async with AsyncSessionLocal(bind=replica.engine, info={"replica": replica.name}) as db:
+        yield db
+
+async def _caller(scope) -> Optional[str]:
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1").split()
+    if len(authorization) != 2 or authorization[0].lower() != "bearer":
+        return None
+    try:
+        return (await verify_token(authorization[1]))["id"]
+    except HTTPException:
+        return None
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware: bumps the caller's writes:{id} scope before a successful write's response starts"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = await _caller(scope)
+                if user_id:
+                    await versions.bump(writer_scope(user_id))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
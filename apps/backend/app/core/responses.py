@@ -0,0 +1,43 @@
+# backend/app/core/responses.py
+"""
+JSON response pipeline.
+
+ORJSONResponse is the app's default response class: orjson when installed,
+compact stdlib json otherwise. Handlers on hot paths return it directly via
+fast_response(), which skips FastAPI's jsonable_encoder / response_model pass.
+With STRICT_RESPONSES=true they return plain data instead, so FastAPI
+validates it against the route's Pydantic response_model.
+"""
+import json
+from typing import Any
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            if orjson is not None:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def fast_response(content: Any, response: Response | None = None, status_code: int = 200):
+    """
+    Serialize content straight to JSON bytes, keeping headers already set on the
+    handler's `response` parameter (ETag, Last-Modified). In strict mode the content
+    is returned as-is for response_model validation instead.
+    """
+    if settings.STRICT_RESPONSES:
+        return content
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
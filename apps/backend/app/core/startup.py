@@ -0,0 +1,42 @@
+# backend/app/core/startup.py
+"""
+Boot timing: how long importing the app and each startup step took, logged
+once the app is ready and served by GET /api/health/startup. Imported first
+by app.main, so "imports" covers everything the app pulls in after it.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class StartupTimer:
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._mark = self._t0
+        self.phases: Dict[str, float] = {}
+        self.ready_ms = None
+
+    def mark(self, name: str):
+        """Close a phase that started at the previous mark"""
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._mark) * 1000, 1)
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        self._mark = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def ready(self):
+        self.ready_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+
+    def report(self) -> Dict:
+        return {"phases_ms": dict(self.phases), "ready_ms": self.ready_ms}
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases.items())
+        return f"startup: {parts}; ready {self.ready_ms:.0f} ms after import"
+
+startup = StartupTimer()
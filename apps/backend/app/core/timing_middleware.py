@@ -0,0 +1,137 @@
+# backend/app/core/timing_middleware.py
+"""
+ASGI middleware timing every HTTP request.
+
+Records per-route latency, status and query-count metrics (app.core.metrics),
+logs requests that look like N+1 query loops, optionally adds a Server-Timing
+header, and profiles a sampled fraction of requests, keeping the profile
+only when the request turned out slower than SLOW_REQUEST_MS. Profiles use
+pyinstrument when installed (async-aware HTML), cProfile otherwise.
+"""
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime
+from app.core.config import settings
+from app.core.metrics import (
+    begin_request, end_request, http_requests, http_latency, request_queries, request_span_seconds,
+    slow_requests,
+)
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks the whole thread, so at most one request is profiled at a time
+_profiling = False
+
+# long-lived streams: their duration is the client's session, not latency
+UNTIMED_PATHS = {f"{settings.API_PREFIX}/events", f"{settings.API_PREFIX}/events/"}
+
+def route_label(scope) -> str:
+    """Route template (/api/tasks/{task_id}) rather than the raw path, to bound label cardinality"""
+    template = getattr(scope.get("route"), "path_format", None)
+    if not template:
+        return "unmatched"
+    try:
+        rendered = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if path.endswith(rendered):
+        # routes of an included router may carry only their own part of the template, not the prefix
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+def _profiler_class():
+    # imported on the first sampled request, not at boot
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return None
+    return Profiler
+
+class _Profile:
+    def __init__(self):
+        self._pyinstrument = _profiler_class()
+        if self._pyinstrument is not None:
+            self._p = self._pyinstrument(async_mode="enabled")
+            self._p.start()
+        else:
+            self._p = cProfile.Profile()
+            self._p.enable()
+
+    def stop(self):
+        if self._pyinstrument is not None:
+            self._p.stop()
+        else:
+            self._p.disable()
+
+    def dump(self, method: str, route: str, elapsed_ms: float) -> str:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stem = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{method}-{slug}-{elapsed_ms:.0f}ms"
+        if self._pyinstrument is not None:
+            path = os.path.join(settings.PROFILE_DIR, stem + ".html")
+            with open(path, "w") as f:
+                f.write(self._p.output_html())
+        else:
+            # inspect with `python -m pstats <file>` or snakeviz
+            path = os.path.join(settings.PROFILE_DIR, stem + ".prof")
+            self._p.dump_stats(path)
+        return path
+
+class TimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTIMED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        global _profiling
+        profile = None
+        if settings.PROFILE_SAMPLE_RATE > 0 and not _profiling and random.random() < settings.PROFILE_SAMPLE_RATE:
+            _profiling = True
+            profile = _Profile()
+        stats, token = begin_request()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", _server_timing(stats))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - stats.start
+            end_request(token)
+            method, route = scope["method"], route_label(scope)
+            http_requests.inc(method, route, str(status))
+            http_latency.observe(elapsed, method, route)
+            request_queries.observe(stats.queries, method, route)
+            for span, (_, seconds) in stats.spans.items():
+                request_span_seconds.observe(seconds, method, route, span)
+            if stats.queries >= settings.QUERY_COUNT_WARN > 0:
+                logger.warning("%s %s ran %d queries (possible N+1)", method, route, stats.queries)
+            elapsed_ms = elapsed * 1000
+            slow = elapsed_ms >= settings.SLOW_REQUEST_MS
+            if slow:
+                slow_requests.inc(method, route)
+            if profile is not None:
+                profile.stop()
+                _profiling = False
+                if slow:
+                    path = profile.dump(method, route, elapsed_ms)
+                    logger.warning("slow request %s %s took %.0f ms; profile written to %s",
+                                   method, route, elapsed_ms, path)
+
+def _server_timing(stats) -> bytes:
+    parts = [f"{span};dur={seconds * 1000:.1f}" for span, (_, seconds) in stats.spans.items()]
+    parts.append(f"app;dur={(time.perf_counter() - stats.start) * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
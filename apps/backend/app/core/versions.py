@@ -0,0 +1,123 @@
+# backend/app/core/versions.py
+"""
+Per-collection version counters for conditional GETs.
+
+Each scope ("users", "requests", "tasks:{user_id}") has a counter and a
+last-modified time, bumped after every committed write to that collection.
+"writes:{user_id}" is bumped after each successful write request of a user,
+for read-your-writes routing (app.core.read_routing).
+Reading them never touches the database. With CACHE_BACKEND=memory the
+counters live in this process, which is only correct with a single worker:
+a worker that never saw a write would answer 304 for stale data. So with
+WEB_CONCURRENCY above 1 memory counters validate nothing (no ETags, reads on
+the primary); use CACHE_BACKEND=redis to share them between workers.
+"""
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import uuid4
+from app.core.cache import load_redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# after a failed bump, refuse to validate anything for this long
+DEGRADED_SECONDS = 60
+
+def task_scope(user_id: str) -> str:
+    return f"tasks:{user_id}"
+
+def writer_scope(user_id: str) -> str:
+    return f"writes:{user_id}"
+
+USERS_SCOPE = "users"
+REQUESTS_SCOPE = "requests"
+
+class MemoryVersions:
+    def __init__(self, trusted: bool = True):
+        # a restart forgets the counters, so validators from before it must not match
+        self.epoch = uuid4().hex[:8]
+        self.started_at = time.time()
+        # False when other workers write without this process seeing it
+        self.trusted = trusted
+        self._versions: Dict[str, Tuple[int, float]] = {}
+
+    async def get(self, scopes: Iterable[str]) -> Optional[Dict[str, Tuple[int, float]]]:
+        """scope -> (version, last_modified); None when versions cannot be trusted"""
+        if not self.trusted:
+            return None
+        return {s: self._versions.get(s, (0, self.started_at)) for s in scopes}
+
+    async def bump(self, *scopes: str):
+        self.bump_sync(*scopes)
+
+    def bump_sync(self, *scopes: str):
+        now = time.time()
+        for scope in scopes:
+            self._versions[scope] = (self._versions.get(scope, (0, 0.0))[0] + 1, now)
+
+class RedisVersions:
+    """Counters in one Redis hash: field scope -> version, field scope@t -> last modified"""
+    def __init__(self, url: str):
+        self._redis, aioredis = load_redis()
+        self.epoch = "r"
+        self._key = f"{settings.APP_ID}:versions"
+        self._url = url
+        self._client = aioredis.from_url(url)
+        self._sync_client = None
+        self._degraded_until = 0.0
+
+    def _degrade(self, e: Exception):
+        # a lost bump would let clients keep a stale copy, so stop answering 304 for a while
+        logger.error("version bump failed, conditional GETs disabled for %ss: %s", DEGRADED_SECONDS, e)
+        self._degraded_until = time.monotonic() + DEGRADED_SECONDS
+
+    async def get(self, scopes: Iterable[str]) -> Optional[Dict[str, Tuple[int, float]]]:
+        if time.monotonic() < self._degraded_until:
+            return None
+        scopes = list(scopes)
+        fields = [f for s in scopes for f in (s, f"{s}@t")]
+        try:
+            values = await self._client.hmget(self._key, fields)
+        except (self._redis.RedisError, OSError) as e:
+            logger.warning("version lookup failed: %s", e)
+            return None
+        return {
+            s: (int(values[2 * i] or 0), float(values[2 * i + 1] or 0.0))
+            for i, s in enumerate(scopes)
+        }
+
+    async def bump(self, *scopes: str):
+        now = time.time()
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                for scope in scopes:
+                    pipe.hincrby(self._key, scope, 1)
+                    pipe.hset(self._key, f"{scope}@t", now)
+                await pipe.execute()
+        except (self._redis.RedisError, OSError) as e:
+            self._degrade(e)
+
+    def bump_sync(self, *scopes: str):
+        if self._sync_client is None:
+            self._sync_client = self._redis.Redis.from_url(self._url)
+        now = time.time()
+        try:
+            with self._sync_client.pipeline(transaction=True) as pipe:
+                for scope in scopes:
+                    pipe.hincrby(self._key, scope, 1)
+                    pipe.hset(self._key, f"{scope}@t", now)
+                pipe.execute()
+        except (self._redis.RedisError, OSError) as e:
+            self._degrade(e)
+
+def _make_versions():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisVersions(settings.REDIS_URL)
+    if settings.WEB_CONCURRENCY > 1:
+        logger.warning("CACHE_BACKEND=memory with WEB_CONCURRENCY=%s: per-worker version counters cannot "
+                       "validate ETags, conditional GETs are off; set CACHE_BACKEND=redis", settings.WEB_CONCURRENCY)
+        return MemoryVersions(trusted=False)
+    return MemoryVersions()
+
+versions = _make_versions()
@@ -1,61 +1,263 @@
 # backend/app/crud/task_crud.py
+from sqlalchemy import select, insert, update, func, tuple_
 from sqlalchemy.orm import Session
-from app.models.task_model import Task
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import utcnow
+from app.core.versions import versions, task_scope
+from app.models.task_model import Task, parse_work_date
+from app.services.report_service import apply_rollup_deltas, apply_rollup_deltas_async, apply_task_edits_async
+from app.services.sync_service import record_task_changes, record_task_changes_async
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List, Optional
+from datetime import date, timedelta
+import base64
+import json
 import uuid
-from datetime import datetime
 
-def create_tasks_for_user(user_id: str, tasks: List[dict], db: Session):
-    """Create multiple tasks for a user"""
-    created = []
-    for t in tasks:
-        task_id = str(uuid.uuid4())
-        db_task = Task(
-            id=task_id,
-            user_id=user_id,
-            project=t["project"],
-            task_name=t["taskName"],
-            hour=t["hour"],
-            billing_status=t.get("billing_status", "pending"),
-            date=t["date"],
-            status="submitted",
-            edit_request_pending=False,
-            created_at=datetime.utcnow()
-        )
-        db.add(db_task)
-        created.append(db_task)
-    
-    db.commit()
-    
+def _task_to_dict(t: Task) -> dict:
+    return {
+        "id": t.id,
+        "userId": t.user_id,
+        "project": t.project,
+        "taskName": t.task_name,
+        "hour": t.hour,
+        "billing_status": t.billing_status,
+        "date": t.date,
+        "status": t.status,
+        "edit_request_pending": t.edit_request_pending
+    }
+
+# API field name -> column; selecting these skips ORM object construction entirely
+TASK_OUT_COLUMNS = (
+    Task.id,
+    Task.user_id.label("userId"),
+    Task.project,
+    Task.task_name.label("taskName"),
+    Task.hour,
+    Task.billing_status,
+    Task.date,
+    Task.status,
+    Task.edit_request_pending,
+)
+TASK_OUT_FIELDS = tuple(c.key for c in TASK_OUT_COLUMNS)
+
+def _task_rows(user_id: str, tasks: List[dict]) -> List[dict]:
     return [
         {
-            "id": t.id,
-            "userId": t.user_id,
-            "project": t.project,
-            "taskName": t.task_name,
-            "hour": t.hour,
-            "billing_status": t.billing_status,
-            "date": t.date,
-            "status": t.status,
-            "edit_request_pending": t.edit_request_pending
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "project": t["project"],
+            "task_name": t["taskName"],
+            "hour": t["hour"],
+            "billing_status": t.get("billing_status", "pending"),
+            "date": t["date"],
+            "work_date": parse_work_date(t["date"]),
+            "status": "submitted",
+            "edit_request_pending": False,
         }
-        for t in created
+        for t in tasks
     ]
 
+def _bulk_insert_stmt():
+    # one multi-row INSERT ... VALUES per page of rows (SQLAlchemy "insertmanyvalues"),
+    # stamped with a single server-side timestamp and returning the stored rows
+    return (
+        insert(Task)
+        .values(created_at=utcnow())
+        .returning(*Task.__table__.c, sort_by_parameter_order=True)
+        .execution_options(insertmanyvalues_page_size=settings.TASK_INSERT_CHUNK)
+    )
+
+def create_tasks_for_user(user_id: str, tasks: List[dict], db: Session):
+    """Create multiple tasks for a user"""
+    rows = _task_rows(user_id, tasks)
+    if not rows:
+        return []
+    created = [_task_to_dict(t) for t in db.execute(_bulk_insert_stmt(), rows)]
+    apply_rollup_deltas(db, created)
+    record_task_changes(db, ((user_id, t["id"]) for t in created))
+    db.commit()
+    versions.bump_sync(task_scope(user_id))
+    return created
+
 def get_tasks_for_user(user_id: str, db: Session):
     """Get all tasks for a user"""
     tasks = db.query(Task).filter(Task.user_id == user_id).all()
-    out = []
+    return [_task_to_dict(t) for t in tasks]
+
+async def _copy_tasks(rows: List[dict], db: AsyncSession):
+    # PostgreSQL COPY via asyncpg for very large backfills; ids are generated
+    # client-side, so the stored rows are known without RETURNING
+    created_at = (await db.execute(select(utcnow()))).scalar_one()
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    columns = list(rows[0].keys()) + ["created_at"]
+    await raw.driver_connection.copy_records_to_table(
+        Task.__tablename__,
+        records=[tuple(r.values()) + (created_at,) for r in rows],
+        columns=columns,
+    )
+    return [SimpleNamespace(**r, created_at=created_at) for r in rows]
+
+async def _insert_rows_async(rows: List[dict], db: AsyncSession) -> List[dict]:
+    if not rows:
+        return []
+    use_copy = (
+        settings.TASK_COPY_THRESHOLD > 0
+        and len(rows) >= settings.TASK_COPY_THRESHOLD
+        and db.bind.dialect.driver == "asyncpg"
+    )
+    if use_copy:
+        stored = await _copy_tasks(rows, db)
+    else:
+        stored = (await db.execute(_bulk_insert_stmt(), rows)).all()
+    return [_task_to_dict(t) for t in stored]
+
+# optional hook run with the stored rows just before commit (e.g. to save an idempotency record
+# in the same transaction)
+BeforeCommit = Optional[Callable[[dict], Awaitable[None]]]
+
+async def create_tasks_for_user_async(user_id: str, tasks: List[dict], db: AsyncSession,
+                                      before_commit: BeforeCommit = None):
+    """Create multiple tasks for a user without blocking the event loop"""
+    created = await _insert_rows_async(_task_rows(user_id, tasks), db)
+    if not created:
+        return []
+    await apply_rollup_deltas_async(db, created)
+    await record_task_changes_async(db, ((user_id, t["id"]) for t in created))
+    if before_commit:
+        await before_commit({"created": created, "inserted": len(created), "updated": 0, "skipped": 0})
+    await db.commit()
+    await versions.bump(task_scope(user_id))
+    return created
+
+def natural_key(task: dict) -> tuple:
+    """(date, project, task name) - with the user id, what makes two submissions the same task"""
+    return task["date"], task["project"], task["taskName"]
+
+def plan_upsert(tasks: List[dict], existing: dict, on_duplicate: str) -> tuple:
+    """
+    Match a submission against the user's stored tasks ({natural key: task}). Repeats inside
+    the payload collapse to their last occurrence; dates compare as given.
+    Returns (submitted {key: payload}, payloads to insert, [(old, new)] updates, {key: task} kept)
+    """
+    submitted = {}
     for t in tasks:
-        out.append({
-            "id": t.id,
-            "userId": t.user_id,
-            "project": t.project,
-            "taskName": t.task_name,
-            "hour": t.hour,
-            "billing_status": t.billing_status,
-            "date": t.date,
-            "status": t.status,
-            "edit_request_pending": t.edit_request_pending
-        })
-    return out
+        submitted[natural_key(t)] = t
+    new, changes, kept = [], [], {}
+    for key, t in submitted.items():
+        old = existing.get(key)
+        if old is None:
+            new.append(t)
+            continue
+        updated = {**old, "hour": t["hour"], "billing_status": t.get("billing_status", "pending")}
+        if on_duplicate == "update" and (updated["hour"], updated["billing_status"]) != (old["hour"], old["billing_status"]):
+            changes.append((old, updated))
+            kept[key] = updated
+        else:
+            kept[key] = old
+    return submitted, new, changes, kept
+
+def upsert_outcome(submitted: dict, inserted: List[dict], changes: list, kept: dict) -> dict:
+    """{"created": rows in payload order, "inserted": n, "updated": n, "skipped": n}"""
+    result = {**kept, **{natural_key(t): t for t in inserted}}
+    return {
+        "created": [result[k] for k in submitted],
+        "inserted": len(inserted),
+        "updated": len(changes),
+        "skipped": len(submitted) - len(inserted) - len(changes),
+    }
+
+async def upsert_tasks_for_user_async(user_id: str, tasks: List[dict], db: AsyncSession,
+                                      on_duplicate: str = "skip", before_commit: BeforeCommit = None) -> dict:
+    """
+    Insert only tasks whose natural key is new for the user. Existing ones are returned as
+    stored (skip) or take the submitted hour / billing_status (update, for backfill imports).
+    Returns {"created": rows in payload order, "inserted": n, "updated": n, "skipped": n}
+    """
+    if db.bind.dialect.name == "postgresql":
+        # one natural-key writer per user at a time, so concurrent retries cannot both insert
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(user_id))))
+    existing = {}
+    dates = sorted({t["date"] for t in tasks})
+    for i in range(0, len(dates), settings.TASK_INSERT_CHUNK):
+        chunk = dates[i:i + settings.TASK_INSERT_CHUNK]
+        # work_date narrows the lookup to the partitions of the submitted months
+        stmt = select(*TASK_OUT_COLUMNS).where(Task.user_id == user_id, Task.date.in_(chunk),
+                                               Task.work_date.in_({parse_work_date(d) for d in chunk}))
+        for r in await db.execute(stmt):
+            row = dict(zip(TASK_OUT_FIELDS, r))
+            existing.setdefault(natural_key(row), row)
+
+    submitted, new, changes, kept = plan_upsert(tasks, existing, on_duplicate)
+    inserted = await _insert_rows_async(_task_rows(user_id, new), db)
+    if changes:
+        # ORM bulk UPDATE by primary key (id, work_date): one executemany for the whole batch
+        await db.execute(update(Task), [
+            {"id": new["id"], "work_date": parse_work_date(new["date"]), "hour": new["hour"],
+             "billing_status": new["billing_status"]}
+            for _, new in changes
+        ])
+    # inserts and edits in one pass of rollup upserts
+    await apply_task_edits_async(db, changes, inserted=inserted)
+    await record_task_changes_async(db, ((user_id, t["id"]) for t in inserted + [new for _, new in changes]))
+    outcome = upsert_outcome(submitted, inserted, changes, kept)
+    if before_commit:
+        await before_commit(outcome)
+    await db.commit()
+    if inserted or changes:
+        await versions.bump(task_scope(user_id))
+    return outcome
+
+async def get_tasks_for_user_async(user_id: str, db: AsyncSession):
+    """Get all tasks for a user without blocking the event loop"""
+    result = await db.execute(select(Task).where(Task.user_id == user_id))
+    return [_task_to_dict(t) for t in result.scalars()]
+
+def encode_cursor(task_date: str, task_id: str) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    raw = json.dumps([task_date, task_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        task_date, task_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    return str(task_date), str(task_id)
+
+def filter_tasks(stmt, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                 project: Optional[str] = None, status: Optional[str] = None,
+                 billing_status: Optional[str] = None):
+    """Push the optional task filters into the WHERE clause"""
+    # dates are ISO strings (YYYY-MM-DD or full ISO), so string ranges sort correctly;
+    # date_to is inclusive of the whole day. The same bounds on work_date let PostgreSQL prune
+    # month partitions, while the string bounds keep the (user_id, date, id) index usable
+    if date_from:
+        stmt = stmt.where(Task.date >= date_from.isoformat(), Task.work_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Task.date < (date_to + timedelta(days=1)).isoformat(), Task.work_date <= date_to)
+    if project:
+        stmt = stmt.where(Task.project == project)
+    if status:
+        stmt = stmt.where(Task.status == status)
+    if billing_status:
+        stmt = stmt.where(Task.billing_status == billing_status)
+    return stmt
+
+async def get_tasks_page_async(user_id: str, db: AsyncSession, limit: int = 100,
+                               cursor: Optional[str] = None, **filters):
+    """One keyset page of a user's tasks ordered by (date, id), read as plain column tuples"""
+    stmt = select(*TASK_OUT_COLUMNS).where(Task.user_id == user_id)
+    stmt = filter_tasks(stmt, **filters)
+    if cursor:
+        stmt = stmt.where(tuple_(Task.date, Task.id) > tuple_(*decode_cursor(cursor)))
+    # fetch one extra row to know whether another page exists
+    stmt = stmt.order_by(Task.date, Task.id).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].date, page[-1].id) if len(rows) > limit else None
+    return {"items": [dict(zip(TASK_OUT_FIELDS, r)) for r in page], "next_cursor": next_cursor}
@@ -1,50 +1,90 @@
 # backend/app/crud/user_crud.py
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.core.versions import versions, USERS_SCOPE
 from app.models.user_model import User, UserRole
 from datetime import datetime
+from typing import List
 
-def create_user_doc(user: dict, db: Session):
-    """Create a new user
-    user: { userId, firstName, lastName, role }
-    """
-    db_user = User(
+# profile dicts keyed by user id, plus the full admin list under ALL_USERS
+user_cache = make_cache("users", settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+ALL_USERS = "__all__"
+
+def _user_to_dict(u: User) -> dict:
+    return {
+        "id": u.id,
+        "name": f"{u.first_name} {u.last_name}",
+        "role": u.role.value,
+        "creation_date": u.created_at.isoformat()
+    }
+
+def _build_user(user: dict) -> User:
+    return User(
         id=user["userId"],
         first_name=user["firstName"],
         last_name=user["lastName"],
         role=UserRole[user.get("role", "employee")],
         created_at=datetime.utcnow()
     )
+
+def create_user_doc(user: dict, db: Session):
+    """Create a new user
+    user: { userId, firstName, lastName, role }
+    """
+    db_user = _build_user(user)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return {
-        "id": db_user.id,
-        "name": f"{db_user.first_name} {db_user.last_name}",
-        "role": db_user.role.value,
-        "creation_date": db_user.created_at.isoformat()
-    }
+    user_cache.invalidate(db_user.id, ALL_USERS)
+    versions.bump_sync(USERS_SCOPE)
+    return _user_to_dict(db_user)
 
 def list_users(db: Session):
     """List all users"""
     users = db.query(User).all()
-    return [
-        {
-            "id": u.id,
-            "name": f"{u.first_name} {u.last_name}",
-            "role": u.role.value,
-            "creation_date": u.created_at.isoformat()
-        }
-        for u in users
-    ]
+    return [_user_to_dict(u) for u in users]
 
 def get_user(user_id: str, db: Session):
     """Get user by ID"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         return None
-    return {
-        "id": user.id,
-        "name": f"{user.first_name} {user.last_name}",
-        "role": user.role.value,
-        "creation_date": user.created_at.isoformat()
-    }
+    return _user_to_dict(user)
+
+async def create_user_doc_async(user: dict, db: AsyncSession):
+    """Create a new user without blocking the event loop"""
+    return (await create_users_async([user], db))[0]
+
+async def create_users_async(users: List[dict], db: AsyncSession) -> List[dict]:
+    """Create several users in one commit"""
+    db_users = [_build_user(u) for u in users]
+    db.add_all(db_users)
+    await db.commit()
+    await invalidate_user(*(u.id for u in db_users))
+    return [_user_to_dict(u) for u in db_users]
+
+async def invalidate_user(*user_ids: str):
+    """Drop users' cached profiles and the cached user list; call after any user write"""
+    await user_cache.delete(*user_ids, ALL_USERS)
+    await versions.bump(USERS_SCOPE)
+
+def _fill_ttl(db: AsyncSession):
+    # rows read on a replica may predate the invalidation that emptied the entry: serve them, don't cache
+    return 0 if db.info.get("replica") else None
+
+async def list_users_async(db: AsyncSession):
+    """List all users, served from the user cache when possible"""
+    async def load():
+        result = await db.execute(select(User))
+        return [_user_to_dict(u) for u in result.scalars()]
+    return await user_cache.get_or_load(ALL_USERS, load, ttl=_fill_ttl(db))
+
+async def get_user_async(user_id: str, db: AsyncSession):
+    """Get user by ID, served from the user cache when possible"""
+    async def load():
+        user = await db.get(User, user_id)
+        return _user_to_dict(user) if user else None
+    return await user_cache.get_or_load(user_id, load, ttl=_fill_ttl(db))
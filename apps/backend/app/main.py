@@ -1,17 +1,62 @@
 # backend/app/main.py
-from fastapi import FastAPI
+# first, so the startup "imports" phase covers everything below
+from app.core.startup import startup
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+import hmac
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 import os
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import auth, users, tasks, requests as requests_api
+from app.core.database import async_engine, Base, pool_status
+from app.core.firestore_client import init_firestore
+from app.core.responses import ORJSONResponse
+from app.core.metrics import registry
+from app.core.events import events
+from app.core.timing_middleware import TimingMiddleware
+from app.core.read_routing import ReadYourWritesMiddleware, read_router
+from app.core.auth_middleware import get_current_user, get_token, token_cache_stats, verify_token
+from app.crud.user_crud import user_cache
+from app.services.job_service import worker as job_worker
+from app.api import auth, users, tasks, reports, analytics, jobs, events as events_api, requests as requests_api
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
 
+# Schema changes are applied by `alembic upgrade head` (or `python -m app.cli create-schema`
+# for a scratch database), not on every worker boot; DB_AUTO_CREATE=true restores that for local dev
 
-app = FastAPI(title="TaskTrack API")
+async def warm_up():
+    """Open one pooled DB connection (and the Firestore client, if used) before the first request"""
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    if settings.STORAGE_BACKEND == "firestore":
+        await asyncio.to_thread(init_firestore)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.mark("imports")
+    if settings.DB_AUTO_CREATE:
+        with startup.phase("create_schema"):
+            async with async_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+    if settings.STARTUP_WARMUP:
+        with startup.phase("warmup"):
+            await warm_up()
+    # in-process job workers; set JOB_WORKERS=0 and run `python -m app.services.job_service` to split them out
+    if settings.JOB_WORKERS > 0:
+        job_worker.start(settings.JOB_WORKERS)
+    startup.ready()
+    logger.info(startup.summary())
+    yield
+    await job_worker.stop()
+    await events.close()
+
+
+app = FastAPI(title="TaskTrack API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS: Restrict origins in production for security
 if os.getenv("ENV", "development") == "production":
@@ -28,6 +73,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# records who just wrote, so their reads stay on the primary
+if read_router.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+# outermost, so latency covers CORS handling and the whole response body
+if settings.METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware)
 
 # include routers
 
@@ -36,7 +87,50 @@ app.include_router(auth.router, prefix=f"{settings.API_PREFIX}/auth", tags=["aut
 app.include_router(users.router, prefix=f"{settings.API_PREFIX}/users", tags=["users"])
 app.include_router(tasks.router, prefix=f"{settings.API_PREFIX}/tasks", tags=["tasks"])
 app.include_router(requests_api.router, prefix=f"{settings.API_PREFIX}/requests", tags=["requests"])
+app.include_router(reports.router, prefix=f"{settings.API_PREFIX}/reports", tags=["reports"])
+app.include_router(analytics.router, prefix=f"{settings.API_PREFIX}/analytics", tags=["analytics"])
+app.include_router(jobs.router, prefix=f"{settings.API_PREFIX}/jobs", tags=["jobs"])
+app.include_router(events_api.router, prefix=f"{settings.API_PREFIX}/events", tags=["events"])
 
 @app.get("/")
 def home():
     return {"message": "API is running successfully"}
+
+
+# health and metrics endpoints expose pool, cache, replica and traffic internals: admins only
+
+def _require_admin(current=Depends(get_current_user)):
+    if current.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+
+async def _metrics_reader(authorization: str | None = Header(default=None)):
+    token = await get_token(authorization)
+    if settings.METRICS_TOKEN and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    _require_admin(await verify_token(token))
+
+@app.get(f"{settings.API_PREFIX}/health/db", dependencies=[Depends(_require_admin)])
+def db_health():
+    # pool occupancy and checkout-wait latency, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW; replica lag
+    return {**pool_status(), "replica_lag": read_router.stats()}
+
+@app.get(f"{settings.API_PREFIX}/health/startup", dependencies=[Depends(_require_admin)])
+def startup_health():
+    # import / startup-step timings of this worker, in ms
+    return startup.report()
+
+@app.get(f"{settings.API_PREFIX}/health/cache", dependencies=[Depends(_require_admin)])
+def cache_health():
+    # hit / miss counters of the read-through caches
+    return {"users": user_cache.stats(), "tokens": token_cache_stats()}
+
+@app.get(f"{settings.API_PREFIX}/health/events", dependencies=[Depends(_require_admin)])
+def events_health():
+    # open event streams / channels of this worker
+    return events.stats()
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(_metrics_reader)])
+    def metrics():
+        # Prometheus scrape endpoint: an admin JWT or METRICS_TOKEN as the bearer token
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,26 @@
+# backend/app/models/change_model.py
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index
+from datetime import datetime
+
+from app.core.database import Base
+
+# SQLAlchemy ORM Model
+# Append-only log of task writes for delta sync (GET /api/tasks/changes), written by
+# app.services.sync_service in the same transaction as the write itself; a task shows up
+# once per write, its current state is read from the tasks themselves
+class TaskChange(Base):
+    __tablename__ = "task_changes"
+
+    # monotonic across all users; clients keep the last one they applied as their cursor
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False)
+    task_id = Column(String, nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # per-user delta reads: WHERE user_id = ? AND seq > ? ORDER BY seq
+        Index("ix_task_changes_user_seq", "user_id", "seq"),
+        # retention sweep and the settled head cursor
+        Index("ix_task_changes_changed_at", "changed_at"),
+    )
+
@@ -0,0 +1,24 @@
+# backend/app/models/idempotency_model.py
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Index
+from datetime import datetime
+
+from app.core.database import Base
+
+# SQLAlchemy ORM Model
+# Stored outcome of a write made with an Idempotency-Key header; retries with the same key get it back
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # sha256 of the request (route + body); a reused key with a different request is rejected
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    # compact record the response is rebuilt from (created ids and counts), not the body itself
+    response = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # expiry sweep: DELETE ... WHERE created_at < ?
+        Index("ix_idempotency_keys_created", "created_at"),
+    )
@@ -0,0 +1,73 @@
+# backend/app/models/job_model.py
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index
+from datetime import datetime, date
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, Literal, Optional
+
+from app.core.database import Base
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+# SQLAlchemy ORM Model
+# Durable background jobs, claimed and run by app.services.job_service workers
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)
+    type = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    params = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    # set by an admin; the worker stops at its next chunk boundary
+    cancel_requested = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # refreshed after every chunk; a running job with a stale heartbeat is re-queued
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # worker claim query: WHERE status = 'queued' ORDER BY created_at
+        Index("ix_jobs_status_created", "status", "created_at"),
+    )
+
+# Pydantic Models for API
+class BillingTransitionCreate(BaseModel):
+    project: str
+    date_from: date
+    date_to: date
+    # only tasks currently in this status move; None moves every task not already in to_status
+    from_status: Optional[str] = None
+    to_status: str = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        if self.from_status == self.to_status:
+            raise ValueError("from_status and to_status must differ")
+        return self
+
+class ArchivePeriodCreate(BaseModel):
+    # a month that has ended and whose tasks are all billed, YYYY-MM
+    month: str = Field(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+
+class JobOut(BaseModel):
+    id: str
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    params: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    cancel_requested: bool
+    created_by: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
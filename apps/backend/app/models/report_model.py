@@ -0,0 +1,36 @@
+# backend/app/models/report_model.py
+from sqlalchemy import Column, String, Float, Integer
+
+from app.core.database import Base
+
+# SQLAlchemy ORM Models
+# Pre-aggregated hour totals, maintained incrementally by app.services.report_service.
+# Day / period keys are ISO date strings (YYYY-MM-DD) like Task.date.
+class UserProjectDayHours(Base):
+    __tablename__ = "hours_user_project_day"
+
+    user_id = Column(String, primary_key=True)
+    project = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)
+    billing_status = Column(String, primary_key=True)
+    hours = Column(Float, nullable=False, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
+
+# Per-user daily totals across projects and billing statuses, for utilization / overtime analytics
+class UserDayHours(Base):
+    __tablename__ = "hours_user_day"
+
+    user_id = Column(String, primary_key=True)
+    day = Column(String, primary_key=True)
+    hours = Column(Float, nullable=False, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
+
+class ProjectPeriodHours(Base):
+    __tablename__ = "hours_project_period"
+
+    project = Column(String, primary_key=True)
+    period = Column(String, primary_key=True)  # week / month
+    period_start = Column(String, primary_key=True)  # Monday of the week or 1st of the month
+    billing_status = Column(String, primary_key=True)
+    hours = Column(Float, nullable=False, default=0)
+    task_count = Column(Integer, nullable=False, default=0)
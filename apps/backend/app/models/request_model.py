@@ -1,6 +1,36 @@
 # backend/app/models/request_model.py
-from pydantic import BaseModel
-from typing import Optional
+from sqlalchemy import Column, String, Float, ForeignKey, Index
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.core.database import Base
+
+# SQLAlchemy ORM Model
+# Edit requests for STORAGE_BACKEND=sql; same fields as the Firestore request documents
+class EditRequest(Base):
+    __tablename__ = "edit_requests"
+
+    id = Column(String, primary_key=True)
+    # no foreign key: tasks are partitioned by month (their key is (id, work_date)) and archived
+    # months leave their requests behind as history
+    task_id = Column(String, nullable=False)
+    employee_id = Column(String, ForeignKey("users.id"), nullable=False)
+    employee_name = Column(String, nullable=False)
+    date = Column(String, nullable=False)  # ISO timestamp of submission
+    original_hours = Column(Float)
+    proposed_hours = Column(Float)
+    proposed_project = Column(String)
+    proposed_task_name = Column(String)
+    reason = Column(String)
+    status = Column(String, nullable=False, default="pending")
+    resolved_by = Column(String)
+    resolved_at = Column(String)
+
+    __table_args__ = (
+        # inbox pages: WHERE status = ? [AND employee_id = ?] ORDER BY date DESC, id DESC
+        Index("ix_edit_requests_status_date", "status", "date", "id"),
+        Index("ix_edit_requests_employee_status_date", "employee_id", "status", "date", "id"),
+    )
 
 class EditRequestCreate(BaseModel):
     proposedProject: str | None = None
@@ -16,3 +46,6 @@ class EditRequestOut(BaseModel):
     proposedHours: float
     reason: str | None = None
     status: str  # pending / approved / rejected
+
+class BulkResolvePayload(BaseModel):
+    requestIds: List[str] = Field(..., min_length=1, max_length=1000)
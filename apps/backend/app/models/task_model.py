@@ -1,12 +1,31 @@
 # backend/app/models/task_model.py
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Float, Date, DateTime, ForeignKey, Boolean, Index, DDL, event, func, literal_column
+from sqlalchemy.dialects import postgresql  # noqa: F401 - registers func.to_tsvector & co.
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional
 
 from app.core.database import Base
 
+# text search configuration of the full-text index (stemming: "migrations" matches "migration")
+SEARCH_CONFIG = "english"
+
+def search_document(task_name, project):
+    """
+    PostgreSQL tsvector over a task's name and project. Queries must use this exact
+    expression for the planner to pick ix_tasks_search.
+    """
+    text = task_name.op("||")(literal_column("' '")).op("||")(project)
+    return func.to_tsvector(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), text)
+
+def parse_work_date(value: str) -> date:
+    """Calendar day of a task's ISO date string (YYYY-MM-DD or full ISO)"""
+    return date.fromisoformat(value[:10])
+
+def _work_date_default(context):
+    return parse_work_date(context.get_current_parameters()["date"])
+
 # SQLAlchemy ORM Model
 class Task(Base):
     __tablename__ = "tasks"
@@ -18,6 +37,9 @@ class Task(Base):
     hour = Column(Float, nullable=False)
     billing_status = Column(String, default="pending")
     date = Column(String, nullable=False)  # ISO date string
+    # the day of `date` as a real DATE: partition key on PostgreSQL (one partition per month), and
+    # what date range filters prune on; part of the table's primary key there, as partitioning requires
+    work_date = Column(Date, primary_key=True, default=_work_date_default)
     status = Column(String, default="submitted")
     edit_request_pending = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -25,6 +47,21 @@ class Task(Base):
     # Relationship
     user = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        # keyset pagination: WHERE user_id = ? AND (date, id) > (?, ?) ORDER BY date, id
+        Index("ix_tasks_user_date_id", "user_id", "date", "id"),
+        # per-project date ranges (month-end billing transitions)
+        Index("ix_tasks_project_date", "project", "date"),
+        # full-text search over name + project; PostgreSQL keeps it current on every insert / update
+        Index("ix_tasks_search", search_document(task_name, project), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (work_date)"},
+    )
+
+# a partitioned table takes no rows until it has a partition: the default one catches any day
+# without a monthly partition (see app.services.partition_service)
+event.listen(Task.__table__, "after_create",
+             DDL("CREATE TABLE IF NOT EXISTS tasks_default PARTITION OF tasks DEFAULT").execute_if(dialect="postgresql"))
+
 # Pydantic Models for API
 class TaskCreate(BaseModel):
     project: str
@@ -33,6 +70,15 @@ class TaskCreate(BaseModel):
     billing_status: str
     date: str  # ISO date string YYYY-MM-DD or full ISO
 
+    @field_validator("date")
+    @classmethod
+    def check_date(cls, value: str) -> str:
+        try:
+            parse_work_date(value)
+        except ValueError:
+            raise ValueError("date must start with an ISO date (YYYY-MM-DD)")
+        return value
+
 class TaskOut(BaseModel):
     id: str
     userId: str
@@ -46,3 +92,34 @@ class TaskOut(BaseModel):
     
     class Config:
         from_attributes = True
+
+class TaskPage(BaseModel):
+    items: List[TaskOut]
+    next_cursor: Optional[str] = None
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class TaskSearchResult(BaseModel):
+    items: List[TaskOut]
+    next_cursor: Optional[str] = None
+    # matches across all pages, and their counts per project / user / month (YYYY-MM)
+    total: int
+    facets: Dict[str, List[FacetCount]] = {}
+
+class TaskChanges(BaseModel):
+    # current state of tasks written since the cursor, and ids of ones that no longer exist
+    changed: List[TaskOut]
+    deleted: List[str]
+    cursor: int
+    # another page is ready right away; otherwise sync again on the next change notice
+    has_more: bool
+
+class TasksCreated(BaseModel):
+    message: str
+    # one row per distinct submitted task: newly inserted, updated or already stored
+    created: List[TaskOut]
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
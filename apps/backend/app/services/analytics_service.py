@@ -0,0 +1,175 @@
+# backend/app/services/analytics_service.py
+"""
+Utilization, overtime and billable-ratio analytics for managers.
+
+Every metric is a GROUP BY that the database runs over the hours rollups,
+which every task write keeps current, so a year of tasks never crosses into
+Python:
+- utilization and overtime read hours_user_day, one row per user and day
+  (hours_user_project_day when filtered by project)
+- billable ratios read the weekly rows of hours_project_period
+What comes back is one row per (user, week), per (user, day) over the daily
+limit, or per (project, billing status).
+
+Results are cached per metric and filters, keyed by the head of the task
+change log (app.services.sync_service), which every task write advances in
+its own transaction. A dashboard reload between writes is served from the
+cache, and the first read after a write recomputes. Rollups rebuilt out of
+band (POST /api/reports/rebuild) clear the cache, and ANALYTICS_CACHE_TTL
+bounds anything else.
+"""
+import json
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select, func, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.models.change_model import TaskChange
+from app.models.report_model import UserDayHours, UserProjectDayHours, ProjectPeriodHours
+from app.services.report_service import period_start
+
+# default range: the current week and the 52 before it
+DEFAULT_WEEKS = 53
+
+analytics_cache = make_cache("analytics", settings.ANALYTICS_CACHE_SIZE, settings.ANALYTICS_CACHE_TTL)
+
+# Monday of an ISO date string's week, as YYYY-MM-DD (the rollups' day format)
+class week_start(FunctionElement):
+    type = String()
+    inherit_cache = True
+
+@compiles(week_start)
+def _default_week_start(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, '-6 days', 'weekday 1')"
+
+@compiles(week_start, "postgresql")
+def _pg_week_start(element, compiler, **kw):
+    return f"to_char(date_trunc('week', CAST({compiler.process(element.clauses, **kw)} AS date)), 'YYYY-MM-DD')"
+
+def week_range(date_from: Optional[date], date_to: Optional[date]) -> tuple:
+    """(first Monday, last Sunday) covering the range; whole weeks, so capacity is never prorated"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(weeks=DEFAULT_WEEKS - 1)
+    if date_to < date_from:
+        raise ValueError("date_to must not be before date_from")
+    return period_start(date_from, "week"), period_start(date_to, "week") + timedelta(days=6)
+
+def _non_billable() -> List[str]:
+    return [s.strip() for s in settings.ANALYTICS_NON_BILLABLE_STATUSES.split(",") if s.strip()]
+
+def _user_days(start: date, end: date, user_id: Optional[str] = None, project: Optional[str] = None):
+    """(rollup model, filters) for per-user daily hours in the range"""
+    m = UserProjectDayHours if project else UserDayHours
+    where = [m.day >= start.isoformat(), m.day <= end.isoformat()]
+    if user_id:
+        where.append(m.user_id == user_id)
+    if project:
+        where.append(m.project == project)
+    return m, where
+
+async def data_version(db: AsyncSession) -> int:
+    """Head of the task change log: moves with every task write"""
+    return (await db.execute(select(func.max(TaskChange.seq)))).scalar() or 0
+
+async def _cached(db: AsyncSession, metric: str, filters: dict, compute: Callable[[], Awaitable[dict]]) -> dict:
+    # the version is read first, so a result is never cached under a newer version than its data
+    version = await data_version(db)
+    key = f"{metric}:{version}:{json.dumps(filters, sort_keys=True, default=str)}"
+    return await analytics_cache.get_or_load(key, compute)
+
+async def utilization(db: AsyncSession, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                      user_id: Optional[str] = None, project: Optional[str] = None) -> dict:
+    """Hours per user per week against ANALYTICS_WEEKLY_CAPACITY_HOURS, with the weeks worked over it"""
+    start, end = week_range(date_from, date_to)
+    capacity = settings.ANALYTICS_WEEKLY_CAPACITY_HOURS
+
+    async def compute():
+        m, where = _user_days(start, end, user_id, project)
+        week = week_start(m.day)
+        stmt = (select(m.user_id, week, func.sum(m.hours)).where(*where)
+                .group_by(m.user_id, week).order_by(m.user_id, week))
+        weeks = [(start + timedelta(weeks=i)).isoformat() for i in range((end - start).days // 7 + 1)]
+        by_user: Dict[str, Dict[str, float]] = {}
+        for uid, wk, hours in (await db.execute(stmt)).all():
+            by_user.setdefault(uid, {})[wk] = hours or 0.0
+        users = []
+        for uid, worked in by_user.items():
+            # weeks without hours count as idle capacity
+            series = [
+                {"week": wk, "hours": round(worked.get(wk, 0.0), 2),
+                 "utilization": round(worked.get(wk, 0.0) / capacity, 4) if capacity else None,
+                 "overtimeHours": round(max(worked.get(wk, 0.0) - capacity, 0.0), 2)}
+                for wk in weeks
+            ]
+            total = sum(worked.values())
+            users.append({
+                "userId": uid,
+                "hours": round(total, 2),
+                "utilization": round(total / (capacity * len(weeks)), 4) if capacity else None,
+                "overtimeHours": round(sum(w["overtimeHours"] for w in series), 2),
+                "overtimeWeeks": sum(1 for w in series if w["overtimeHours"] > 0),
+                "weeks": series,
+            })
+        return {"from": start.isoformat(), "to": end.isoformat(), "capacityHours": capacity,
+                "weekCount": len(weeks), "users": users}
+
+    return await _cached(db, "utilization", {"from": start, "to": end, "user": user_id, "project": project}, compute)
+
+async def overtime(db: AsyncSession, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                   user_id: Optional[str] = None, project: Optional[str] = None, limit: int = 500) -> dict:
+    """Weeks over ANALYTICS_WEEKLY_CAPACITY_HOURS and days over ANALYTICS_DAILY_OVERTIME_HOURS, most overtime first"""
+    start, end = week_range(date_from, date_to)
+    weekly_limit = settings.ANALYTICS_WEEKLY_CAPACITY_HOURS
+    daily_limit = settings.ANALYTICS_DAILY_OVERTIME_HOURS
+
+    async def compute():
+        m, where = _user_days(start, end, user_id, project)
+        week = week_start(m.day)
+        result = {"from": start.isoformat(), "to": end.isoformat(),
+                  "weeklyLimitHours": weekly_limit, "dailyLimitHours": daily_limit}
+        for name, bucket, cap in (("weeks", week, weekly_limit), ("days", m.day, daily_limit)):
+            hours = func.sum(m.hours)
+            stmt = (select(m.user_id, bucket, hours).where(*where).group_by(m.user_id, bucket)
+                    .having(hours > cap).order_by((hours - cap).desc(), m.user_id).limit(limit))
+            result[name] = [
+                {"userId": uid, "start": start_day, "hours": round(total, 2), "overtimeHours": round(total - cap, 2)}
+                for uid, start_day, total in (await db.execute(stmt)).all()
+            ]
+        return result
+
+    filters = {"from": start, "to": end, "user": user_id, "project": project, "limit": limit}
+    return await _cached(db, "overtime", filters, compute)
+
+async def billable_ratio(db: AsyncSession, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         project: Optional[str] = None) -> dict:
+    """Per project: hours, hours by billing status, and the share not in ANALYTICS_NON_BILLABLE_STATUSES"""
+    start, end = week_range(date_from, date_to)
+    non_billable = set(_non_billable())
+
+    async def compute():
+        m = ProjectPeriodHours
+        # the range is whole weeks, so the weekly rollup rows cover it exactly
+        where = [m.period == "week", m.period_start >= start.isoformat(), m.period_start <= end.isoformat()]
+        if project:
+            where.append(m.project == project)
+        stmt = (select(m.project, m.billing_status, func.sum(m.hours)).where(*where)
+                .group_by(m.project, m.billing_status).order_by(m.project))
+        projects: Dict[str, dict] = {}
+        for name, status, hours in (await db.execute(stmt)).all():
+            if not hours:
+                continue
+            p = projects.setdefault(name, {"project": name, "hours": 0.0, "billableHours": 0.0, "byStatus": {}})
+            p["hours"] += hours
+            p["byStatus"][status] = round(hours, 2)
+            if status not in non_billable:
+                p["billableHours"] += hours
+        for p in projects.values():
+            p["billableRatio"] = round(p["billableHours"] / p["hours"], 4)
+            p["hours"], p["billableHours"] = round(p["hours"], 2), round(p["billableHours"], 2)
+        return {"from": start.isoformat(), "to": end.isoformat(), "nonBillableStatuses": sorted(non_billable),
+                "projects": list(projects.values())}
+
+    return await _cached(db, "billable", {"from": start, "to": end, "project": project}, compute)
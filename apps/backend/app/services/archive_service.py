@@ -0,0 +1,198 @@
+# backend/app/services/archive_service.py
+"""
+Archive of closed billing periods.
+
+The archive_period job writes one month of tasks to tasks/YYYY-MM.ndjson.gz
+in the ARCHIVE_URL store (the NDJSON export rows, gzip-compressed; see
+app.storage.archive_store) and, once the store holds it durably, removes the
+month from the tasks table - on PostgreSQL by dropping its partition, which
+is instant and leaves nothing behind to vacuum. The
+month is locked first (its partition detached, its other rows locked), so the
+closed check, the archive and the drop all see the same rows. Hours
+rollups are kept, so reports still cover archived months, and the archived
+rows stay queryable on demand from any instance: GET /api/tasks/archive/{month}
+streams them back with the export filters.
+
+A month can be archived once it has ended and none of its tasks is still in
+an open billing status (ARCHIVE_OPEN_BILLING_STATUSES) or waiting on an edit
+request. Rows that show up later for an archived month (a late backfill) are
+merged into the existing file when the month is archived again. Only the
+SQL storage backend is archived; Firestore keeps its task documents.
+"""
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from itertools import islice
+from datetime import date
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import select, update, delete, func, or_, false, text, table, column
+from app.core.config import settings
+from app.core.events import notify, user_channel
+from app.core.versions import versions, task_scope
+from app.models.task_model import Task
+from app.services.export_service import EXPORT_COLUMNS, EXPORT_FIELDS, EXPORT_BATCH, _encode_csv, _encode_ndjson
+from app.services.partition_service import detach_month, month_start, next_month
+from app.services.sync_service import record_task_changes_async
+from app.storage.archive_store import get_archive_store
+from app.storage.base import require_sql
+
+# gzip level: archives are written once and read rarely
+COMPRESS_LEVEL = 6
+# ids per DELETE of the archived rows
+DELETE_CHUNK = 1000
+
+def parse_month(value: str) -> date:
+    """First day of a YYYY-MM month; raises ValueError otherwise"""
+    if len(value) != 7:
+        raise ValueError("month must be YYYY-MM")
+    return date.fromisoformat(value + "-01")
+
+def archive_name(month: date) -> str:
+    return f"tasks/{month:%Y-%m}.ndjson.gz"
+
+def _open_statuses() -> List[str]:
+    return [s.strip() for s in settings.ARCHIVE_OPEN_BILLING_STATUSES.split(",") if s.strip()]
+
+def _read_archive(name: str):
+    with get_archive_store().open(name) as raw, gzip.open(raw, "rt") as f:
+        for line in f:
+            yield json.loads(line)
+
+def _in_month(t, month: date) -> tuple:
+    return t.c.work_date >= month, t.c.work_date < next_month(month)
+
+async def _lock_month(db, month: date) -> list:
+    """
+    Hold off every write to `month`'s tasks until the job commits, and return the
+    tables its rows are in: the detached partition (PostgreSQL) and tasks itself.
+    """
+    name = await detach_month(db, month)
+    if db.bind.dialect.name == "postgresql":
+        # rows outside a monthly partition: row locks hold off edits and deletes
+        await db.execute(select(Task.id).where(*_in_month(Task.__table__, month)).with_for_update())
+    else:
+        # SQLite has no row locks: the transaction's first write takes the database write lock
+        await db.execute(update(Task).where(false()).values(status=Task.status))
+    tables = [Task.__table__]
+    if name is not None:
+        tables.insert(0, table(name, *(column(c.name, c.type) for c in Task.__table__.columns)))
+    return tables
+
+def _copy_earlier(f, name: str, keys: dict) -> int:
+    """Append the rows of a previous archive of the month that are not live any more"""
+    earlier = 0
+    for t in _read_archive(name):
+        if t["id"] not in keys:
+            f.write(json.dumps(t) + "\n")
+            earlier += 1
+    return earlier
+
+async def archive_period(ctx) -> dict:
+    """Job handler: move a closed month's tasks into the archive (params: {"month": "YYYY-MM"})"""
+    require_sql("Archiving closed periods")
+    month = parse_month(ctx.params["month"])
+    if next_month(month) > month_start(date.today()):
+        raise ValueError(f"{month:%Y-%m} has not ended yet")
+    # fails the job before anything is locked when there is nowhere durable to put the archive
+    store = await asyncio.to_thread(get_archive_store)
+    db = ctx.db
+    # locked before the check, so nothing can reopen, add or change a row between it and the drop
+    tables = await _lock_month(db, month)
+    open_count = 0
+    for t in tables:
+        still_open = or_(t.c.billing_status.in_(_open_statuses()), t.c.billing_status.is_(None),
+                         t.c.edit_request_pending.is_(True))
+        stmt = select(func.count()).select_from(t).where(*_in_month(t, month), still_open)
+        open_count += (await db.execute(stmt)).scalar_one()
+    if open_count:
+        raise ValueError(f"{month:%Y-%m} is not closed: {open_count} tasks are unbilled or have a pending edit request")
+
+    name = archive_name(month)
+    keys, live_ids, earlier = {}, [], 0
+    # built in a scratch file and handed to the store whole; compression and file I/O run in a
+    # worker thread. Nothing is dropped or deleted below until put() has returned, i.e. until
+    # the archive is durable (fsync'd, or uploaded)
+    fd, tmp = await asyncio.to_thread(tempfile.mkstemp, suffix=".ndjson.gz")
+    os.close(fd)
+    try:
+        f = await asyncio.to_thread(gzip.open, tmp, "wt", compresslevel=COMPRESS_LEVEL)
+        try:
+            for t in tables:
+                stmt = select(*[t.c[col.expression.name] for _, col in EXPORT_COLUMNS]).where(*_in_month(t, month))
+                result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH))
+                async for rows in result.partitions():
+                    keys.update((r.id, r.user_id) for r in rows)
+                    if t is Task.__table__:
+                        live_ids.extend(r.id for r in rows)
+                    await asyncio.to_thread(f.write, _encode_ndjson(rows))
+            if await asyncio.to_thread(store.exists, name):
+                earlier = await asyncio.to_thread(_copy_earlier, f, name, keys)
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(store.put, name, tmp)
+    finally:
+        await asyncio.to_thread(os.remove, tmp)
+
+    # only what was written: rows that arrived for the month after the lock stay live
+    for t in tables[:-1]:
+        await db.execute(text(f"DROP TABLE {t.name}"))
+    for i in range(0, len(live_ids), DELETE_CHUNK):
+        chunk = live_ids[i:i + DELETE_CHUNK]
+        await db.execute(delete(Task).where(Task.id.in_(chunk), *_in_month(Task.__table__, month))
+                         .execution_options(synchronize_session=False))
+    # archived tasks leave the live set: delta sync hands them out as deleted ids
+    await record_task_changes_async(db, ((u, t) for t, u in keys.items()))
+    await ctx.checkpoint(len(keys), len(keys))
+    users = set(keys.values())
+    if users:
+        await versions.bump(*(task_scope(u) for u in users))
+        await notify((user_channel(u) for u in users), "tasks.changed", archived=f"{month:%Y-%m}")
+    return {"month": f"{month:%Y-%m}", "archived": len(keys), "total": earlier + len(keys), "archive": name}
+
+def _archived_months() -> List[dict]:
+    if not settings.ARCHIVE_URL:
+        return []
+    return [
+        {"month": name[len("tasks/"):][:7], "bytes": size}
+        for name, size in get_archive_store().list("tasks") if name.endswith(".ndjson.gz")
+    ]
+
+async def archived_months() -> List[dict]:
+    """[{"month": "YYYY-MM", "bytes": n}] for every archived month, oldest first (none without ARCHIVE_URL)"""
+    return await asyncio.to_thread(_archived_months)
+
+async def is_archived(month: date) -> bool:
+    """Raises ArchiveNotConfigured without ARCHIVE_URL"""
+    return await asyncio.to_thread(lambda: get_archive_store().exists(archive_name(month)))
+
+async def archived_tasks(month: date) -> AsyncIterator[List[dict]]:
+    """An archived month's rows as export dicts, EXPORT_BATCH at a time, read in a worker thread"""
+    rows = _read_archive(archive_name(month))
+    while batch := await asyncio.to_thread(lambda: list(islice(rows, EXPORT_BATCH))):
+        yield batch
+
+def _archive_batches(month: date, user_id: Optional[str], project: Optional[str]):
+    batch = []
+    for t in _read_archive(archive_name(month)):
+        if (user_id and t["userId"] != user_id) or (project and t["project"] != project):
+            continue
+        batch.append(tuple(t[f] for f in EXPORT_FIELDS))
+        if len(batch) >= EXPORT_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def stream_archive(month: date, fmt: str = "csv", user_id: Optional[str] = None,
+                         project: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield encoded chunks of an archived month's tasks, like export_service.stream_tasks"""
+    batches = _archive_batches(month, user_id, project)
+    first = True
+    # decompression runs in a worker thread, one batch at a time
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        yield _encode_csv(batch, first) if fmt == "csv" else _encode_ndjson(batch)
+        first = False
+    if first and fmt == "csv":
+        yield _encode_csv([], True)
@@ -0,0 +1,62 @@
+# backend/app/services/export_service.py
+"""
+Streaming task export (CSV / NDJSON) for payroll and billing.
+Rows are read through a server-side cursor in fixed-size partitions and
+encoded partition by partition, so memory stays flat regardless of volume.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.crud.task_crud import filter_tasks
+from app.models.task_model import Task
+from app.storage.base import require_sql
+
+EXPORT_BATCH = 2000
+
+# (output field, column) in export order
+EXPORT_COLUMNS = [
+    ("id", Task.id),
+    ("userId", Task.user_id),
+    ("date", Task.date),
+    ("project", Task.project),
+    ("taskName", Task.task_name),
+    ("hour", Task.hour),
+    ("billing_status", Task.billing_status),
+    ("status", Task.status),
+    ("edit_request_pending", Task.edit_request_pending),
+]
+EXPORT_FIELDS = [name for name, _ in EXPORT_COLUMNS]
+
+def _export_stmt(user_id: Optional[str], filters: dict):
+    stmt = select(*[col for _, col in EXPORT_COLUMNS])
+    if user_id:
+        stmt = stmt.where(Task.user_id == user_id)
+    stmt = filter_tasks(stmt, **filters)
+    return stmt.order_by(Task.user_id, Task.date, Task.id).execution_options(yield_per=EXPORT_BATCH)
+
+def _encode_csv(rows, header: bool) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+def _encode_ndjson(rows) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, r))) + "\n" for r in rows)
+
+async def stream_tasks(fmt: str = "csv", user_id: Optional[str] = None, **filters) -> AsyncIterator[str]:
+    """Yield encoded chunks of the matching tasks; fmt is 'csv' or 'ndjson'"""
+    require_sql("Task exports")
+    # the session is owned by the generator so it lives exactly as long as the response body
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_export_stmt(user_id, filters))
+        first = True
+        async for rows in result.partitions():
+            yield _encode_csv(rows, first) if fmt == "csv" else _encode_ndjson(rows)
+            first = False
+        if first and fmt == "csv":
+            yield _encode_csv([], True)
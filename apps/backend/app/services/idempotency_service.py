@@ -0,0 +1,94 @@
+# backend/app/services/idempotency_service.py
+"""
+Idempotency-Key support for retried writes.
+
+The first request with a key stores a compact record of its outcome (ids and
+counts, not the response body) in idempotency_keys in the same transaction as
+its writes, so either both land or neither does. A retry with the same key and
+the same request is answered from the stored record (via a read-through cache
+for small ones) without writing again; the same key with a different request
+is rejected. Two concurrent requests with one key
+race on the table's primary key, and the loser replays the winner's result.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.models.idempotency_model import IdempotencyKey
+
+# longest accepted Idempotency-Key header (UUIDs and ULIDs fit comfortably)
+MAX_KEY_LENGTH = 255
+
+# stored results never change, so caching them is safe until the record expires
+_results = make_cache("idempotency", settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_HOURS * 3600)
+_last_purge = 0.0
+
+class IdempotencyMismatch(Exception):
+    """The key was already used for a different request"""
+
+def fingerprint(route: str, payload) -> str:
+    raw = json.dumps([route, payload], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def _cache_key(user_id: str, key: str) -> str:
+    return f"{user_id}:{key}"
+
+def _expires_in(stored: dict) -> float:
+    """Seconds until a stored record expires: cached copies never outlive the database row"""
+    created_at = datetime.fromisoformat(stored["created_at"])
+    return (created_at - _cutoff()).total_seconds()
+
+async def lookup(db: AsyncSession, user_id: str, key: str, request_fingerprint: str) -> Optional[dict]:
+    """Stored {"status_code", "response"} for a key, None if unused or expired; response is the
+    record given to remember()"""
+    cache_key = _cache_key(user_id, key)
+    stored = await _results.get(cache_key)
+    if stored is None:
+        stmt = select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.response,
+                      IdempotencyKey.created_at).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.created_at >= _cutoff())
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            return None
+        # created_at as text, so the record reads back the same from Redis
+        stored = {**row._mapping, "created_at": row.created_at.isoformat()}
+        if _cacheable(stored["response"]):
+            await _results.set(cache_key, stored, ttl=_expires_in(stored))
+    if _expires_in(stored) <= 0:
+        await _results.delete(cache_key)
+        return None
+    if stored["fingerprint"] != request_fingerprint:
+        raise IdempotencyMismatch()
+    return stored
+
+def _cacheable(record: dict) -> bool:
+    # big submissions are read from the table on replay rather than held in every worker's cache
+    return len(record.get("createdIds") or record.get("created") or ()) <= settings.IDEMPOTENCY_CACHE_MAX_TASKS
+
+async def remember(db: AsyncSession, user_id: str, key: str, request_fingerprint: str,
+                   status_code: int, response: dict):
+    """
+    Stage the result for the caller's commit. The insert raises IntegrityError if another
+    request committed the same key first; an expired record under the key is replaced.
+    """
+    await _purge_expired(db, user_id, key)
+    db.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=request_fingerprint,
+                          status_code=status_code, response=response, created_at=datetime.utcnow()))
+    await db.flush()
+
+def _cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+
+async def _purge_expired(db: AsyncSession, user_id: str, key: str):
+    expired = IdempotencyKey.created_at < _cutoff()
+    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, expired))
+    # sweeping the whole table happens at most once a minute per process
+    global _last_purge
+    if time.monotonic() - _last_purge >= 60:
+        _last_purge = time.monotonic()
+        await db.execute(delete(IdempotencyKey).where(expired))
@@ -0,0 +1,300 @@
+# backend/app/services/job_service.py
+"""
+Durable background jobs.
+
+Jobs are rows in the jobs table. Workers (asyncio tasks started with the API,
+or a separate `python -m app.services.job_service` process) claim queued
+jobs, run them in chunks and commit each chunk together with its progress, so
+a job can be polled while it runs, cancelled between chunks, and resumed
+after a crash: a running job whose heartbeat is older than JOB_STALE_SECONDS
+is re-queued, and handlers only ever pick up work that is still left to do.
+"""
+import asyncio
+import logging
+from datetime import datetime, date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import notify, user_channel
+from app.core.versions import versions, task_scope
+from app.crud.task_crud import filter_tasks
+from app.models.job_model import Job
+from app.models.task_model import Task
+from app.services.archive_service import archive_period
+from app.services.report_service import apply_task_edits_async
+from app.services.sync_service import record_task_changes_async
+from app.storage.base import require_sql
+
+logger = logging.getLogger(__name__)
+
+# error text kept on a failed job
+MAX_ERROR_LENGTH = 2000
+# on shutdown, how long idle workers get to finish their poll before being cancelled
+STOP_GRACE_SECONDS = 5
+
+class JobCancelled(Exception):
+    """Raised at a chunk boundary once an admin has asked for the job to stop"""
+
+class JobContext:
+    """What a handler gets: the job's session and a checkpoint to commit a chunk"""
+    def __init__(self, db: AsyncSession, job: Job):
+        self.db = db
+        self.job_id = job.id
+        self.params = job.params
+        self.done = job.progress_done or 0
+
+    async def checkpoint(self, done: int, total: Optional[int] = None):
+        """Record progress and commit it with the chunk's writes; raises JobCancelled if asked to stop"""
+        self.done = done
+        values = {"progress_done": done, "heartbeat_at": datetime.utcnow()}
+        if total is not None:
+            values["progress_total"] = total
+        await self.db.execute(update(Job).where(Job.id == self.job_id).values(**values))
+        await self.db.commit()
+        cancel = (await self.db.execute(select(Job.cancel_requested).where(Job.id == self.job_id))).scalar_one()
+        if cancel:
+            raise JobCancelled()
+
+def _job_to_dict(j: Job) -> dict:
+    return {
+        "id": j.id,
+        "type": j.type,
+        "status": j.status,
+        "params": j.params,
+        "result": j.result,
+        "error": j.error,
+        "progress_done": j.progress_done,
+        "progress_total": j.progress_total,
+        "cancel_requested": bool(j.cancel_requested),
+        "created_by": j.created_by,
+        "created_at": j.created_at.isoformat() if j.created_at else None,
+        "started_at": j.started_at.isoformat() if j.started_at else None,
+        "finished_at": j.finished_at.isoformat() if j.finished_at else None,
+    }
+
+# ---------------------------------------------------------------------------
+# job types
+# ---------------------------------------------------------------------------
+
+async def billing_transition(ctx: JobContext) -> dict:
+    """
+    Move a project's tasks in [date_from, date_to] to to_status (only those in from_status,
+    when given), one chunk of JOB_CHUNK rows per UPDATE, keeping the hours rollups in step.
+    """
+    require_sql("Billing transitions")
+    p = ctx.params
+    to_status = p["to_status"]
+    remaining = filter_tasks(
+        select(Task.id, Task.user_id, Task.project, Task.date, Task.work_date, Task.hour, Task.billing_status),
+        date_from=date.fromisoformat(p["date_from"]), date_to=date.fromisoformat(p["date_to"]),
+        project=p["project"],
+    )
+    if p.get("from_status"):
+        remaining = remaining.where(Task.billing_status == p["from_status"])
+    else:
+        remaining = remaining.where(or_(Task.billing_status != to_status, Task.billing_status.is_(None)))
+
+    db = ctx.db
+    left = (await db.execute(select(func.count()).select_from(remaining.subquery()))).scalar_one()
+    total = ctx.done + left
+    await ctx.checkpoint(ctx.done, total)
+    while True:
+        # rows leave the filter once moved, so each pass simply takes the next chunk
+        rows = (await db.execute(remaining.order_by(Task.id).limit(settings.JOB_CHUNK).with_for_update())).all()
+        if not rows:
+            break
+        # bounded by the chunk's work_date range too, so PostgreSQL skips the other month partitions
+        days = [r.work_date for r in rows]
+        await db.execute(
+            update(Task).where(Task.id.in_([r.id for r in rows]), Task.work_date.between(min(days), max(days)))
+            .values(billing_status=to_status).execution_options(synchronize_session=False)
+        )
+        before = [
+            {"userId": r.user_id, "project": r.project, "date": r.date, "hour": r.hour,
+             "billing_status": r.billing_status}
+            for r in rows
+        ]
+        await apply_task_edits_async(db, [(t, {**t, "billing_status": to_status}) for t in before])
+        await record_task_changes_async(db, ((r.user_id, r.id) for r in rows))
+        await ctx.checkpoint(ctx.done + len(rows))
+        user_ids = {r.user_id for r in rows}
+        await versions.bump(*(task_scope(u) for u in user_ids))
+        await notify((user_channel(u) for u in user_ids), "tasks.changed", billing_status=to_status)
+    return {"moved": ctx.done, "to_status": to_status}
+
+JOB_TYPES: Dict[str, Callable[[JobContext], Awaitable[dict]]] = {
+    "billing_transition": billing_transition,
+    "archive_period": archive_period,
+}
+
+# ---------------------------------------------------------------------------
+# queue API
+# ---------------------------------------------------------------------------
+
+async def enqueue_job(db: AsyncSession, job_type: str, params: dict, created_by: Optional[str] = None) -> dict:
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type: {job_type}")
+    # every job type works through the SQL tasks table
+    require_sql(f"The {job_type} job")
+    job = Job(
+        id=str(uuid4()), type=job_type, status="queued", params=params, progress_done=0,
+        cancel_requested=0, attempts=0, created_by=created_by, created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    worker.notify()
+    return _job_to_dict(job)
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[dict]:
+    job = await db.get(Job, job_id)
+    return _job_to_dict(job) if job else None
+
+async def list_jobs(db: AsyncSession, status: Optional[str] = None, job_type: Optional[str] = None,
+                    limit: int = 50) -> List[dict]:
+    """Most recent jobs first"""
+    stmt = select(Job)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if job_type:
+        stmt = stmt.where(Job.type == job_type)
+    stmt = stmt.order_by(Job.created_at.desc()).limit(limit)
+    return [_job_to_dict(j) for j in (await db.execute(stmt)).scalars()]
+
+async def cancel_job(db: AsyncSession, job_id: str) -> Optional[dict]:
+    """Cancel a queued job now, or ask a running one to stop after its current chunk"""
+    now = datetime.utcnow()
+    await db.execute(
+        update(Job).where(Job.id == job_id, Job.status == "queued")
+        .values(status="cancelled", cancel_requested=1, finished_at=now)
+    )
+    await db.execute(update(Job).where(Job.id == job_id, Job.status == "running").values(cancel_requested=1))
+    await db.commit()
+    job = await db.get(Job, job_id)
+    if job is None:
+        return None
+    await db.refresh(job)
+    return _job_to_dict(job)
+
+# ---------------------------------------------------------------------------
+# workers
+# ---------------------------------------------------------------------------
+
+async def _requeue_stale(db: AsyncSession) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    result = await db.execute(
+        update(Job).where(Job.status == "running", Job.heartbeat_at < cutoff).values(status="queued")
+    )
+    await db.commit()
+    return result.rowcount
+
+async def _claim(db: AsyncSession) -> Optional[str]:
+    stmt = select(Job.id).where(Job.status == "queued").order_by(Job.created_at).limit(1)
+    if db.bind.dialect.name == "postgresql":
+        # concurrent workers each take a different job instead of queueing on one row lock
+        stmt = stmt.with_for_update(skip_locked=True)
+    job_id = (await db.execute(stmt)).scalar_one_or_none()
+    if job_id is None:
+        await db.rollback()
+        return None
+    now = datetime.utcnow()
+    claimed = await db.execute(
+        update(Job).where(Job.id == job_id, Job.status == "queued")
+        .values(status="running", started_at=now, heartbeat_at=now, attempts=Job.attempts + 1)
+    )
+    await db.commit()
+    return job_id if claimed.rowcount == 1 else None
+
+async def _finish(job_id: str, **values):
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(finished_at=datetime.utcnow(), **values))
+        await db.commit()
+
+async def run_job(job_id: str):
+    async with AsyncSessionLocal() as db:
+        job = await db.get(Job, job_id)
+        handler = JOB_TYPES.get(job.type)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {job.type}")
+            result = await handler(JobContext(db, job))
+        except JobCancelled:
+            await db.rollback()
+            await _finish(job_id, status="cancelled")
+        except asyncio.CancelledError:
+            # worker shutdown: hand the job back; the next worker resumes the remaining work
+            await db.rollback()
+            await asyncio.shield(_release(job_id))
+            raise
+        except Exception as e:
+            await db.rollback()
+            await _finish(job_id, status="failed", error=f"{type(e).__name__}: {e}"[:MAX_ERROR_LENGTH])
+        else:
+            await _finish(job_id, status="succeeded", result=result)
+
+async def _release(job_id: str):
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(Job.id == job_id, Job.status == "running").values(status="queued"))
+        await db.commit()
+
+class JobWorker:
+    """asyncio task pool that claims and runs queued jobs"""
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def start(self, concurrency: int):
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(concurrency)]
+
+    def notify(self):
+        """Wake idle workers right away instead of at their next poll"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self):
+        # let idle workers leave between polls; a worker still inside a job is cancelled and hands it back
+        self._stopping = True
+        self.notify()
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=STOP_GRACE_SECONDS)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def wait(self):
+        await asyncio.gather(*self._tasks)
+
+    async def _loop(self):
+        while not self._stopping:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await _requeue_stale(db)
+                    job_id = await _claim(db)
+                if job_id:
+                    await run_job(job_id)
+                    continue
+            except Exception as e:
+                # database unreachable or not migrated yet: keep polling instead of dying
+                logger.error("job worker poll failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if not self._stopping:
+                self._wake.clear()
+
+worker = JobWorker()
+
+async def _main():
+    worker.start(max(settings.JOB_WORKERS, 1))
+    await worker.wait()
+
+if __name__ == "__main__":
+    # standalone worker process, for deployments that run the API with JOB_WORKERS=0
+    asyncio.run(_main())
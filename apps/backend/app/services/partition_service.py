@@ -0,0 +1,96 @@
+# backend/app/services/partition_service.py
+"""
+Monthly partitions of the tasks table (PostgreSQL).
+
+tasks is PARTITION BY RANGE (work_date): one partition per calendar month
+(tasks_pYYYY_MM) plus tasks_default for any day no monthly partition covers.
+`python -m app.cli maintain-partitions`, run daily from cron, creates the
+next TASK_PARTITION_MONTHS_AHEAD months and splits months that landed in the
+default partition (backfills of old periods) out into partitions of their
+own, so the default partition stays empty and every date-filtered query
+prunes to the months it asks for. Autovacuum then works month by month, and
+only the current months' partitions see churn.
+
+Other databases keep one plain tasks table; there the partition helpers are
+no-ops and the archive job deletes a month's rows instead.
+"""
+import re
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+DEFAULT_PARTITION = "tasks_default"
+_PARTITION_NAME = re.compile(r"^tasks_p(\d{4})_(\d{2})$")
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def partition_name(month: date) -> str:
+    return f"tasks_p{month:%Y_%m}"
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        return False
+    stmt = text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('tasks'))")
+    return bool((await db.execute(stmt)).scalar())
+
+async def monthly_partitions(db: AsyncSession) -> Dict[date, str]:
+    """month -> partition name, for the monthly partitions attached to tasks"""
+    stmt = text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass('tasks')")
+    months = {}
+    for (name,) in await db.execute(stmt):
+        m = _PARTITION_NAME.match(name)
+        if m:
+            months[date(int(m.group(1)), int(m.group(2)), 1)] = name
+    return months
+
+async def create_partition(db: AsyncSession, month: date) -> str:
+    """Add the partition for `month`, moving its rows out of the default partition first; caller commits"""
+    name, lo, hi = partition_name(month), month.isoformat(), next_month(month).isoformat()
+    in_range = f"work_date >= DATE '{lo}' AND work_date < DATE '{hi}'"
+    stray = (await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"))).scalar()
+    if not stray:
+        await db.execute(text(f"CREATE TABLE {name} PARTITION OF tasks FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        return name
+    # attaching fails while the default partition holds rows of the new range
+    await db.execute(text(f"CREATE TABLE {name} (LIKE tasks INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await db.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+    await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+    await db.execute(text(f"ALTER TABLE tasks ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+    return name
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int | None = None) -> List[str]:
+    """Create missing partitions for the coming months and for months found in the default partition"""
+    if not await is_partitioned(db):
+        return []
+    months_ahead = settings.TASK_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    wanted = [month_start(date.today())]
+    for _ in range(months_ahead):
+        wanted.append(next_month(wanted[-1]))
+    stray = text(f"SELECT DISTINCT date_trunc('month', work_date)::date FROM {DEFAULT_PARTITION}")
+    wanted.extend(m for (m,) in await db.execute(stray))
+    existing = await monthly_partitions(db)
+    created = []
+    for month in sorted(set(wanted) - set(existing)):
+        created.append(await create_partition(db, month))
+    await db.commit()
+    return created
+
+async def detach_month(db: AsyncSession, month: date) -> Optional[str]:
+    """
+    Detach `month`'s partition from tasks and return its name, or None when it has
+    none. Until the caller commits, no write can reach the detached rows, and new
+    rows for the month land in the default partition; a rollback re-attaches it.
+    """
+    if not await is_partitioned(db):
+        return None
+    name = (await monthly_partitions(db)).get(month)
+    if name is not None:
+        await db.execute(text(f"ALTER TABLE tasks DETACH PARTITION {name}"))
+    return name
@@ -0,0 +1,216 @@
+# backend/app/services/report_service.py
+"""
+Hours rollups for reporting.
+
+Totals per (user, project, day) and per (project, week/month), split by
+billing_status, and per (user, day) across both, are kept up to date
+incrementally: task writers call
+apply_rollup_deltas / apply_rollup_deltas_async inside their own transaction
+with the task dicts they added (sign=+1) or removed (sign=-1), or
+apply_task_edits_async with (before, after) pairs.
+
+Each call is one pass of multi-row upserts over the three tables, in the
+same table order and with rows sorted by key, so two transactions touching
+overlapping keys lock them in the same order and cannot deadlock each
+other. Writers apply all of a transaction's changes in a single call.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.report_model import UserProjectDayHours, UserDayHours, ProjectPeriodHours
+from app.models.task_model import Task
+from app.storage.base import require_sql
+
+REBUILD_BATCH = 5000
+UPSERT_CHUNK = 1000
+
+def _day(task_date: str) -> date:
+    return date.fromisoformat(task_date[:10])
+
+def period_start(d: date, period: str) -> date:
+    if period == "week":
+        return d - timedelta(days=d.weekday())
+    if period == "month":
+        return d.replace(day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+def rollup_deltas(tasks: Iterable[dict], sign: int = 1):
+    """
+    Aggregate task dicts ({userId, project, date, hour, billing_status}) into
+    per-key (hours, task_count) deltas for both rollup tables.
+    """
+    return _signed_deltas([(tasks, sign)])
+
+def _signed_deltas(changes: Iterable[Tuple[Iterable[dict], int]]):
+    day_deltas = defaultdict(lambda: [0.0, 0])
+    period_deltas = defaultdict(lambda: [0.0, 0])
+    for tasks, sign in changes:
+        _accumulate(day_deltas, period_deltas, tasks, sign)
+    return day_deltas, period_deltas
+
+def _accumulate(day_deltas: dict, period_deltas: dict, tasks: Iterable[dict], sign: int):
+    for t in tasks:
+        d = _day(t["date"])
+        status = t.get("billing_status") or "pending"
+        hours = float(t.get("hour") or 0) * sign
+        key = (t["userId"], t["project"], d.isoformat(), status)
+        day_deltas[key][0] += hours
+        day_deltas[key][1] += sign
+        for period in ("week", "month"):
+            pkey = (t["project"], period, period_start(d, period).isoformat(), status)
+            period_deltas[pkey][0] += hours
+            period_deltas[pkey][1] += sign
+
+# INSERT ... ON CONFLICT DO UPDATE per dialect
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _upserts(dialect_name: str, model, key_columns: List[str], deltas: dict):
+    insert = _INSERTS.get(dialect_name)
+    if insert is None:
+        raise ValueError(f"Hours rollups need PostgreSQL or SQLite (INSERT ... ON CONFLICT), not {dialect_name}")
+    # key order, so concurrent writers take the row locks in the same order; a key whose
+    # changes cancel out is not touched at all
+    rows = [
+        dict(zip(key_columns, key), hours=hours, task_count=count)
+        for key, (hours, count) in sorted(deltas.items())
+        if hours or count
+    ]
+    table = model.__table__
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(model).values(rows[i:i + UPSERT_CHUNK])
+        yield stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                "hours": table.c.hours + stmt.excluded.hours,
+                "task_count": table.c.task_count + stmt.excluded.task_count,
+            },
+        )
+
+def _rollup_statements(dialect_name: str, changes: Iterable[Tuple[Iterable[dict], int]]):
+    """The upserts for (tasks, sign) groups, netted into one pass"""
+    day_deltas, period_deltas = _signed_deltas(changes)
+    user_day_deltas = defaultdict(lambda: [0.0, 0])
+    for (user_id, _, day, _), (hours, count) in day_deltas.items():
+        user_day_deltas[(user_id, day)][0] += hours
+        user_day_deltas[(user_id, day)][1] += count
+    stmts = list(_upserts(dialect_name, UserProjectDayHours,
+                          ["user_id", "project", "day", "billing_status"], day_deltas))
+    stmts += _upserts(dialect_name, UserDayHours, ["user_id", "day"], user_day_deltas)
+    stmts += _upserts(dialect_name, ProjectPeriodHours,
+                      ["project", "period", "period_start", "billing_status"], period_deltas)
+    return stmts
+
+def apply_rollup_deltas(db: Session, tasks: Iterable[dict], sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) tasks from the rollups; caller commits"""
+    for stmt in _rollup_statements(db.bind.dialect.name, [(tasks, sign)]):
+        db.execute(stmt)
+
+async def apply_rollup_deltas_async(db: AsyncSession, tasks: Iterable[dict], sign: int = 1):
+    """Async variant of apply_rollup_deltas; caller commits"""
+    for stmt in _rollup_statements(db.bind.dialect.name, [(tasks, sign)]):
+        await db.execute(stmt)
+
+async def apply_task_edits_async(db: AsyncSession, edits: Iterable[tuple], inserted: Iterable[dict] = ()):
+    """Move edited tasks' contributions from their old to their new hour/project, given
+    (before, after) pairs, and add `inserted` tasks, in one pass of upserts however many
+    tasks changed. Caller commits"""
+    fields = ("userId", "project", "date", "hour", "billing_status")
+    changed = [(before, after) for before, after in edits
+               if before.get("date") and any(before.get(f) != after.get(f) for f in fields)]
+    inserted = list(inserted)
+    if changed or inserted:
+        changes = [([before for before, _ in changed], -1), ([after for _, after in changed] + inserted, 1)]
+        for stmt in _rollup_statements(db.bind.dialect.name, changes):
+            await db.execute(stmt)
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Recompute the rollup tables from the tasks table and the archived months (backfill / reconciliation)"""
+    # archive_service imports the task writers, which import this module
+    from app.services.archive_service import archived_months, archived_tasks, parse_month
+    from app.services.partition_service import next_month
+
+    require_sql("Rebuilding the rollups")
+    await db.execute(delete(UserProjectDayHours))
+    await db.execute(delete(UserDayHours))
+    await db.execute(delete(ProjectPeriodHours))
+    stmt = select(Task.user_id, Task.project, Task.date, Task.hour, Task.billing_status)
+    result = await db.stream(stmt.execution_options(yield_per=REBUILD_BATCH))
+    total = 0
+    async for rows in result.partitions():
+        batch = [
+            {"userId": r.user_id, "project": r.project, "date": r.date, "hour": r.hour, "billing_status": r.billing_status}
+            for r in rows
+        ]
+        await apply_rollup_deltas_async(db, batch)
+        total += len(batch)
+    # archived months left the tasks table but not the reports; a row back in tasks (a backfill
+    # not archived yet) was counted above
+    for archived in await archived_months():
+        month = parse_month(archived["month"])
+        live = select(Task.id).where(Task.work_date >= month, Task.work_date < next_month(month))
+        live_ids = set((await db.execute(live)).scalars())
+        async for rows in archived_tasks(month):
+            batch = [t for t in rows if t["id"] not in live_ids]
+            await apply_rollup_deltas_async(db, batch)
+            total += len(batch)
+    await db.commit()
+    return total
+
+def _range(stmt, column, date_from: Optional[date], date_to: Optional[date]):
+    if date_from:
+        stmt = stmt.where(column >= date_from.isoformat())
+    if date_to:
+        stmt = stmt.where(column <= date_to.isoformat())
+    return stmt
+
+async def daily_hours(db: AsyncSession, user_id: Optional[str] = None, project: Optional[str] = None,
+                      date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Per (user, project, day, billing_status) totals"""
+    m = UserProjectDayHours
+    stmt = select(m).where(m.task_count != 0)
+    if user_id:
+        stmt = stmt.where(m.user_id == user_id)
+    if project:
+        stmt = stmt.where(m.project == project)
+    stmt = _range(stmt, m.day, date_from, date_to).order_by(m.day, m.user_id, m.project)
+    return [
+        {"userId": r.user_id, "project": r.project, "day": r.day,
+         "billing_status": r.billing_status, "hours": r.hours, "taskCount": r.task_count}
+        for r in (await db.execute(stmt)).scalars()
+    ]
+
+async def user_totals(db: AsyncSession, project: Optional[str] = None,
+                      date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Hours per user (and billing_status) over a date range"""
+    m = UserProjectDayHours
+    stmt = select(m.user_id, m.billing_status, func.sum(m.hours), func.sum(m.task_count))
+    if project:
+        stmt = stmt.where(m.project == project)
+    stmt = _range(stmt, m.day, date_from, date_to)
+    stmt = stmt.group_by(m.user_id, m.billing_status).order_by(m.user_id)
+    return [
+        {"userId": user_id, "billing_status": status, "hours": hours, "taskCount": count}
+        for user_id, status, hours, count in (await db.execute(stmt)).all()
+        if count
+    ]
+
+async def project_hours(db: AsyncSession, period: str = "month", project: Optional[str] = None,
+                        date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Per (project, week/month, billing_status) totals"""
+    m = ProjectPeriodHours
+    stmt = select(m).where(m.period == period, m.task_count != 0)
+    if project:
+        stmt = stmt.where(m.project == project)
+    # align the range to period boundaries so partial periods are included
+    if date_from:
+        date_from = period_start(date_from, period)
+    stmt = _range(stmt, m.period_start, date_from, date_to).order_by(m.period_start, m.project)
+    return [
+        {"project": r.project, "period": r.period, "periodStart": r.period_start,
+         "billing_status": r.billing_status, "hours": r.hours, "taskCount": r.task_count}
+        for r in (await db.execute(stmt)).scalars()
+    ]
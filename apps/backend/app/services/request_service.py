@@ -0,0 +1,48 @@
+# backend/app/services/request_service.py
+"""
+Edit-request workflow: submission, bulk approve / reject and the admin inbox,
+on the configured storage backend (app.storage). Resolving N requests is a
+few batched round-trips on either backend; see sql_store / firestore_store.
+Cache versions are bumped and change notices published (app.core.events)
+here once a change has been committed.
+"""
+from typing import List, Optional
+from app.core.events import notify, user_channel, ADMIN_CHANNEL
+from app.core.versions import versions, task_scope, REQUESTS_SCOPE
+from app.storage.base import Storage, RequestConflict, NOT_FOUND, NOT_PENDING, TASK_NOT_FOUND  # noqa: F401
+
+async def resolve_requests(request_ids: List[str], decision: str, admin_id: str, storage: Storage) -> dict:
+    """
+    Approve or reject many edit requests.
+    decision: 'approved' / 'rejected'
+    Returns {'resolved': [ids], 'skipped': {id: reason}}
+    """
+    outcome = await storage.requests.resolve_many(request_ids, decision, admin_id)
+    task_users = outcome.pop("task_users")
+    if outcome["resolved"]:
+        await versions.bump(REQUESTS_SCOPE, *(task_scope(u) for u in task_users))
+        await notify([ADMIN_CHANNEL], "request.resolved", decision=decision, requestIds=outcome["resolved"])
+        for user_id, ids in task_users.items():
+            await notify([user_channel(user_id)], "request.resolved", decision=decision, requestIds=ids)
+    return outcome
+
+async def submit_edit_request(user_id: str, task_id: str, payload, storage: Storage) -> dict | None:
+    """Create an edit request for one of the user's tasks; None if the task does not exist"""
+    req_payload = await storage.requests.submit(user_id, task_id, payload)
+    if req_payload is not None:
+        await versions.bump(REQUESTS_SCOPE, task_scope(user_id))
+        await notify([ADMIN_CHANNEL, user_channel(user_id)], "request.created",
+                     requestId=req_payload["id"], taskId=task_id, employeeId=user_id)
+    return req_payload
+
+async def list_requests(storage: Storage, limit: int = 50, cursor: Optional[str] = None, **filters) -> dict:
+    """
+    One page of edit requests, newest first.
+    filters: status, employee_id, date_from, date_to (inclusive)
+    Returns {'items': [...], 'next_cursor': str | None}; the cursor is the last request id.
+    """
+    return await storage.requests.list(limit, cursor, **filters)
+
+async def pending_count(storage: Storage, employee_id: Optional[str] = None) -> int:
+    """Number of pending requests, counted server-side"""
+    return await storage.requests.pending_count(employee_id)
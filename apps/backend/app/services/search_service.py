@@ -0,0 +1,96 @@
+# backend/app/services/search_service.py
+"""
+Task search for admins: full-text over task name + project, the usual task
+filters, newest first, with facet counts of the whole match set per project,
+user and month.
+
+On PostgreSQL the text query uses web-search syntax ("quoted phrase", -word,
+or) with English stemming and is answered from the ix_tasks_search GIN
+index. Other databases (SQLite in development / load tests) fall back to a
+case-insensitive substring match of every word. Search reads the SQL tasks
+table, so it needs STORAGE_BACKEND=sql.
+"""
+from datetime import date
+from typing import Dict, List, Optional
+from sqlalchemy import select, func, or_, not_, tuple_, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud.task_crud import filter_tasks, encode_cursor, decode_cursor, TASK_OUT_COLUMNS, TASK_OUT_FIELDS
+from app.models.task_model import Task, SEARCH_CONFIG, search_document
+from app.storage.base import require_sql
+
+# facet name -> grouped expression (dates are ISO strings, so the month is their first 7 characters)
+FACETS = {
+    "project": Task.project,
+    "user": Task.user_id,
+    "month": func.substr(Task.date, 1, 7),
+}
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _like_match(q: str):
+    """Stand-in for the full-text match: every word in name or project, -word excludes"""
+    conditions = []
+    for word in q.replace('"', " ").split():
+        negate = word.startswith("-") and len(word) > 1
+        pattern = f"%{_escape_like(word[1:] if negate else word)}%"
+        hit = or_(Task.task_name.ilike(pattern, escape="\\"), Task.project.ilike(pattern, escape="\\"))
+        conditions.append(not_(hit) if negate else hit)
+    return conditions
+
+def text_match(q: str, dialect: str) -> list:
+    """WHERE conditions for a text query"""
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        return [search_document(Task.task_name, Task.project).op("@@")(query)]
+    return _like_match(q)
+
+def _matching(stmt, dialect: str, q: Optional[str] = None, user_id: Optional[str] = None, **filters):
+    if q and q.strip():
+        stmt = stmt.where(*text_match(q, dialect))
+    if user_id:
+        stmt = stmt.where(Task.user_id == user_id)
+    return filter_tasks(stmt, **filters)
+
+async def search_tasks(db: AsyncSession, q: Optional[str] = None, user_id: Optional[str] = None,
+                       limit: int = 50, cursor: Optional[str] = None, facets: bool = True,
+                       date_from: Optional[date] = None, date_to: Optional[date] = None,
+                       project: Optional[str] = None, status: Optional[str] = None,
+                       billing_status: Optional[str] = None) -> dict:
+    """
+    One page of matches ordered by (date, id) descending, plus the match total and facets.
+    Facets and total ignore the cursor, so they stay the same while paging.
+    Returns {"items", "next_cursor", "total", "facets": {name: [{"value", "count"}]}}
+    """
+    require_sql("Task search")
+    dialect = db.bind.dialect.name
+    filters = dict(q=q, user_id=user_id, date_from=date_from, date_to=date_to, project=project,
+                   status=status, billing_status=billing_status)
+
+    stmt = _matching(select(*TASK_OUT_COLUMNS), dialect, **filters)
+    if cursor:
+        stmt = stmt.where(tuple_(Task.date, Task.id) < tuple_(*decode_cursor(cursor)))
+    stmt = stmt.order_by(Task.date.desc(), Task.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].date, page[-1].id) if len(rows) > limit else None
+
+    total = (await db.execute(_matching(select(func.count()).select_from(Task), dialect, **filters))).scalar_one()
+    counts: Dict[str, List[dict]] = {}
+    if facets and total:
+        for name, expr in FACETS.items():
+            n = func.count().label("n")
+            facet = (
+                _matching(select(expr.label("value"), n), dialect, **filters)
+                .group_by(expr)
+                .order_by(n.desc(), expr)
+                .limit(settings.SEARCH_FACET_LIMIT)
+            )
+            counts[name] = [{"value": value, "count": count} for value, count in await db.execute(facet)]
+    return {
+        "items": [dict(zip(TASK_OUT_FIELDS, r)) for r in page],
+        "next_cursor": next_cursor,
+        "total": total,
+        "facets": counts,
+    }
@@ -0,0 +1,116 @@
+# backend/app/services/sync_service.py
+"""
+Delta sync for offline-capable clients: "what changed in my tasks since
+cursor X", at a cost proportional to the changes rather than the history.
+
+Every task write appends (seq, user, task) rows to task_changes in the
+write's own transaction - for either storage backend, like the hours
+rollups. A delta read takes the user's log rows after the cursor, collapses
+repeats and loads the tasks' current state through the storage repository;
+tasks that no longer exist come back as tombstones (deleted ids).
+
+Sequence numbers are handed out at insert, not at commit, so a slow
+transaction can commit a lower seq after a higher one was already read. The
+returned cursor therefore only advances over rows older than
+SYNC_SETTLE_SECONDS; newer ones are sent again next time, which is harmless
+because applying a task's current state twice is idempotent.
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.change_model import TaskChange
+from app.storage.base import Storage
+
+_last_sweep = 0.0
+
+class CursorExpired(Exception):
+    """The cursor is older than the retained log; the client must reload everything"""
+
+def _change_rows(keys: Iterable[Tuple[str, str]]) -> list:
+    now = datetime.utcnow()
+    return [{"user_id": user_id, "task_id": task_id, "changed_at": now} for user_id, task_id in dict.fromkeys(keys)]
+
+def _insert_stmt():
+    return insert(TaskChange).execution_options(insertmanyvalues_page_size=settings.TASK_INSERT_CHUNK)
+
+def _sweep_stmt():
+    # drop rows past retention, but never the newest, so an old cursor can still be told apart
+    # from an empty log
+    cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_RETENTION_DAYS)
+    newest = select(func.max(TaskChange.seq)).scalar_subquery()
+    return delete(TaskChange).where(TaskChange.changed_at < cutoff, TaskChange.seq < newest)
+
+def _sweep_due() -> bool:
+    # sweeping the whole log happens at most once a minute per process
+    global _last_sweep
+    if time.monotonic() - _last_sweep < 60:
+        return False
+    _last_sweep = time.monotonic()
+    return True
+
+def record_task_changes(db: Session, keys: Iterable[Tuple[str, str]]):
+    """Log (user id, task id) pairs as changed; caller commits"""
+    rows = _change_rows(keys)
+    if rows:
+        db.execute(_insert_stmt(), rows)
+    if _sweep_due():
+        db.execute(_sweep_stmt())
+
+async def record_task_changes_async(db: AsyncSession, keys: Iterable[Tuple[str, str]]):
+    """Async variant of record_task_changes; caller commits"""
+    rows = _change_rows(keys)
+    if rows:
+        await db.execute(_insert_stmt(), rows)
+    if _sweep_due():
+        await db.execute(_sweep_stmt())
+
+async def _settled_head(db: AsyncSession) -> int:
+    """Newest seq old enough that no lower one can still commit"""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    stmt = (select(TaskChange.seq).where(TaskChange.changed_at <= cutoff)
+            .order_by(TaskChange.changed_at.desc(), TaskChange.seq.desc()).limit(1))
+    return (await db.execute(stmt)).scalar() or 0
+
+async def task_changes(storage: Storage, user_id: str, since: Optional[int] = None, limit: int = 500) -> dict:
+    """
+    Tasks of a user written after `since`: {"changed": [tasks], "deleted": [ids], "cursor", "has_more"}.
+    Without `since`, nothing but the cursor to start from: take it before the initial full load.
+    Raises CursorExpired when changes after `since` were already swept from the log.
+    """
+    db = storage.db
+    if since is None:
+        return {"changed": [], "deleted": [], "cursor": await _settled_head(db), "has_more": False}
+    oldest = (await db.execute(select(func.min(TaskChange.seq)))).scalar()
+    if oldest is not None and since < oldest - 1:
+        raise CursorExpired()
+
+    stmt = (select(TaskChange.seq, TaskChange.task_id, TaskChange.changed_at)
+            .where(TaskChange.user_id == user_id, TaskChange.seq > since)
+            .order_by(TaskChange.seq).limit(limit + 1))
+    rows = (await db.execute(stmt)).all()
+    page = rows[:limit]
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    cursor = since
+    for row in page:
+        if row.changed_at > cutoff:
+            break
+        cursor = row.seq
+    settled = cursor == (page[-1].seq if page else since)
+    # a page cut short by unsettled rows is picked up again from the cursor, not right away
+    has_more = len(rows) > limit and settled
+    if settled and not has_more:
+        # caught up: skip ahead over other users' changes, so an idle user's cursor never expires
+        cursor = max(cursor, await _settled_head(db))
+
+    task_ids = list(dict.fromkeys(row.task_id for row in page))
+    current = await storage.tasks.get_many((user_id, task_id) for task_id in task_ids)
+    return {
+        "changed": [current[t] for t in task_ids if t in current],
+        "deleted": [t for t in task_ids if t not in current],
+        "cursor": cursor,
+        "has_more": has_more,
+    }
@@ -1,16 +1,76 @@
 # backend/app/services/task_service.py
-from app.crud.task_crud import create_tasks_for_user, get_tasks_for_user
+from sqlalchemy.exc import IntegrityError
+from app.core.events import notify, user_channel
+from app.services.idempotency_service import fingerprint, lookup, remember
+from app.storage.base import Storage
 
-def add_tasks(user_id: str, tasks_payload: list, app_id: str = None):
+# created tasks re-read per round-trip when replaying a stored submission
+REPLAY_CHUNK = 1000
+
+def _saved(outcome: dict) -> dict:
+    return {"message": "Tasks saved", **outcome}
+
+def _replay_record(outcome: dict) -> dict:
+    """What an idempotency record keeps of a submission: the created task ids and the counts"""
+    return {"createdIds": [t["id"] for t in outcome["created"]],
+            **{k: outcome[k] for k in ("inserted", "updated", "skipped")}}
+
+async def _replay(user_id: str, record: dict, storage: Storage) -> dict:
+    """The response for a stored submission, its tasks read back as they are now"""
+    if "createdIds" not in record:
+        # a full response, stored before records were compacted
+        return record
+    ids = record["createdIds"]
+    found = {}
+    for i in range(0, len(ids), REPLAY_CHUNK):
+        found.update(await storage.tasks.get_many((user_id, task_id) for task_id in ids[i:i + REPLAY_CHUNK]))
+    counts = {k: record[k] for k in ("inserted", "updated", "skipped")}
+    return _saved({"created": [found[task_id] for task_id in ids if task_id in found], **counts})
+
+async def add_tasks(user_id: str, tasks_payload: list, storage: Storage, on_duplicate: str = "insert",
+                    idempotency_key: str | None = None):
+    """
+    Store a submission; returns (response body, replayed). With an idempotency key, a retry
+    of an already applied submission gets the original response back and writes nothing
+    (the created tasks as stored now; ones deleted since are left out).
+    Raises IdempotencyMismatch if the key was used for a different submission.
+    """
     # validation could be added here
-    created = create_tasks_for_user(user_id, tasks_payload, app_id)
-    return created
+    # idempotency records are kept in SQL whichever backend stores the tasks
+    db = storage.db
+    request_fp = None
+    if idempotency_key:
+        request_fp = fingerprint(f"tasks:{on_duplicate}", tasks_payload)
+        stored = await lookup(db, user_id, idempotency_key, request_fp)
+        if stored is not None:
+            return await _replay(user_id, stored["response"], storage), True
+
+    async def before_commit(outcome: dict):
+        if idempotency_key:
+            await remember(db, user_id, idempotency_key, request_fp, 200, _replay_record(outcome))
+
+    try:
+        outcome = await storage.tasks.add_many(user_id, tasks_payload, on_duplicate, before_commit=before_commit)
+    except IntegrityError:
+        # a concurrent request with the same key committed first: answer with its result
+        if not idempotency_key:
+            raise
+        await db.rollback()
+        stored = await lookup(db, user_id, idempotency_key, request_fp)
+        if stored is None:
+            raise
+        return await _replay(user_id, stored["response"], storage), True
+    if outcome["inserted"] or outcome["updated"]:
+        await notify([user_channel(user_id)], "tasks.changed", inserted=outcome["inserted"], updated=outcome["updated"])
+    return _saved(outcome), False
 
-def fetch_tasks(requesting_user: dict, userId: str | None = None, app_id: str = None):
+async def fetch_tasks(requesting_user: dict, storage: Storage, userId: str | None = None,
+                      limit: int = 100, cursor: str | None = None, **filters):
     """
     requesting_user: {'id':..., 'role':...}
     If userId is provided and the caller is admin, return that user's tasks.
     Otherwise return the caller's tasks.
+    Returns one page: {'items': [...], 'next_cursor': str | None}
     """
     if userId:
         if requesting_user.get("role") != "admin":
@@ -18,4 +78,4 @@ def fetch_tasks(requesting_user: dict, userId: str | None = None, app_id: str =
         target = userId
     else:
         target = requesting_user.get("id")
-    return get_tasks_for_user(target, app_id)
+    return await storage.tasks.page(target, limit=limit, cursor=cursor, **filters)
@@ -0,0 +1,111 @@
+# backend/app/storage/archive_store.py
+"""
+Where archived months live (ARCHIVE_URL).
+
+The archive_period job deletes a month's tasks from the database once its
+archive is stored, so the archive has to outlive the instance that wrote it
+and be readable from every instance:
+- gs://bucket/prefix  Google Cloud Storage (google-cloud-storage, which
+  firebase-admin installs); an upload is durable once it returns
+- file:///path        a directory on a volume that survives redeploys and that
+  every instance mounts; files and the directory entry are fsync'd before
+  put() returns
+Without ARCHIVE_URL nothing can be archived: instance disks on the deploy
+targets (Render, Docker) are temporary and not shared.
+
+Stores are blocking; callers run them in a worker thread.
+"""
+import os
+import shutil
+from typing import BinaryIO, List, Tuple
+from urllib.parse import urlparse
+from app.core.config import settings
+
+class ArchiveNotConfigured(ValueError):
+    """ARCHIVE_URL is not set, or names an unsupported scheme"""
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class LocalArchiveStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def list(self, prefix: str) -> List[Tuple[str, int]]:
+        """(name, bytes) of the objects under prefix, by name"""
+        folder = self._path(prefix)
+        if not os.path.isdir(folder):
+            return []
+        return [(f"{prefix}/{n}", os.path.getsize(os.path.join(folder, n)))
+                for n in sorted(os.listdir(folder)) if not n.endswith(".tmp")]
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self._path(name), "rb")
+
+    def put(self, name: str, source: str):
+        """Store the file at `source` as `name`, durably, replacing any earlier one"""
+        path = self._path(name)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # copied aside, synced and renamed, so a crash leaves either the old or the new archive
+        tmp = path + ".tmp"
+        with open(source, "rb") as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(folder)
+
+class GCSArchiveStore:
+    def __init__(self, bucket: str, prefix: str):
+        try:
+            from google.cloud import storage
+        except ImportError:
+            raise RuntimeError("ARCHIVE_URL=gs://... requires the google-cloud-storage package")
+        self.bucket = storage.Client().bucket(bucket)
+        self.prefix = prefix.strip("/")
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def list(self, prefix: str) -> List[Tuple[str, int]]:
+        skip = len(self._key(""))
+        blobs = self.bucket.client.list_blobs(self.bucket, prefix=self._key(prefix) + "/")
+        return sorted((b.name[skip:], b.size) for b in blobs)
+
+    def exists(self, name: str) -> bool:
+        return self.bucket.blob(self._key(name)).exists()
+
+    def open(self, name: str) -> BinaryIO:
+        return self.bucket.blob(self._key(name)).open("rb")
+
+    def put(self, name: str, source: str):
+        # the object is replaced whole when the upload finalizes, and is durable once this returns
+        self.bucket.blob(self._key(name)).upload_from_filename(source)
+
+_store = None
+
+def get_archive_store():
+    """The store ARCHIVE_URL names; raises ArchiveNotConfigured when it names none"""
+    global _store
+    if _store is None:
+        url = urlparse(settings.ARCHIVE_URL)
+        if url.scheme == "gs" and url.netloc:
+            _store = GCSArchiveStore(url.netloc, url.path)
+        elif url.scheme == "file" and url.path:
+            _store = LocalArchiveStore(url.path)
+        else:
+            raise ArchiveNotConfigured(
+                "Archiving needs ARCHIVE_URL set to durable storage shared by all instances (gs://bucket/prefix, "
+                "or file:///path on a persistent shared volume)")
+    return _store
@@ -0,0 +1,165 @@
+# backend/app/storage/base.py
+"""
+Storage repositories for tasks, users and edit requests.
+
+One interface (abstract base classes, so a backend missing a method fails
+when it is constructed), two implementations: SQL (app.storage.sql_store, the
+DATABASE_URL database) and Firestore (app.storage.firestore_store, under
+artifacts/{APP_ID}). A deployment picks one with STORAGE_BACKEND, so an
+edit request always lives next to the task it edits. Bulk operations are
+part of the interface; each backend batches them its own way (multi-row
+statements vs one WriteBatch). A Firestore call commits a single WriteBatch,
+so it is atomic together with its SQL side, which caps it at 500 writes:
+Storage.max_tasks_per_call / max_requests_per_call tell the routes how much
+one call may take, and a repository asked for more raises TooManyWrites.
+
+Repositories are bound to the request's SQL session either way: hours
+rollups, the task change log and Idempotency-Key records are SQL tables for
+both backends and are written in that session, committed together with the
+backend's own writes. Exports, search, rollup rebuilds and background jobs
+read the SQL tasks table itself, so they call require_sql and refuse to run
+against Firestore rather than find no tasks.
+Read-only routes take get_read_storage instead, whose session may be on a
+read replica (app.core.read_routing).
+"""
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.read_routing import get_read_db
+
+BACKENDS = ("sql", "firestore")
+
+# skip reasons reported per request id by RequestRepository.resolve_many
+NOT_FOUND = "not_found"
+NOT_PENDING = "not_pending"
+TASK_NOT_FOUND = "task_not_found"
+
+# optional hook run with the outcome just before a task write commits (e.g. to stage an
+# idempotency record in the same SQL transaction)
+BeforeCommit = Optional[Callable[[dict], Awaitable[None]]]
+
+class RequestConflict(Exception):
+    """A request was modified by someone else while it was being resolved"""
+
+class TooManyWrites(ValueError):
+    """A bulk call needs more writes than the backend commits atomically"""
+
+class UnsupportedBackend(ValueError):
+    """A feature that works on the SQL tasks table was asked of another STORAGE_BACKEND"""
+
+def require_sql(feature: str):
+    """Raise UnsupportedBackend unless tasks live in the SQL tasks table"""
+    if settings.STORAGE_BACKEND != "sql":
+        raise UnsupportedBackend(f"{feature} needs STORAGE_BACKEND=sql, not {settings.STORAGE_BACKEND}")
+
+def approval_update(request: dict) -> dict:
+    """Task fields an approved edit request changes (request in API shape)"""
+    update = {}
+    if request.get("proposedHours") is not None:
+        update["hour"] = request["proposedHours"]
+    if request.get("proposedProject") is not None:
+        update["project"] = request["proposedProject"]
+    if request.get("proposedTaskName") is not None:
+        update["taskName"] = request["proposedTaskName"]
+    update["status"] = "approved"
+    update["edit_request_pending"] = False
+    return update
+
+class TaskRepository(ABC):
+    """Tasks in API shape: {id, userId, project, taskName, hour, billing_status, date, status, edit_request_pending}"""
+
+    @abstractmethod
+    async def add_many(self, user_id: str, tasks: List[dict], on_duplicate: str = "insert",
+                       before_commit: BeforeCommit = None) -> dict:
+        """
+        Store a submission in one batch. on_duplicate: "insert" stores every task, "skip" / "update"
+        dedupe on the natural key (see task_crud.plan_upsert).
+        Returns {"created": rows, "inserted": n, "updated": n, "skipped": n}
+        """
+
+    @abstractmethod
+    async def page(self, user_id: str, limit: int = 100, cursor: Optional[str] = None, **filters) -> dict:
+        """One page of a user's tasks ordered by (date, id): {"items": [...], "next_cursor": str | None}.
+        filters: date_from, date_to, project, status, billing_status; raises ValueError on a bad cursor"""
+
+    @abstractmethod
+    async def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+        """Tasks for (user id, task id) pairs in one round-trip, keyed by task id; missing ones are left out"""
+
+class UserRepository(ABC):
+    """Users in API shape: {id, name, role, creation_date}; inputs as {userId, firstName, lastName, role}"""
+
+    @abstractmethod
+    async def create_many(self, users: List[dict]) -> List[dict]:
+        ...
+
+    async def create(self, user: dict) -> dict:
+        return (await self.create_many([user]))[0]
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def list(self) -> List[dict]:
+        ...
+
+class RequestRepository(ABC):
+    """Edit requests in API shape: {id, taskId, employeeId, employeeName, date, originalHours,
+    proposedHours, proposedProject, proposedTaskName, reason, status}"""
+
+    @abstractmethod
+    async def submit(self, user_id: str, task_id: str, payload) -> Optional[dict]:
+        """Create a request for one of the user's tasks and flag the task; None if the task does not exist"""
+
+    @abstractmethod
+    async def resolve_many(self, request_ids: List[str], decision: str, admin_id: str) -> dict:
+        """
+        Approve ('approved') or reject ('rejected') many requests, applying approved edits to their
+        tasks and the hours rollups. Raises RequestConflict if a request changed concurrently.
+        Returns {'resolved': [ids], 'skipped': {id: reason}, 'task_users': {user id: [their resolved request ids]}}
+        """
+
+    @abstractmethod
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> dict:
+        """One page, newest first: {'items': [...], 'next_cursor': last request id | None}.
+        filters: status, employee_id, date_from, date_to (inclusive); raises ValueError on a bad cursor"""
+
+    @abstractmethod
+    async def pending_count(self, employee_id: Optional[str] = None) -> int:
+        ...
+
+class Storage:
+    """The repositories of one backend, bound to a SQL session"""
+    backend = ""
+    # most tasks one tasks.add_many and edit requests one requests.resolve_many may take (None: no limit)
+    max_tasks_per_call: Optional[int] = None
+    max_requests_per_call: Optional[int] = None
+
+    def __init__(self, db: AsyncSession, tasks: TaskRepository, users: UserRepository, requests: RequestRepository):
+        self.db = db
+        self.tasks = tasks
+        self.users = users
+        self.requests = requests
+
+def make_storage(db: AsyncSession, backend: Optional[str] = None) -> Storage:
+    """Repositories for `backend` (default STORAGE_BACKEND); implementations are imported on first use"""
+    backend = backend or settings.STORAGE_BACKEND
+    if backend == "sql":
+        from app.storage.sql_store import SqlStorage
+        return SqlStorage(db)
+    if backend == "firestore":
+        from app.storage.firestore_store import FirestoreStorage
+        return FirestoreStorage(db)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend} (expected one of {', '.join(BACKENDS)})")
+
+async def get_storage(db: AsyncSession = Depends(get_async_db)) -> Storage:
+    """FastAPI dependency: the configured backend's repositories for this request"""
+    return make_storage(db)
+
+async def get_read_storage(db: AsyncSession = Depends(get_read_db)) -> Storage:
+    """FastAPI dependency for read-only routes: repositories over a replica when one may serve the caller"""
+    return make_storage(db)
@@ -0,0 +1,359 @@
+# backend/app/storage/firestore_store.py
+"""
+Firestore storage backend (STORAGE_BACKEND=firestore).
+
+Layout under artifacts/{APP_ID}: users/{userId}, users/{userId}/tasks/{taskId}
+and requests/{requestId}. Many documents are read with one get_all and each
+bulk call writes in one WriteBatch commit, so N tasks or requests cost a
+couple of round-trips instead of N. Request updates carry a last-update-time
+precondition so two admins resolving the same request cannot both win.
+Blocking client calls run in worker threads.
+
+Rollup changes, change-log rows (and a submission's idempotency record) are
+staged in the SQL session first and committed after the Firestore commit
+succeeds. That pairing only holds when the Firestore side is a single
+atomic commit - after a second batch failed, the first would be in
+Firestore with its SQL side rolled back - so a call is capped at
+MAX_BATCH_WRITES writes (TooManyWrites beyond; the routes check the caps on
+FirestoreStorage first).
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.firestore_client import (
+    users_root, offload, get_all, new_batch, unchanged_since, count, failed_precondition, MAX_BATCH_WRITES,
+    DESCENDING,
+)
+from app.core.versions import versions, task_scope
+from app.crud.task_crud import natural_key, plan_upsert, upsert_outcome, encode_cursor, decode_cursor
+from app.crud.user_crud import user_cache, invalidate_user, ALL_USERS
+from app.services.report_service import apply_task_edits_async
+from app.services.sync_service import record_task_changes_async
+from app.storage.base import (
+    Storage, TaskRepository, UserRepository, RequestRepository, BeforeCommit, RequestConflict, TooManyWrites,
+    approval_update, NOT_FOUND, NOT_PENDING, TASK_NOT_FOUND,
+)
+
+# each resolved request writes its task and itself
+WRITES_PER_REQUEST = 2
+
+TASK_FIELDS = ("id", "userId", "project", "taskName", "hour", "billing_status", "date", "status", "edit_request_pending")
+
+def tasks_collection(user_id: str):
+    return users_root().document(user_id).collection("tasks")
+
+def task_ref(user_id: str, task_id: str):
+    return tasks_collection(user_id).document(task_id)
+
+def requests_collection():
+    # structure: artifacts/{appId}/requests/{requestId}
+    return users_root().parent.collection("requests")
+
+def _task_from(snap) -> dict:
+    data = snap.to_dict()
+    task = {f: data.get(f) for f in TASK_FIELDS}
+    task.update(id=snap.id, userId=snap.reference.parent.parent.id)
+    task["status"] = task["status"] or "submitted"
+    task["edit_request_pending"] = bool(task["edit_request_pending"])
+    return task
+
+def _new_task(user_id: str, t: dict) -> dict:
+    return {
+        "id": str(uuid4()),
+        "userId": user_id,
+        "project": t["project"],
+        "taskName": t["taskName"],
+        "hour": t["hour"],
+        "billing_status": t.get("billing_status", "pending"),
+        "date": t["date"],
+        "status": "submitted",
+        "edit_request_pending": False,
+    }
+
+def _check_writes(writes: int):
+    if writes > MAX_BATCH_WRITES:
+        raise TooManyWrites(f"{writes} writes do not fit one Firestore commit (at most {MAX_BATCH_WRITES})")
+
+def _commit_writes(writes: List[tuple]):
+    """Commit (method, reference, data) writes in one atomic WriteBatch"""
+    _check_writes(len(writes))
+    batch = new_batch()
+    for method, ref, data in writes:
+        getattr(batch, method)(ref, data)
+    batch.commit()
+
+def _existing_tasks(user_id: str, tasks: List[dict]) -> dict:
+    # one range query over the submission's dates instead of a lookup per task
+    dates = {t["date"] for t in tasks}
+    query = tasks_collection(user_id).where("date", ">=", min(dates)).where("date", "<=", max(dates))
+    existing = {}
+    for snap in query.get():
+        task = _task_from(snap)
+        if task["date"] in dates:
+            existing.setdefault(natural_key(task), task)
+    return existing
+
+def _task_page(user_id: str, limit: int, cursor: Optional[str], date_from=None, date_to=None,
+               project: Optional[str] = None, status: Optional[str] = None,
+               billing_status: Optional[str] = None) -> dict:
+    # equality filters plus a range on "date" need the composite indexes in firestore.indexes.json
+    collection = tasks_collection(user_id)
+    query = collection
+    if project:
+        query = query.where("project", "==", project)
+    if status:
+        query = query.where("status", "==", status)
+    if billing_status:
+        query = query.where("billing_status", "==", billing_status)
+    if date_from:
+        query = query.where("date", ">=", date_from.isoformat())
+    if date_to:
+        query = query.where("date", "<", (date_to + timedelta(days=1)).isoformat())
+    # ties on date break on the document id, like the SQL (date, id) order
+    query = query.order_by("date").limit(limit + 1)
+    if cursor:
+        _, task_id = decode_cursor(cursor)
+        after = collection.document(task_id).get()
+        if not after.exists:
+            raise ValueError("Invalid cursor")
+        query = query.start_after(after)
+    docs = query.get()
+    items = [_task_from(d) for d in docs[:limit]]
+    next_cursor = encode_cursor(items[-1]["date"], items[-1]["id"]) if len(docs) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+class FirestoreTasks(TaskRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_many(self, user_id: str, tasks: List[dict], on_duplicate: str = "insert",
+                       before_commit: BeforeCommit = None) -> dict:
+        if not tasks:
+            return {"created": [], "inserted": 0, "updated": 0, "skipped": 0}
+        # checked before any work: at most one write per submitted task
+        _check_writes(len(tasks))
+        if on_duplicate == "insert":
+            inserted, changes = [_new_task(user_id, t) for t in tasks], []
+            outcome = {"created": inserted, "inserted": len(inserted), "updated": 0, "skipped": 0}
+        else:
+            # concurrent skip/update submissions for one user are not serialized here (no advisory
+            # lock as on PostgreSQL); clients that retry should send an Idempotency-Key
+            existing = await offload(_existing_tasks, user_id, tasks)
+            submitted, new, changes, kept = plan_upsert(tasks, existing, on_duplicate)
+            inserted = [_new_task(user_id, t) for t in new]
+            outcome = upsert_outcome(submitted, inserted, changes, kept)
+
+        await apply_task_edits_async(self.db, changes, inserted=inserted)
+        await record_task_changes_async(self.db, ((user_id, t["id"]) for t in inserted + [new for _, new in changes]))
+        if before_commit:
+            await before_commit(outcome)
+        created_at = datetime.utcnow().isoformat()
+        writes = [("set", task_ref(user_id, t["id"]), {**t, "createdAt": created_at}) for t in inserted]
+        writes += [("update", task_ref(user_id, new["id"]), {"hour": new["hour"], "billing_status": new["billing_status"]})
+                   for _, new in changes]
+        try:
+            await offload(_commit_writes, writes)
+        except Exception:
+            await self.db.rollback()
+            raise
+        await self.db.commit()
+        if writes:
+            await versions.bump(task_scope(user_id))
+        return outcome
+
+    async def page(self, user_id: str, limit: int = 100, cursor: Optional[str] = None, **filters) -> dict:
+        return await offload(_task_page, user_id, limit, cursor, **filters)
+
+    async def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+        refs = [task_ref(user_id, task_id) for user_id, task_id in keys]
+        if not refs:
+            return {}
+        snaps = await offload(get_all, refs)
+        return {task_id: _task_from(s) for task_id, s in snaps.items() if s.exists}
+
+def _user_from(snap) -> dict:
+    data = snap.to_dict()
+    return {
+        "id": snap.id,
+        "name": f"{data.get('firstName', '')} {data.get('lastName', '')}",
+        "role": data.get("role", "employee"),
+        "creation_date": data.get("createdAt"),
+    }
+
+def _get_user(user_id: str) -> Optional[dict]:
+    snap = users_root().document(user_id).get()
+    return _user_from(snap) if snap.exists else None
+
+def _list_users() -> List[dict]:
+    # task-only parents (no user document of their own) are not users
+    return [_user_from(s) for s in users_root().get() if s.exists]
+
+class FirestoreUsers(UserRepository):
+    async def create_many(self, users: List[dict]) -> List[dict]:
+        created_at = datetime.utcnow().isoformat()
+        docs = {
+            u["userId"]: {"firstName": u["firstName"], "lastName": u["lastName"],
+                          "role": u.get("role", "employee"), "createdAt": created_at}
+            for u in users
+        }
+        # create() fails on an existing id, like the primary key on SQL
+        await offload(_commit_writes, [("create", users_root().document(uid), doc) for uid, doc in docs.items()])
+        await invalidate_user(*docs)
+        return [
+            {"id": uid, "name": f"{d['firstName']} {d['lastName']}", "role": d["role"], "creation_date": created_at}
+            for uid, d in docs.items()
+        ]
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        async def load():
+            return await offload(_get_user, user_id)
+        return await user_cache.get_or_load(user_id, load)
+
+    async def list(self) -> List[dict]:
+        async def load():
+            return await offload(_list_users)
+        return await user_cache.get_or_load(ALL_USERS, load)
+
+def _resolve(request_ids: List[str], decision: str, admin_id: str) -> dict:
+    col = requests_collection()
+    ids = list(dict.fromkeys(request_ids))
+    snaps = get_all([col.document(rid) for rid in ids])
+    skipped, todo = {}, []
+    for rid in ids:
+        snap = snaps.get(rid)
+        if snap is None or not snap.exists:
+            skipped[rid] = NOT_FOUND
+            continue
+        data = snap.to_dict()
+        if data.get("status") != "pending":
+            skipped[rid] = NOT_PENDING
+            continue
+        todo.append((rid, snap, data))
+
+    # current task state, so missing tasks are skipped instead of failing a whole batch
+    tasks = get_all([task_ref(d["employeeId"], d["taskId"]) for _, _, d in todo]) if todo else {}
+    state = {tid: _task_from(s) for tid, s in tasks.items() if s.exists}
+
+    _check_writes(len(todo) * WRITES_PER_REQUEST)
+    resolved_at = datetime.utcnow().isoformat()
+    resolved, edits, task_users, changed = [], [], {}, []
+    batch = new_batch()
+    for rid, snap, data in todo:
+        task_id = data["taskId"]
+        if task_id not in state:
+            skipped[rid] = TASK_NOT_FOUND
+            continue
+        if decision == "approved":
+            update = approval_update(data)
+            before = state[task_id]
+            state[task_id] = {**before, **update}
+            edits.append((before, state[task_id]))
+        else:
+            update = {"edit_request_pending": False}
+        batch.update(task_ref(data["employeeId"], task_id), update)
+        changed.append((data["employeeId"], task_id))
+        batch.update(snap.reference, {"status": decision, "resolvedBy": admin_id, "resolvedAt": resolved_at},
+                     option=unchanged_since(snap))
+        resolved.append(rid)
+        task_users.setdefault(data["employeeId"], []).append(rid)
+
+    # one atomic commit: a conflict on any request leaves every one of them unresolved
+    try:
+        if resolved:
+            batch.commit()
+    except failed_precondition() as e:
+        raise RequestConflict(str(e)) from e
+    return {"resolved": resolved, "skipped": skipped, "edits": edits, "changed": changed, "task_users": task_users}
+
+def _submit(user_id: str, task_id: str, payload) -> Optional[dict]:
+    ref = task_ref(user_id, task_id)
+    task_doc = ref.get()
+    if not task_doc.exists:
+        return None
+    task_data = task_doc.to_dict()
+    req_id = str(uuid4())
+    req_payload = {
+        "id": req_id,
+        "taskId": task_id,
+        "employeeId": user_id,
+        "employeeName": task_data.get("userId", user_id),
+        "date": datetime.utcnow().isoformat(),
+        "originalHours": task_data.get("hour"),
+        "proposedHours": payload.proposedHour,
+        "proposedProject": payload.proposedProject,
+        "proposedTaskName": payload.proposedTaskName,
+        "reason": getattr(payload, "reason", None),
+        "status": "pending"
+    }
+    # create the request and mark the task as having a pending edit in one atomic commit
+    batch = new_batch()
+    batch.set(requests_collection().document(req_id), req_payload)
+    batch.update(ref, {"edit_request_pending": True})
+    batch.commit()
+    return req_payload
+
+def _filtered_requests(status: Optional[str] = None, employee_id: Optional[str] = None,
+                       date_from=None, date_to=None):
+    # equality filters plus a range on "date" need the composite indexes in firestore.indexes.json
+    query = requests_collection()
+    if status:
+        query = query.where("status", "==", status)
+    if employee_id:
+        query = query.where("employeeId", "==", employee_id)
+    if date_from:
+        query = query.where("date", ">=", date_from.isoformat())
+    if date_to:
+        query = query.where("date", "<", (date_to + timedelta(days=1)).isoformat())
+    return query
+
+def _list(limit: int, cursor: Optional[str], **filters) -> dict:
+    query = _filtered_requests(**filters).order_by("date", direction=DESCENDING).limit(limit + 1)
+    if cursor:
+        cursor_doc = requests_collection().document(cursor).get()
+        if not cursor_doc.exists:
+            raise ValueError("Invalid cursor")
+        query = query.start_after(cursor_doc)
+    docs = query.get()
+    out = []
+    for d in docs[:limit]:
+        data = d.to_dict()
+        data["id"] = d.id
+        out.append(data)
+    next_cursor = out[-1]["id"] if len(docs) > limit else None
+    return {"items": out, "next_cursor": next_cursor}
+
+class FirestoreRequests(RequestRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def submit(self, user_id: str, task_id: str, payload) -> Optional[dict]:
+        request = await offload(_submit, user_id, task_id, payload)
+        if request is not None:
+            # the task's edit_request_pending flag changed
+            await record_task_changes_async(self.db, [(user_id, task_id)])
+            await self.db.commit()
+        return request
+
+    async def resolve_many(self, request_ids: List[str], decision: str, admin_id: str) -> dict:
+        outcome = await offload(_resolve, request_ids, decision, admin_id)
+        # keep the hours rollups and the change log in step with the task writes
+        await apply_task_edits_async(self.db, outcome.pop("edits"))
+        await record_task_changes_async(self.db, outcome.pop("changed"))
+        await self.db.commit()
+        return outcome
+
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> dict:
+        return await offload(_list, limit, cursor, **filters)
+
+    async def pending_count(self, employee_id: Optional[str] = None) -> int:
+        # server-side COUNT aggregation; no documents are transferred
+        return await offload(count, _filtered_requests(status="pending", employee_id=employee_id))
+
+class FirestoreStorage(Storage):
+    backend = "firestore"
+    max_tasks_per_call = MAX_BATCH_WRITES
+    max_requests_per_call = MAX_BATCH_WRITES // WRITES_PER_REQUEST
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, FirestoreTasks(db), FirestoreUsers(), FirestoreRequests(db))
@@ -0,0 +1,214 @@
+# backend/app/storage/sql_store.py
+"""
+SQL storage backend (STORAGE_BACKEND=sql): tasks and users through
+app.crud, edit requests in the edit_requests table. Resolving a batch of
+requests is one transaction: a guarded UPDATE of the requests, one bulk
+UPDATE of their tasks and one set of rollup upserts.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.task_crud import (
+    create_tasks_for_user_async, upsert_tasks_for_user_async, get_tasks_page_async, TASK_OUT_COLUMNS, TASK_OUT_FIELDS,
+)
+from app.crud.user_crud import create_users_async, get_user_async, list_users_async
+from app.models.request_model import EditRequest
+from app.models.task_model import Task, parse_work_date
+from app.services.report_service import apply_task_edits_async
+from app.services.sync_service import record_task_changes_async
+from app.storage.base import (
+    Storage, TaskRepository, UserRepository, RequestRepository, BeforeCommit, RequestConflict, approval_update,
+    NOT_FOUND, NOT_PENDING, TASK_NOT_FOUND,
+)
+
+# API field name -> column, like TASK_OUT_COLUMNS
+REQUEST_OUT_COLUMNS = (
+    EditRequest.id,
+    EditRequest.task_id.label("taskId"),
+    EditRequest.employee_id.label("employeeId"),
+    EditRequest.employee_name.label("employeeName"),
+    EditRequest.date,
+    EditRequest.original_hours.label("originalHours"),
+    EditRequest.proposed_hours.label("proposedHours"),
+    EditRequest.proposed_project.label("proposedProject"),
+    EditRequest.proposed_task_name.label("proposedTaskName"),
+    EditRequest.reason,
+    EditRequest.status,
+    EditRequest.resolved_by.label("resolvedBy"),
+    EditRequest.resolved_at.label("resolvedAt"),
+)
+REQUEST_OUT_FIELDS = tuple(c.key for c in REQUEST_OUT_COLUMNS)
+
+# task fields an edit request can change -> Task attribute
+TASK_UPDATE_COLUMNS = {
+    "hour": "hour",
+    "project": "project",
+    "taskName": "task_name",
+    "status": "status",
+    "edit_request_pending": "edit_request_pending",
+}
+
+class SqlTasks(TaskRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_many(self, user_id: str, tasks: List[dict], on_duplicate: str = "insert",
+                       before_commit: BeforeCommit = None) -> dict:
+        if on_duplicate == "insert":
+            created = await create_tasks_for_user_async(user_id, tasks, self.db, before_commit=before_commit)
+            return {"created": created, "inserted": len(created), "updated": 0, "skipped": 0}
+        return await upsert_tasks_for_user_async(user_id, tasks, self.db, on_duplicate, before_commit=before_commit)
+
+    async def page(self, user_id: str, limit: int = 100, cursor: Optional[str] = None, **filters) -> dict:
+        return await get_tasks_page_async(user_id, self.db, limit=limit, cursor=cursor, **filters)
+
+    async def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, dict]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        stmt = select(*TASK_OUT_COLUMNS).where(Task.id.in_({task_id for _, task_id in keys}))
+        owners = {task_id: user_id for user_id, task_id in keys}
+        rows = (dict(zip(TASK_OUT_FIELDS, r)) for r in await self.db.execute(stmt))
+        return {t["id"]: t for t in rows if owners[t["id"]] == t["userId"]}
+
+class SqlUsers(UserRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_many(self, users: List[dict]) -> List[dict]:
+        return await create_users_async(users, self.db)
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        return await get_user_async(user_id, self.db)
+
+    async def list(self) -> List[dict]:
+        return await list_users_async(self.db)
+
+def _filtered_requests(stmt, status: Optional[str] = None, employee_id: Optional[str] = None,
+                       date_from=None, date_to=None):
+    # "date" is the ISO submission timestamp, so string ranges sort correctly; date_to is inclusive
+    if status:
+        stmt = stmt.where(EditRequest.status == status)
+    if employee_id:
+        stmt = stmt.where(EditRequest.employee_id == employee_id)
+    if date_from:
+        stmt = stmt.where(EditRequest.date >= date_from.isoformat())
+    if date_to:
+        stmt = stmt.where(EditRequest.date < (date_to + timedelta(days=1)).isoformat())
+    return stmt
+
+class SqlRequests(RequestRepository):
+    def __init__(self, db: AsyncSession, tasks: SqlTasks):
+        self.db = db
+        self.tasks = tasks
+
+    async def submit(self, user_id: str, task_id: str, payload) -> Optional[dict]:
+        stmt = select(Task.hour, Task.work_date).where(Task.id == task_id, Task.user_id == user_id)
+        task = (await self.db.execute(stmt)).first()
+        if task is None:
+            return None
+        request = {
+            "id": str(uuid4()),
+            "taskId": task_id,
+            "employeeId": user_id,
+            "employeeName": user_id,
+            "date": datetime.utcnow().isoformat(),
+            "originalHours": task.hour,
+            "proposedHours": payload.proposedHour,
+            "proposedProject": payload.proposedProject,
+            "proposedTaskName": payload.proposedTaskName,
+            "reason": getattr(payload, "reason", None),
+            "status": "pending",
+        }
+        self.db.add(EditRequest(
+            id=request["id"], task_id=task_id, employee_id=user_id, employee_name=request["employeeName"],
+            date=request["date"], original_hours=task.hour, proposed_hours=request["proposedHours"],
+            proposed_project=request["proposedProject"], proposed_task_name=request["proposedTaskName"],
+            reason=request["reason"], status="pending",
+        ))
+        # by the full key (id, work_date), so PostgreSQL touches only the task's month partition
+        await self.db.execute(update(Task).where(Task.id == task_id, Task.work_date == task.work_date)
+                              .values(edit_request_pending=True))
+        await record_task_changes_async(self.db, [(user_id, task_id)])
+        await self.db.commit()
+        return request
+
+    async def resolve_many(self, request_ids: List[str], decision: str, admin_id: str) -> dict:
+        ids = list(dict.fromkeys(request_ids))
+        stmt = select(*REQUEST_OUT_COLUMNS).where(EditRequest.id.in_(ids))
+        found = {r.id: dict(zip(REQUEST_OUT_FIELDS, r)) for r in await self.db.execute(stmt)}
+        skipped, todo = {}, []
+        for rid in ids:
+            data = found.get(rid)
+            if data is None:
+                skipped[rid] = NOT_FOUND
+            elif data["status"] != "pending":
+                skipped[rid] = NOT_PENDING
+            else:
+                todo.append(data)
+
+        state = await self.tasks.get_many((d["employeeId"], d["taskId"]) for d in todo)
+        resolved, edits, task_users = [], [], {}
+        # task id -> merged column updates, so two requests on one task apply in order
+        task_updates: Dict[str, dict] = {}
+        for data in todo:
+            task_id = data["taskId"]
+            before = state.get(task_id)
+            if before is None:
+                skipped[data["id"]] = TASK_NOT_FOUND
+                continue
+            if decision == "approved":
+                changes = approval_update(data)
+                state[task_id] = {**before, **changes}
+                edits.append((before, state[task_id]))
+            else:
+                changes = {"edit_request_pending": False}
+            row = task_updates.setdefault(task_id, {"id": task_id, "work_date": parse_work_date(before["date"])})
+            row.update({TASK_UPDATE_COLUMNS[k]: v for k, v in changes.items()})
+            resolved.append(data["id"])
+            task_users.setdefault(before["userId"], []).append(data["id"])
+
+        if resolved:
+            # only still-pending requests are updated; a lower count means another admin got there first
+            guarded = (
+                update(EditRequest)
+                .where(EditRequest.id.in_(resolved), EditRequest.status == "pending")
+                .values(status=decision, resolved_by=admin_id, resolved_at=datetime.utcnow().isoformat())
+                .execution_options(synchronize_session=False)
+            )
+            if (await self.db.execute(guarded)).rowcount != len(resolved):
+                await self.db.rollback()
+                raise RequestConflict("edit requests were resolved concurrently")
+            # ORM bulk UPDATE by primary key (id, work_date), one executemany per distinct set of changed fields
+            await self.db.execute(update(Task), list(task_updates.values()))
+            await apply_task_edits_async(self.db, edits)
+            await record_task_changes_async(self.db, ((state[t]["userId"], t) for t in task_updates))
+            await self.db.commit()
+        return {"resolved": resolved, "skipped": skipped, "task_users": task_users}
+
+    async def list(self, limit: int = 50, cursor: Optional[str] = None, **filters) -> dict:
+        stmt = _filtered_requests(select(*REQUEST_OUT_COLUMNS), **filters)
+        if cursor:
+            after = (await self.db.execute(select(EditRequest.date, EditRequest.id).where(EditRequest.id == cursor))).first()
+            if after is None:
+                raise ValueError("Invalid cursor")
+            stmt = stmt.where(tuple_(EditRequest.date, EditRequest.id) < tuple_(after.date, after.id))
+        stmt = stmt.order_by(EditRequest.date.desc(), EditRequest.id.desc()).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all()
+        items = [dict(zip(REQUEST_OUT_FIELDS, r)) for r in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    async def pending_count(self, employee_id: Optional[str] = None) -> int:
+        stmt = _filtered_requests(select(func.count()).select_from(EditRequest), status="pending",
+                                  employee_id=employee_id)
+        return (await self.db.execute(stmt)).scalar_one()
+
+class SqlStorage(Storage):
+    backend = "sql"
+
+    def __init__(self, db: AsyncSession):
+        tasks = SqlTasks(db)
+        super().__init__(db, tasks, SqlUsers(db), SqlRequests(db, tasks))
@@ -0,0 +1,68 @@
+# backend/benchmarks/bench_auth.py
+"""
+Per-request JWT verification cost: full signature verification (the old
+behaviour) versus the verified-token cache in app.core.auth_middleware.
+
+Usage (from apps/backend):
+    python -m benchmarks.bench_auth                 # HS256 and RS256
+    python -m benchmarks.bench_auth --algorithm RS256 --iterations 20000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+def _generate_rsa_pair():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption()).decode()
+    public = key.public_key().public_bytes(serialization.Encoding.PEM,
+                                           serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+    return private, public
+
+async def _time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def run(algorithm: str, iterations: int):
+    os.environ["JWT_ALGORITHM"] = algorithm
+    if not algorithm.startswith("HS"):
+        os.environ["JWT_PRIVATE_KEY"], os.environ["JWT_PUBLIC_KEY"] = _generate_rsa_pair()
+    from jose import jwt
+    from app.core.config import settings
+    from app.core.jwt_keys import keys
+    from app.core.auth_middleware import create_access_token, verify_token, clear_token_cache
+
+    async def verify_uncached():
+        return jwt.decode(token, await keys.verification_key(token), algorithms=[settings.JWT_ALGORITHM])
+
+    token = create_access_token("bench", "employee")
+    # old path: verify the signature on every request
+    uncached = asyncio.run(_time_per_call(verify_uncached, iterations))
+    clear_token_cache()
+    asyncio.run(verify_token(token))
+    cached = asyncio.run(_time_per_call(lambda: verify_token(token), iterations))
+    print(f"{algorithm:>6} {uncached:>14.1f} {cached:>12.1f} {uncached / cached:>8.0f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", choices=["HS256", "RS256"])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    if args.algorithm:
+        run(args.algorithm, args.iterations)
+        return
+    print(f"{'alg':>6} {'verify us/req':>14} {'cached us':>12} {'speedup':>9}")
+    # settings and keys are read at import time, so each algorithm runs in a fresh interpreter
+    for algorithm in ("HS256", "RS256"):
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_auth", "--algorithm", algorithm,
+                        "--iterations", str(args.iterations)], check=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_requests_router.py
+"""
+Offline throughput of the edit-request router against the in-process
+Firestore emulator (app.core.firestore_client_mock) and a temporary sqlite
+database for the hours rollups.
+
+Each endpoint is driven by concurrent clients through the ASGI app; the
+emulator's counters give the Firestore reads / writes / RPCs per call.
+Use --latency-ms to charge a simulated network round-trip per RPC.
+
+Usage (from apps/backend):
+    python -m benchmarks.bench_requests_router
+    python -m benchmarks.bench_requests_router --requests 50000 --employees 200 --latency-ms 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+async def drive(client, name: str, make_call, calls: int, concurrency: int, db) -> None:
+    latencies = []
+    queue = list(range(calls))
+    before = dict(db.stats)
+
+    async def worker():
+        while queue:
+            i = queue.pop()
+            t0 = time.perf_counter()
+            response = await make_call(client, i)
+            latencies.append(time.perf_counter() - t0)
+            assert response.status_code == 200, (name, response.status_code, response.text)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    per_call = {k: (db.stats[k] - before.get(k, 0)) / calls for k in ("rpcs", "reads", "writes")}
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} {calls / elapsed:>9.0f} {statistics.median(latencies) * 1000:>9.2f} {p95 * 1000:>9.2f}"
+          f" {per_call['rpcs']:>7.1f} {per_call['reads']:>8.1f} {per_call['writes']:>7.1f}")
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.cli import create_schema
+    from app.core.auth_middleware import create_access_token
+    from app.core.config import settings
+    from app.core.firestore_client import db
+    from benchmarks.datagen import seed_edit_requests
+
+    create_schema()
+    t0 = time.perf_counter()
+    pending = seed_edit_requests(db, settings.APP_ID, args.requests, args.employees)
+    print(f"seeded {args.requests} requests / {args.employees} employees in {time.perf_counter() - t0:.1f}s"
+          f" ({len(pending)} pending)\n")
+
+    headers = {"Authorization": f"Bearer {create_access_token('bench-admin', 'admin')}"}
+    base = settings.API_PREFIX + "/requests"
+    chunks = [pending[i:i + args.bulk_size] for i in range(0, len(pending), args.bulk_size)]
+
+    async def list_pending(client, i):
+        return await client.get(f"{base}/", params={"status": "pending", "limit": 50}, headers=headers)
+
+    async def list_employee(client, i):
+        return await client.get(f"{base}/", params={"employeeId": f"emp-{i % args.employees}", "limit": 50},
+                                headers=headers)
+
+    async def list_second_page(client, i):
+        first = await client.get(f"{base}/", params={"limit": 50}, headers=headers)
+        cursor = first.json()["next_cursor"]
+        return await client.get(f"{base}/", params={"limit": 50, "cursor": cursor}, headers=headers)
+
+    async def count_pending(client, i):
+        return await client.get(f"{base}/pending_count", headers=headers)
+
+    async def bulk_approve(client, i):
+        return await client.post(f"{base}/bulk_approve", json={"requestIds": chunks[i]}, headers=headers)
+
+    print(f"{'endpoint':<22} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'rpcs':>7} {'reads':>8} {'writes':>7}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await drive(client, "list ?status=pending", list_pending, args.calls, args.concurrency, db)
+        await drive(client, "list ?employeeId=", list_employee, args.calls, args.concurrency, db)
+        await drive(client, "list page 2 (cursor)", list_second_page, args.calls, args.concurrency, db)
+        await drive(client, "pending_count", count_pending, args.calls, args.concurrency, db)
+        # sqlite allows a single writer, so approvals (which also update the rollups) run one at a time
+        await drive(client, f"bulk_approve x{args.bulk_size}", bulk_approve, len(chunks), 1, db)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000, help="edit requests to seed")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=500, help="calls per read endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated Firestore round-trip")
+    args = parser.parse_args()
+    # settings and the emulator are configured at import time, so the environment goes first
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["FIRESTORE_MOCK_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["STORAGE_BACKEND"] = "firestore"
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Cost of turning a page of tasks into a JSON body, per 10k tasks:
+
+  legacy    ORM objects -> _task_to_dict -> jsonable_encoder -> json.dumps (old GET /api/tasks)
+  fast      column tuples -> dict -> orjson (ORJSONResponse via fast_response)
+  strict    column tuples -> TaskPage validation -> JSON (STRICT_RESPONSES=true)
+
+Each path is timed from the executed SELECT to the final bytes, against a
+temporary sqlite database.
+
+Usage (from apps/backend):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --rows 10000 --repeat 10
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+def run(rows: int, repeat: int):
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import select, delete
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.responses import ORJSONResponse, orjson
+    from app.crud.task_crud import create_tasks_for_user, _task_to_dict, TASK_OUT_COLUMNS, TASK_OUT_FIELDS
+    from app.models.task_model import Task, TaskPage
+    from app.models.user_model import User, UserRole
+    from benchmarks.bench_bulk_insert import make_payload
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if not db.get(User, "bench"):
+            db.add(User(id="bench", first_name="Bench", last_name="User", role=UserRole.employee))
+        db.execute(delete(Task).where(Task.user_id == "bench"))
+        db.commit()
+        create_tasks_for_user("bench", make_payload(rows), db)
+
+    def legacy(db):
+        tasks = db.execute(select(Task).where(Task.user_id == "bench")).scalars().all()
+        page = {"items": [_task_to_dict(t) for t in tasks], "next_cursor": None}
+        return json.dumps(jsonable_encoder(page), ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
+
+    def fast(db):
+        result = db.execute(select(*TASK_OUT_COLUMNS).where(Task.user_id == "bench")).all()
+        page = {"items": [dict(zip(TASK_OUT_FIELDS, r)) for r in result], "next_cursor": None}
+        return ORJSONResponse(page).body
+
+    def strict(db):
+        result = db.execute(select(*TASK_OUT_COLUMNS).where(Task.user_id == "bench")).all()
+        page = {"items": [dict(zip(TASK_OUT_FIELDS, r)) for r in result], "next_cursor": None}
+        return TaskPage.model_validate(page).model_dump_json().encode("utf-8")
+
+    print(f"json backend: {'orjson' if orjson else 'stdlib json'}; {rows} tasks, best of {repeat}\n")
+    print(f"{'path':<8} {'ms/page':>9} {'ms/10k':>9} {'vs legacy':>10}")
+    bodies, timings = {}, {}
+    with SessionLocal() as db:
+        for name, fn in (("legacy", legacy), ("fast", fast), ("strict", strict)):
+            best = float("inf")
+            for _ in range(repeat):
+                db.expunge_all()
+                t0 = time.perf_counter()
+                bodies[name] = fn(db)
+                best = min(best, time.perf_counter() - t0)
+            timings[name] = best * 1000
+            print(f"{name:<8} {timings[name]:>9.1f} {timings[name] * 10000 / rows:>9.1f}"
+                  f" {timings['legacy'] / timings[name]:>9.1f}x")
+    # every path must produce the same document
+    assert json.loads(bodies["legacy"]) == json.loads(bodies["fast"]) == json.loads(bodies["strict"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="database URL (default: temporary sqlite file)")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    # settings are read at import time, so the URL must be in place before importing app.*
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    run(args.rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
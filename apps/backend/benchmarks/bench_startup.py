@@ -0,0 +1,70 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start budget check: how long a fresh interpreter takes to import
+app.main, which modules dominate (python -X importtime), and whether any
+module that should load lazily (Firestore / gRPC SDKs, Redis with the memory
+cache backend, ...) is imported at boot. Exits with status 1 when the median
+import time exceeds --budget-ms or a deferred module shows up.
+
+Usage (from apps/backend):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 800 --top 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# top-level packages that must not be imported just by starting the app
+DEFERRED = ("firebase_admin", "google.cloud", "grpc", "redis", "pyinstrument", "openai", "langchain", "elasticsearch")
+
+def _import_once(env: dict) -> tuple:
+    """(wall ms, {module: cumulative us}) for one `import app.main` in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import app.main; print((time.perf_counter() - t) * 1000)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env,
+                          capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    return float(proc.stdout.strip().splitlines()[-1]), cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    args = parser.parse_args()
+    env = dict(os.environ)
+    # importing the app must not need a reachable database
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/startup.db")
+    env.setdefault("CACHE_BACKEND", "memory")
+
+    runs = [_import_once(env) for _ in range(args.runs)]
+    wall = statistics.median(ms for ms, _ in runs)
+    cumulative = runs[-1][1]
+    top_level = sorted(((us, name) for name, us in cumulative.items() if "." not in name), reverse=True)
+    print(f"import app.main: median {wall:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)\n")
+    print(f"{'module':<32} {'cumulative ms':>14}")
+    for us, name in top_level[:args.top]:
+        print(f"{name:<32} {us / 1000:>14.1f}")
+
+    eager = sorted({d for d in DEFERRED for m in cumulative if m == d or m.startswith(d + ".")})
+    failed = False
+    if eager:
+        print(f"\nimported at boot but should load lazily: {', '.join(eager)}")
+        failed = True
+    if wall > args.budget_ms:
+        print(f"\nover budget by {wall - args.budget_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nwithin budget")
+
+if __name__ == "__main__":
+    main()
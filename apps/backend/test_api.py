@@ -21,7 +21,7 @@ def test_login():
         if response.status_code == 200:
             result = response.json()
             print("✅ Login successful!")
-            token = result.get("access_token")
+            token = result.get("token")
             print(f"Token received: {token[:50]}..." if token else "No token received")
             return token
         else:
@@ -46,7 +46,8 @@ def test_tasks_endpoint(token):
             "project": "TestProject",
             "taskName": "Test Task",
             "hour": 2,
-            "date": "2025-11-25"
+            "date": "2025-11-25",
+            "billing_status": "pending"
         }
     ]
     
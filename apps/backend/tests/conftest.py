@@ -0,0 +1,99 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures: one scratch SQLite database for the session, emptied before
+every test, and a TestClient with the API's lifespan running.
+
+Run from apps/backend:
+    python -m pytest
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="worklog-tests-")
+# settings are read at import time, so the environment is in place before importing app.*
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_tmp}/test.db",
+    ASYNC_DATABASE_URL="",
+    DATABASE_REPLICA_URLS="",
+    STORAGE_BACKEND="sql",
+    CACHE_BACKEND="memory",
+    ARCHIVE_URL=f"file://{_tmp}/archive",
+    # jobs are run by the tests themselves (run_job), not by background workers
+    JOB_WORKERS="0",
+    DB_AUTO_CREATE="false",
+    STARTUP_WARMUP="false",
+    JWT_ALGORITHM="HS256",
+    JWT_JWKS_URL="",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from app.cli import create_schema
+from app.core.auth_middleware import create_access_token, clear_token_cache
+from app.core.config import settings
+from app.core.database import Base, engine
+from app.core.versions import versions
+from app.crud.user_crud import user_cache
+from app.main import app
+from app.services import idempotency_service
+from app.services.analytics_service import analytics_cache
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    create_schema()
+    yield
+    shutil.rmtree(_tmp, ignore_errors=True)
+
+@pytest.fixture(autouse=True)
+def clean(schema):
+    """Every test starts from empty tables, caches, version counters and archive"""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    for cache in (user_cache, idempotency_service._results, analytics_cache):
+        asyncio.run(cache.clear())
+    clear_token_cache()
+    versions._versions.clear()
+    shutil.rmtree(f"{_tmp}/archive", ignore_errors=True)
+
+@pytest.fixture
+def firestore(monkeypatch):
+    """STORAGE_BACKEND=firestore over the in-process emulator (firebase-admin is not installed here)"""
+    from app.core.firestore_client import init_firestore
+
+    emulator = init_firestore()
+    emulator.reset()
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "firestore")
+    yield emulator
+    emulator.reset()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+def auth(user_id: str, role: str = "employee") -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id, role)}"}
+
+@pytest.fixture
+def admin() -> dict:
+    return auth("admin-1", "admin")
+
+@pytest.fixture
+def employee(client, admin) -> dict:
+    client.post("/api/users/", json={"userId": "emp-1", "firstName": "Emp", "lastName": "One"}, headers=admin)
+    return auth("emp-1")
+
+def task(date: str, project: str = "P", name: str = "work", hour: float = 1.0, billing_status: str = "pending") -> dict:
+    return {"project": project, "taskName": name, "hour": hour, "date": date, "billing_status": billing_status}
+
+def submit(client, headers: dict, tasks: list, **params) -> dict:
+    response = client.post("/api/tasks/", json=tasks, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
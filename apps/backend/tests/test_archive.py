@@ -0,0 +1,112 @@
+# backend/tests/test_archive.py
+"""The archive_period job: closed-month check, archive file, row removal and reports"""
+import json
+from app.core.config import settings
+from app.services.job_service import run_job
+from tests.conftest import submit, task
+
+def archive(client, admin, month: str) -> dict:
+    job = client.post("/api/jobs/archive_period", json={"month": month}, headers=admin)
+    assert job.status_code == 202, job.text
+    client.portal.call(run_job, job.json()["id"])
+    return client.get(f"/api/jobs/{job.json()['id']}", headers=admin).json()
+
+def archived_rows(client, admin, month: str) -> list:
+    response = client.get(f"/api/tasks/archive/{month}", params={"format": "ndjson"}, headers=admin)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def month_total(client, admin) -> dict:
+    rows = client.get("/api/reports/projects", params={"period": "month"}, headers=admin).json()
+    return {(r["periodStart"], r["billing_status"]): r["hours"] for r in rows}
+
+def test_open_month_is_refused(client, admin, employee):
+    submit(client, employee, [task("2025-03-03", billing_status="billed"), task("2025-03-04")])
+    job = archive(client, admin, "2025-03")
+    assert job["status"] == "failed" and "not closed" in job["error"]
+    assert len(client.get("/api/tasks/", headers=employee).json()["items"]) == 2
+    assert client.get("/api/tasks/archive", headers=admin).json() == []
+
+def test_month_not_ended_is_refused(client, admin):
+    from datetime import date
+
+    job = archive(client, admin, f"{date.today():%Y-%m}")
+    assert job["status"] == "failed" and "has not ended" in job["error"]
+
+def test_pending_edit_request_keeps_the_month_open(client, admin, employee):
+    created = submit(client, employee, [task("2025-03-03", billing_status="billed")])["created"][0]
+    client.post(f"/api/requests/{created['id']}/request_edit", json={"proposedHour": 2}, headers=employee)
+    assert archive(client, admin, "2025-03")["status"] == "failed"
+
+def test_closed_month_moves_to_the_archive(client, admin, employee):
+    submit(client, employee, [task("2025-03-03", billing_status="billed", hour=2),
+                              task("2025-03-31", name="last", billing_status="billed", hour=1),
+                              task("2025-04-01", hour=4)])
+    before = month_total(client, admin)
+    job = archive(client, admin, "2025-03")
+    assert job["status"] == "succeeded", job
+    assert job["result"]["archived"] == job["result"]["total"] == 2
+    # only March left the tasks table; the reports still count it
+    assert [t["date"][:10] for t in client.get("/api/tasks/", headers=employee).json()["items"]] == ["2025-04-01"]
+    assert month_total(client, admin) == before
+    assert [m["month"] for m in client.get("/api/tasks/archive", headers=admin).json()] == ["2025-03"]
+    assert sorted(r["hour"] for r in archived_rows(client, admin, "2025-03")) == [1.0, 2.0]
+    assert client.get("/api/tasks/archive/2025-02", headers=admin).status_code == 404
+
+def test_archived_tasks_sync_as_deleted(client, admin, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    created = submit(client, employee, [task("2025-03-03", billing_status="billed")])["created"][0]
+    cursor = client.get("/api/tasks/changes", headers=employee).json()["cursor"]
+    archive(client, admin, "2025-03")
+    body = client.get("/api/tasks/changes", params={"since": cursor}, headers=employee).json()
+    assert body["changed"] == [] and body["deleted"] == [created["id"]]
+
+def test_rearchive_merges_a_late_backfill(client, admin, employee):
+    first = submit(client, employee, [task("2025-03-03", billing_status="billed", hour=2)])["created"][0]
+    archive(client, admin, "2025-03")
+    late = submit(client, employee, [task("2025-03-20", name="late", billing_status="billed", hour=3)])["created"][0]
+    job = archive(client, admin, "2025-03")
+    assert job["status"] == "succeeded", job
+    assert job["result"]["archived"] == 1 and job["result"]["total"] == 2
+    assert sorted(r["id"] for r in archived_rows(client, admin, "2025-03")) == sorted([first["id"], late["id"]])
+    assert client.get("/api/tasks/", headers=employee).json()["items"] == []
+    assert month_total(client, admin) == {("2025-03-01", "billed"): 5.0}
+
+def test_rebuild_keeps_archived_hours(client, admin, employee):
+    submit(client, employee, [task("2025-03-03", billing_status="billed", hour=2), task("2025-04-02", hour=4)])
+    archive(client, admin, "2025-03")
+    # a backfill for the archived month that is not archived yet is counted once
+    submit(client, employee, [task("2025-03-05", name="late", billing_status="billed", hour=1)])
+    before = month_total(client, admin)
+    assert before == {("2025-03-01", "billed"): 3.0, ("2025-04-01", "pending"): 4.0}
+    assert client.post("/api/reports/rebuild", headers=admin).status_code == 200
+    assert month_total(client, admin) == before
+
+def test_archive_is_admin_only(client, employee):
+    assert client.post("/api/jobs/archive_period", json={"month": "2025-03"}, headers=employee).status_code == 403
+    assert client.get("/api/tasks/archive", headers=employee).status_code == 403
+
+def test_archive_needs_a_durable_store(client, admin, employee, monkeypatch):
+    from app.storage import archive_store
+
+    monkeypatch.setattr(settings, "ARCHIVE_URL", "")
+    monkeypatch.setattr(archive_store, "_store", None)
+    submit(client, employee, [task("2025-03-03", billing_status="billed")])
+    job = archive(client, admin, "2025-03")
+    assert job["status"] == "failed" and "ARCHIVE_URL" in job["error"]
+    assert len(client.get("/api/tasks/", headers=employee).json()["items"]) == 1
+    assert client.get("/api/tasks/archive", headers=admin).json() == []
+    assert client.get("/api/tasks/archive/2025-03", headers=admin).status_code == 409
+
+def test_failed_store_keeps_the_month_live(client, admin, employee, monkeypatch):
+    from app.storage.archive_store import get_archive_store
+
+    def broken(name, source):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(get_archive_store(), "put", broken)
+    submit(client, employee, [task("2025-03-03", billing_status="billed")])
+    job = archive(client, admin, "2025-03")
+    assert job["status"] == "failed" and "disk full" in job["error"]
+    assert len(client.get("/api/tasks/", headers=employee).json()["items"]) == 1
+    assert client.get("/api/tasks/archive", headers=admin).json() == []
@@ -0,0 +1,114 @@
+# backend/tests/test_auth.py
+"""JWT verification: the verified-token cache, revocation and JWKS key sets"""
+import time
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+from app.core import auth_middleware, jwt_keys
+from app.core.auth_middleware import create_access_token, revoke_token, token_cache_stats, verify_token
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+async def rejected(token: str) -> int:
+    with pytest.raises(HTTPException) as e:
+        await verify_token(token)
+    return e.value.status_code
+
+async def test_verified_tokens_are_cached():
+    token = create_access_token("cached-user", "employee")
+    assert await verify_token(token) == {"id": "cached-user", "role": "employee"}
+    misses = token_cache_stats()["misses"]
+    await verify_token(token)
+    assert token_cache_stats()["misses"] == misses
+
+async def test_expired_and_tampered_tokens_are_rejected():
+    expired = jwt.encode({"sub": "u", "role": "employee", "exp": int(time.time()) - 1}, settings.JWT_SECRET,
+                         algorithm="HS256")
+    assert await rejected(expired) == 401
+    assert await rejected(create_access_token("u", "employee")[:-2] + "xx") == 401
+
+async def test_revoked_token_is_rejected_even_when_cached():
+    token = create_access_token("revoked-user", "employee")
+    await verify_token(token)
+    revoke_token(token)
+    assert await rejected(token) == 401
+
+def pem_pair():
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                        serialization.NoEncryption()).decode()
+    public_pem = private.public_key().public_bytes(serialization.Encoding.PEM,
+                                                   serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+    return private_pem, public_pem
+
+class JWKSServer:
+    """Stands in for the identity provider's JWKS endpoint"""
+    def __init__(self):
+        self.keys = {}
+        self.fetches = 0
+        self.down = False
+
+    def add(self, kid: str) -> str:
+        private_pem, public_pem = pem_pair()
+        self.keys[kid] = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid}
+        return private_pem
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.fetches += 1
+        if self.down:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": list(self.keys.values())})
+
+@pytest.fixture
+def jwks(monkeypatch) -> JWKSServer:
+    server = JWKSServer()
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(jwt_keys.httpx, "AsyncClient",
+                        lambda **kw: real_client(transport=httpx.MockTransport(server.handle), **kw))
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_JWKS_URL", "https://idp.test/.well-known/jwks.json")
+    monkeypatch.setattr(auth_middleware, "keys", jwt_keys.KeySet("RS256"))
+    return server
+
+def rs256(private_pem: str, kid: str, sub: str = "u1") -> str:
+    claims = {"sub": sub, "role": "employee", "exp": int(time.time()) + 60}
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+async def test_jwks_key_verifies_and_is_fetched_once(jwks):
+    private_pem = jwks.add("k1")
+    assert await verify_token(rs256(private_pem, "k1")) == {"id": "u1", "role": "employee"}
+    assert await verify_token(rs256(private_pem, "k1", sub="u2")) == {"id": "u2", "role": "employee"}
+    assert jwks.fetches == 1
+
+async def test_unknown_kid_is_401_without_hammering_the_endpoint(jwks):
+    jwks.add("k1")
+    stranger = pem_pair()[0]
+    assert await rejected(rs256(stranger, "k9")) == 401
+    assert await rejected(rs256(stranger, "k9", sub="u2")) == 401
+    assert jwks.fetches == 1
+
+async def test_rotated_key_is_picked_up(jwks, monkeypatch):
+    await verify_token(rs256(jwks.add("k1"), "k1"))
+    monkeypatch.setattr(jwt_keys, "JWKS_MIN_REFRESH_SECONDS", 0)
+    assert await verify_token(rs256(jwks.add("k2"), "k2")) == {"id": "u1", "role": "employee"}
+    assert jwks.fetches == 2
+
+async def test_endpoint_down_before_any_key_is_503(jwks):
+    jwks.down = True
+    assert await rejected(rs256(pem_pair()[0], "k1")) == 503
+
+async def test_failed_refresh_keeps_the_last_good_keys(jwks, monkeypatch):
+    private_pem = jwks.add("k1")
+    await verify_token(rs256(private_pem, "k1"))
+    jwks.down = True
+    monkeypatch.setattr(jwt_keys, "JWKS_MIN_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(settings, "JWT_JWKS_TTL", 0)
+    # the expired key set is refetched in the background and keeps serving meanwhile and after
+    assert await verify_token(rs256(private_pem, "k1", sub="u2")) == {"id": "u2", "role": "employee"}
+    await auth_middleware.keys._refresh
+    assert await verify_token(rs256(private_pem, "k1", sub="u3")) == {"id": "u3", "role": "employee"}
+    assert jwks.fetches >= 2
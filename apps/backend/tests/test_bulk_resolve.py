@@ -0,0 +1,68 @@
+# backend/tests/test_bulk_resolve.py
+"""Bulk and single approve / reject of edit requests, on both storage backends"""
+import pytest
+from tests.conftest import submit, task
+
+@pytest.fixture(params=["sql", "firestore"], autouse=True)
+def backend(request):
+    if request.param == "firestore":
+        request.getfixturevalue("firestore")
+    return request.param
+
+def request_edit(client, headers, task_id: str, hour: float = 5, **proposed) -> str:
+    response = client.post(f"/api/requests/{task_id}/request_edit", json={"proposedHour": hour, **proposed},
+                           headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["request"]["id"]
+
+def tasks_by_id(client, headers) -> dict:
+    return {t["id"]: t for t in client.get("/api/tasks/", headers=headers).json()["items"]}
+
+def test_bulk_approve_applies_every_edit(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03", name="a"), task("2025-03-04", name="b")])["created"]
+    ids = [request_edit(client, employee, created[0]["id"], hour=3, proposedProject="Q"),
+           request_edit(client, employee, created[1]["id"], hour=6)]
+    assert tasks_by_id(client, employee)[created[0]["id"]]["edit_request_pending"] is True
+    response = client.post("/api/requests/bulk_approve", json={"requestIds": ids}, headers=admin)
+    assert response.status_code == 200
+    assert sorted(response.json()["resolved"]) == sorted(ids) and response.json()["skipped"] == {}
+    stored = tasks_by_id(client, employee)
+    first, second = stored[created[0]["id"]], stored[created[1]["id"]]
+    assert (first["hour"], first["project"], first["status"]) == (3.0, "Q", "approved")
+    assert (second["hour"], second["edit_request_pending"]) == (6.0, False)
+
+def test_bulk_reject_leaves_tasks_alone(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03", hour=2)])["created"]
+    rid = request_edit(client, employee, created[0]["id"], hour=8)
+    response = client.post("/api/requests/bulk_reject", json={"requestIds": [rid]}, headers=admin)
+    assert response.json()["resolved"] == [rid]
+    stored = tasks_by_id(client, employee)[created[0]["id"]]
+    assert (stored["hour"], stored["edit_request_pending"]) == (2.0, False)
+
+def test_unknown_and_resolved_requests_are_skipped(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03")])["created"]
+    rid = request_edit(client, employee, created[0]["id"])
+    client.post(f"/api/requests/{rid}/approve", headers=admin)
+    response = client.post("/api/requests/bulk_approve", json={"requestIds": [rid, "missing"]}, headers=admin)
+    assert response.json() == {"message": "0 requests approved", "resolved": [],
+                               "skipped": {rid: "not_pending", "missing": "not_found"}}
+
+def test_single_endpoints_map_skips_to_errors(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03")])["created"]
+    rid = request_edit(client, employee, created[0]["id"])
+    assert client.post("/api/requests/missing/approve", headers=admin).status_code == 404
+    assert client.post(f"/api/requests/{rid}/reject", headers=admin).status_code == 200
+    assert client.post(f"/api/requests/{rid}/approve", headers=admin).status_code == 400
+
+def test_two_requests_on_one_task_apply_in_order(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03")])["created"]
+    ids = [request_edit(client, employee, created[0]["id"], hour=2),
+           request_edit(client, employee, created[0]["id"], hour=7)]
+    client.post("/api/requests/bulk_approve", json={"requestIds": ids}, headers=admin)
+    assert tasks_by_id(client, employee)[created[0]["id"]]["hour"] == 7.0
+
+def test_resolving_is_admin_only(client, employee):
+    created = submit(client, employee, [task("2025-03-03")])["created"]
+    rid = request_edit(client, employee, created[0]["id"])
+    assert client.post("/api/requests/bulk_approve", json={"requestIds": [rid]}, headers=employee).status_code == 403
+    assert client.post(f"/api/requests/{rid}/approve", headers=employee).status_code == 403
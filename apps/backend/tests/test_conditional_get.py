@@ -0,0 +1,79 @@
+# backend/tests/test_conditional_get.py
+"""ETag / 304 answers and the version scopes that invalidate them"""
+from tests.conftest import auth, submit, task
+
+def revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+def test_unchanged_collection_is_304(client, admin, employee):
+    first = client.get("/api/users/", headers=admin)
+    etag = first.headers["ETag"]
+    again = revalidate(client, "/api/users/", admin, etag)
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert revalidate(client, "/api/users/", admin, f'W/{etag}, "other"').status_code == 304
+    assert revalidate(client, "/api/users/", admin, '"other"').status_code == 200
+
+def test_user_write_invalidates_users_scope(client, admin, employee):
+    etag = client.get("/api/users/", headers=admin).headers["ETag"]
+    profile = client.get("/api/users/emp-1", headers=employee).headers["ETag"]
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    fresh = revalidate(client, "/api/users/", admin, etag)
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert len(fresh.json()) == 2
+    assert revalidate(client, "/api/users/emp-1", employee, profile).status_code == 200
+
+def test_task_scope_is_per_user(client, admin, employee):
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    other = auth("emp-2")
+    mine = client.get("/api/tasks/", headers=employee).headers["ETag"]
+    theirs = client.get("/api/tasks/", headers=other).headers["ETag"]
+    submit(client, other, [task("2025-03-03")])
+    assert revalidate(client, "/api/tasks/", employee, mine).status_code == 304
+    assert revalidate(client, "/api/tasks/", other, theirs).status_code == 200
+    submit(client, employee, [task("2025-03-03")])
+    assert revalidate(client, "/api/tasks/", employee, mine).status_code == 200
+
+def test_etag_covers_the_query(client, employee):
+    submit(client, employee, [task("2025-03-03")])
+    etag = client.get("/api/tasks/", params={"project": "P"}, headers=employee).headers["ETag"]
+    assert client.get("/api/tasks/", params={"project": "Q"}, headers=employee).headers["ETag"] != etag
+    other_page = client.get("/api/tasks/", params={"project": "Q"}, headers={**employee, "If-None-Match": etag})
+    assert other_page.status_code == 200
+
+def test_edit_requests_invalidate_requests_scope(client, admin, employee):
+    created = submit(client, employee, [task("2025-03-03")])["created"][0]
+    etag = client.get("/api/requests/", headers=admin).headers["ETag"]
+    count_etag = client.get("/api/requests/pending_count", headers=admin).headers["ETag"]
+    response = client.post(f"/api/requests/{created['id']}/request_edit", json={"proposedHour": 3}, headers=employee)
+    assert revalidate(client, "/api/requests/", admin, etag).status_code == 200
+    assert revalidate(client, "/api/requests/pending_count", admin, count_etag).status_code == 200
+    etag = client.get("/api/requests/", headers=admin).headers["ETag"]
+    tasks_etag = client.get("/api/tasks/", headers=employee).headers["ETag"]
+    client.post(f"/api/requests/{response.json()['request']['id']}/approve", headers=admin)
+    # approval changes both the request and the task
+    assert revalidate(client, "/api/requests/", admin, etag).status_code == 200
+    assert revalidate(client, "/api/tasks/", employee, tasks_etag).status_code == 200
+
+def test_billing_job_invalidates_task_scope(client, admin, employee):
+    from app.services.job_service import run_job
+
+    submit(client, employee, [task("2025-03-03")])
+    etag = client.get("/api/tasks/", headers=employee).headers["ETag"]
+    job = client.post("/api/jobs/billing_transition", headers=admin, json={
+        "project": "P", "date_from": "2025-03-01", "date_to": "2025-03-31", "to_status": "billed"}).json()
+    assert revalidate(client, "/api/tasks/", employee, etag).status_code == 304
+    client.portal.call(run_job, job["id"])
+    fresh = revalidate(client, "/api/tasks/", employee, etag)
+    assert fresh.status_code == 200
+    assert fresh.json()["items"][0]["billing_status"] == "billed"
+
+def test_untrusted_memory_versions_send_no_validators(client, admin, employee, monkeypatch):
+    from app.core.versions import versions
+
+    etag = client.get("/api/users/", headers=admin).headers["ETag"]
+    # several workers, each with its own counters: none of them may vouch for a copy
+    monkeypatch.setattr(versions, "trusted", False)
+    response = revalidate(client, "/api/users/", admin, etag)
+    assert response.status_code == 200
+    assert "ETag" not in response.headers and "Last-Modified" not in response.headers
@@ -0,0 +1,61 @@
+# backend/tests/test_events.py
+"""Server-sent change notices: stream tickets, delivery and backpressure"""
+import json
+import pytest
+from app.api.events import _stream
+from app.core.config import settings
+from app.core.events import events, notify, user_channel
+
+@pytest.fixture
+def no_streams(monkeypatch):
+    # a stream that authenticates is turned away with 503 instead of held open
+    monkeypatch.setattr(settings, "EVENTS_MAX_STREAMS", 0)
+
+def ticket(client, headers) -> str:
+    response = client.post("/api/events/ticket", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["expires_in"] == settings.EVENTS_TICKET_SECONDS
+    return response.json()["ticket"]
+
+def test_ticket_needs_a_token(client):
+    assert client.post("/api/events/ticket").status_code == 401
+
+def test_ticket_opens_one_stream(client, employee, no_streams):
+    t = ticket(client, employee)
+    assert client.get("/api/events/", params={"ticket": t}).status_code == 503
+    assert client.get("/api/events/", params={"ticket": t}).status_code == 401
+
+def test_unknown_ticket_is_rejected(client, no_streams):
+    assert client.get("/api/events/", params={"ticket": "made-up"}).status_code == 401
+
+def test_token_in_the_query_is_not_accepted(client, employee, no_streams):
+    token = employee["Authorization"].split()[1]
+    assert client.get("/api/events/", params={"access_token": token}).status_code == 401
+    assert client.get("/api/events/", headers=employee).status_code == 503
+
+def frame(raw: str) -> dict:
+    data = [line for line in raw.splitlines() if line.startswith("data: ")][0]
+    return json.loads(data[len("data: "):])
+
+@pytest.mark.anyio
+async def test_stream_delivers_its_channels_only():
+    stream = _stream([user_channel("u1")])
+    first = await stream.__anext__()
+    assert first.startswith(f"retry: {settings.EVENTS_RETRY_MS}\n") and frame(first) == {"type": "ready"}
+    await notify([user_channel("u2")], "tasks.changed")
+    await notify([user_channel("u1")], "tasks.changed", inserted=1)
+    assert frame(await stream.__anext__()) == {"type": "tasks.changed", "inserted": 1}
+    await stream.aclose()
+    assert events.streams == 0
+
+@pytest.mark.anyio
+async def test_slow_stream_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_QUEUE_SIZE", 2)
+    stream = _stream([user_channel("u1")])
+    await stream.__anext__()
+    for i in range(5):
+        await notify([user_channel("u1")], "tasks.changed", n=i)
+    assert frame(await stream.__anext__()) == {"type": "resync"}
+    await notify([user_channel("u1")], "tasks.changed", n=5)
+    assert frame(await stream.__anext__()) == {"type": "tasks.changed", "n": 5}
+    await stream.aclose()
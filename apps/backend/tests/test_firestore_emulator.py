@@ -0,0 +1,129 @@
+# backend/tests/test_firestore_emulator.py
+"""The in-process Firestore emulator: paths, queries, indexes, batches, transactions and snapshots"""
+import json
+from pathlib import Path
+import pytest
+from app.core.firestore_client_mock import (
+    DESCENDING, MAX_WRITES, AlreadyExists, FailedPrecondition, InvalidArgument, MockFirestoreClient,
+    NotFound, transactional,
+)
+
+@pytest.fixture
+def fs() -> MockFirestoreClient:
+    return MockFirestoreClient()
+
+def tasks(fs, uid: str = "u1"):
+    return fs.collection("artifacts", "app", "users", uid, "tasks")
+
+def seed(fs, n: int = 10):
+    for i in range(n):
+        tasks(fs).document(f"t{i:02d}").set({"project": "P" if i % 2 else "Q", "hour": i, "date": f"2025-03-{i + 1:02d}"})
+
+def ids(snaps) -> list:
+    return [s.id for s in snaps]
+
+def test_hierarchical_paths_and_snapshots(fs):
+    ref = tasks(fs).document("t1")
+    assert ref.path == "artifacts/app/users/u1/tasks/t1"
+    assert not ref.get().exists
+    ref.set({"hour": 1})
+    snap = ref.get()
+    assert snap.exists and snap.to_dict() == {"hour": 1} and snap.get("hour") == 1
+    assert ref.parent.parent.id == "u1"
+    assert [c.id for c in fs.document("artifacts", "app", "users", "u1").collections()] == ["tasks"]
+    with pytest.raises(InvalidArgument):
+        fs.collection("artifacts", "app")
+
+def test_auto_ids_do_not_collide(fs):
+    added = {tasks(fs).add({"hour": 1})[1].id for _ in range(200)}
+    assert len(added) == 200 and len(tasks(fs).get()) == 200
+
+def test_where_order_by_limit_and_start_after(fs):
+    seed(fs)
+    query = tasks(fs).where("project", "==", "P").order_by("hour", direction=DESCENDING)
+    assert ids(query.get()) == ["t09", "t07", "t05", "t03", "t01"]
+    first = query.limit(2).get()
+    assert ids(first) == ["t09", "t07"]
+    assert ids(query.start_after(first[-1]).limit(2).get()) == ["t05", "t03"]
+    assert ids(tasks(fs).where("hour", ">=", 7).get()) == ["t07", "t08", "t09"]
+    assert ids(tasks(fs).where("hour", "in", [2, 4]).get()) == ["t02", "t04"]
+    assert tasks(fs).where("project", "==", "Q").count().get()[0][0].value == 5
+
+def test_filters_are_answered_from_indexes(fs):
+    seed(fs, 200)
+    fs.stats.clear()
+    assert len(tasks(fs).where("hour", "==", 7).get()) == 1
+    # only the matching document is read, not the collection
+    assert fs.stats["docs_scanned"] == 1 and fs.stats["index_lookups"] == 1
+    tasks(fs).document("t07").update({"hour": 500})
+    assert tasks(fs).where("hour", "==", 7).get() == []
+    assert ids(tasks(fs).where("hour", "==", 500).get()) == ["t07"]
+
+def test_collection_group_spans_users(fs):
+    tasks(fs, "u1").document("a").set({"project": "P"})
+    tasks(fs, "u2").document("b").set({"project": "P"})
+    assert sorted(ids(fs.collection_group("tasks").where("project", "==", "P").get())) == ["a", "b"]
+
+def test_batch_is_all_or_nothing(fs):
+    tasks(fs).document("taken").set({"hour": 1})
+    batch = fs.batch()
+    batch.set(tasks(fs).document("new"), {"hour": 2})
+    batch.create(tasks(fs).document("taken"), {"hour": 3})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert not tasks(fs).document("new").get().exists
+    assert tasks(fs).document("taken").get().to_dict() == {"hour": 1}
+
+def test_batch_write_limit(fs):
+    batch = fs.batch()
+    for i in range(MAX_WRITES):
+        batch.set(tasks(fs).document(f"t{i}"), {"hour": i})
+    with pytest.raises(InvalidArgument):
+        batch.set(tasks(fs).document("one-too-many"), {"hour": 0})
+    assert tasks(fs).get() == []
+    batch.commit()
+    assert tasks(fs).count().get()[0][0].value == MAX_WRITES
+
+def test_preconditions(fs):
+    ref = tasks(fs).document("t1")
+    ref.set({"hour": 1})
+    seen = ref.get().update_time
+    ref.update({"hour": 2}, option=fs.write_option(last_update_time=seen))
+    with pytest.raises(FailedPrecondition):
+        ref.update({"hour": 3}, option=fs.write_option(last_update_time=seen))
+    with pytest.raises(NotFound):
+        tasks(fs).document("missing").update({"hour": 1})
+    assert ref.get().to_dict() == {"hour": 2}
+
+def test_transaction_retries_on_contention(fs):
+    ref = tasks(fs).document("counter")
+    ref.set({"n": 0})
+    attempts = []
+
+    @transactional
+    def increment(transaction):
+        n = ref.get(transaction=transaction).to_dict()["n"]
+        if not attempts:
+            # another client writes between our read and our commit
+            ref.update({"n": 100})
+        attempts.append(n)
+        transaction.update(ref, {"n": n + 1})
+
+    increment(fs.transaction())
+    assert attempts == [0, 100]
+    assert ref.get().to_dict() == {"n": 101}
+
+def test_snapshot_round_trip(fs, tmp_path):
+    seed(fs, 3)
+    path = str(tmp_path / "snapshot.json")
+    fs.save_snapshot(path)
+    restored = MockFirestoreClient(snapshot_path=path)
+    assert [s.to_dict() for s in tasks(restored).get()] == [s.to_dict() for s in tasks(fs).get()]
+    assert ids(tasks(restored).where("project", "==", "P").get()) == ["t01"]
+
+def test_every_inbox_query_has_a_composite_index():
+    # the request inbox's equality filters plus its date ordering need a composite index on real Firestore
+    indexes = json.loads((Path(__file__).parent.parent / "firestore.indexes.json").read_text())["indexes"]
+    shapes = {tuple(f["fieldPath"] for f in i["fields"]) for i in indexes if i["collectionGroup"] == "requests"}
+    for equality in (("status",), ("employeeId",), ("status", "employeeId")):
+        assert equality + ("date",) in shapes
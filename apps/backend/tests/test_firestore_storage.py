@@ -0,0 +1,65 @@
+# backend/tests/test_firestore_storage.py
+"""STORAGE_BACKEND=firestore: each call is one atomic Firestore commit, in step with its SQL side"""
+import pytest
+from app.storage import firestore_store
+from tests.conftest import submit, task
+
+pytestmark = pytest.mark.usefixtures("firestore")
+
+def daily(client, admin) -> dict:
+    rows = client.get("/api/reports/daily", headers=admin).json()
+    return {(r["project"], r["day"]): r["hours"] for r in rows}
+
+def request_edits(client, headers, tasks: list, hour: float = 5) -> list:
+    return [client.post(f"/api/requests/{t['id']}/request_edit", json={"proposedHour": hour},
+                        headers=headers).json()["request"]["id"] for t in tasks]
+
+def test_submission_writes_tasks_and_rollups(client, employee, admin):
+    body = submit(client, employee, [task("2025-03-03", hour=2), task("2025-03-04", hour=3)])
+    assert body["inserted"] == 2
+    assert len(client.get("/api/tasks/", headers=employee).json()["items"]) == 2
+    assert daily(client, admin) == {("P", "2025-03-03"): 2.0, ("P", "2025-03-04"): 3.0}
+
+def test_submission_over_one_batch_is_refused_whole(client, employee, admin, firestore):
+    tasks = [task("2025-03-03", name=f"t{i}") for i in range(firestore_store.MAX_BATCH_WRITES + 1)]
+    response = client.post("/api/tasks/", json=tasks, headers=employee)
+    assert response.status_code == 413
+    assert client.get("/api/tasks/", headers=employee).json()["items"] == []
+    assert daily(client, admin) == {}
+    assert submit(client, employee, tasks[:-1])["inserted"] == firestore_store.MAX_BATCH_WRITES
+
+def test_bulk_resolve_over_one_batch_is_refused(client, employee, admin):
+    cap = firestore_store.FirestoreStorage.max_requests_per_call
+    response = client.post("/api/requests/bulk_approve", json={"requestIds": [f"r{i}" for i in range(cap + 1)]},
+                           headers=admin)
+    assert response.status_code == 413
+
+def test_conflict_leaves_every_request_unresolved(client, employee, admin, firestore, monkeypatch):
+    tasks = submit(client, employee, [task("2025-03-03", name=f"t{i}", hour=1) for i in range(3)])["created"]
+    ids = request_edits(client, employee, tasks)
+    new_batch = firestore_store.new_batch
+
+    def racing_batch():
+        # another admin resolves the last request between our read and our commit
+        firestore_store.requests_collection().document(ids[-1]).update({"status": "rejected"})
+        return new_batch()
+
+    monkeypatch.setattr(firestore_store, "new_batch", racing_batch)
+    response = client.post("/api/requests/bulk_approve", json={"requestIds": ids}, headers=admin)
+    assert response.status_code == 409
+    monkeypatch.setattr(firestore_store, "new_batch", new_batch)
+    # nothing of the batch landed: not in Firestore, not in the rollups
+    pending = client.get("/api/requests/", params={"status": "pending"}, headers=admin).json()["items"]
+    assert sorted(r["id"] for r in pending) == sorted(ids[:-1])
+    assert [t["hour"] for t in client.get("/api/tasks/", headers=employee).json()["items"]] == [1.0] * 3
+    assert daily(client, admin) == {("P", "2025-03-03"): 3.0}
+
+def test_approval_moves_hours_and_syncs(client, employee, admin):
+    tasks = submit(client, employee, [task("2025-03-03", hour=1), task("2025-03-04", hour=1)])["created"]
+    cursor = client.get("/api/tasks/changes", headers=employee).json()["cursor"]
+    ids = request_edits(client, employee, tasks, hour=4)
+    response = client.post("/api/requests/bulk_approve", json={"requestIds": ids}, headers=admin)
+    assert sorted(response.json()["resolved"]) == sorted(ids)
+    assert daily(client, admin) == {("P", "2025-03-03"): 4.0, ("P", "2025-03-04"): 4.0}
+    changed = client.get("/api/tasks/changes", params={"since": cursor}, headers=employee).json()["changed"]
+    assert {(t["id"], t["hour"]) for t in changed} == {(t["id"], 4.0) for t in tasks}
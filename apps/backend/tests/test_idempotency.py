@@ -0,0 +1,90 @@
+# backend/tests/test_idempotency.py
+"""Idempotency-Key replay and conflicts on POST /api/tasks"""
+import asyncio
+import anyio
+import httpx
+import pytest
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.models.idempotency_model import IdempotencyKey
+from app.services.idempotency_service import _results
+from tests.conftest import auth, task
+
+def post(client, headers, tasks, key, **params):
+    return client.post("/api/tasks/", json=tasks, headers={**headers, "Idempotency-Key": key}, params=params)
+
+def count(client, headers) -> int:
+    return len(client.get("/api/tasks/", headers=headers).json()["items"])
+
+def test_retry_replays_the_first_response(client, employee):
+    first = post(client, employee, [task("2025-03-03")], "k1")
+    assert first.status_code == 200 and "Idempotent-Replayed" not in first.headers
+    for _ in range(2):
+        again = post(client, employee, [task("2025-03-03")], "k1")
+        assert again.status_code == 200
+        assert again.headers["Idempotent-Replayed"] == "true"
+        assert again.json() == first.json()
+    assert count(client, employee) == 1
+
+def test_same_key_for_another_request_is_422(client, employee):
+    post(client, employee, [task("2025-03-03")], "k1")
+    assert post(client, employee, [task("2025-03-03", hour=2)], "k1").status_code == 422
+    # on_duplicate is part of the request
+    assert post(client, employee, [task("2025-03-03")], "k1", on_duplicate="skip").status_code == 422
+    assert count(client, employee) == 1
+
+def test_keys_are_per_user(client, employee, admin):
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    other = auth("emp-2")
+    post(client, employee, [task("2025-03-03")], "shared")
+    response = post(client, other, [task("2025-03-04")], "shared")
+    assert response.status_code == 200 and "Idempotent-Replayed" not in response.headers
+    assert count(client, employee) == count(client, other) == 1
+
+def test_expired_key_applies_again(client, employee, monkeypatch):
+    post(client, employee, [task("2025-03-03")], "k1")
+    # the replay puts the result in the cache
+    assert post(client, employee, [task("2025-03-03")], "k1").headers["Idempotent-Replayed"] == "true"
+    monkeypatch.setattr(settings, "IDEMPOTENCY_TTL_HOURS", 0)
+    response = post(client, employee, [task("2025-03-03", hour=2)], "k1")
+    assert response.status_code == 200 and "Idempotent-Replayed" not in response.headers
+    assert count(client, employee) == 2
+
+@pytest.mark.anyio
+async def test_concurrent_requests_with_one_key_write_once(client, employee):
+    headers = {**employee, "Idempotency-Key": "race"}
+    responses = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        async def send():
+            responses.append(await c.post("/api/tasks/", json=[task("2025-03-03")], headers=headers))
+        async with anyio.create_task_group() as tg:
+            for _ in range(4):
+                tg.start_soon(send)
+    assert [r.status_code for r in responses] == [200] * 4
+    assert sum("Idempotent-Replayed" not in r.headers for r in responses) == 1
+    assert len({r.json()["created"][0]["id"] for r in responses}) == 1
+    assert count(client, employee) == 1
+
+def stored_record(key: str) -> dict:
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(IdempotencyKey.response).where(IdempotencyKey.key == key))).scalar_one()
+    return asyncio.run(read())
+
+def test_record_keeps_ids_and_counts_not_the_body(client, employee):
+    first = post(client, employee, [task("2025-03-03"), task("2025-03-04")], "k1").json()
+    assert stored_record("k1") == {"createdIds": [t["id"] for t in first["created"]],
+                                   "inserted": 2, "updated": 0, "skipped": 0}
+
+def test_large_records_replay_from_the_table(client, employee, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_CACHE_MAX_TASKS", 1)
+    first = post(client, employee, [task("2025-03-03"), task("2025-03-04")], "big").json()
+    post(client, employee, [task("2025-03-05")], "small")
+    for key, tasks in (("big", [task("2025-03-03"), task("2025-03-04")]), ("small", [task("2025-03-05")])):
+        assert post(client, employee, tasks, key).headers["Idempotent-Replayed"] == "true"
+    assert post(client, employee, [task("2025-03-03"), task("2025-03-04")], "big").json() == first
+    assert asyncio.run(_results.get("emp-1:big")) is None
+    assert asyncio.run(_results.get("emp-1:small")) is not None
@@ -0,0 +1,129 @@
+# backend/tests/test_jobs.py
+"""Background jobs: the billing transition, progress, cancellation, failures, stale jobs and workers"""
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job_model import Job
+from app.services import job_service
+from app.services.job_service import JOB_TYPES, cancel_job, run_job, worker
+from tests.conftest import submit, task
+
+def billing_transition(client, admin, **params) -> dict:
+    body = {"project": "P", "date_from": "2025-03-01", "date_to": "2025-03-31", "to_status": "billed", **params}
+    response = client.post("/api/jobs/billing_transition", json=body, headers=admin)
+    assert response.status_code == 202, response.text
+    return response.json()
+
+async def enqueue(job_type: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await job_service.enqueue_job(db, job_type, {}, created_by="admin-1")
+
+def job(client, admin, job_id: str) -> dict:
+    return client.get(f"/api/jobs/{job_id}", headers=admin).json()
+
+def statuses(client, employee) -> dict:
+    return {t["taskName"]: t["billing_status"] for t in client.get("/api/tasks/", headers=employee).json()["items"]}
+
+def test_transition_moves_matching_tasks_in_chunks(client, employee, admin, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CHUNK", 2)
+    submit(client, employee, [task("2025-03-03", name=f"t{i}") for i in range(5)]
+           + [task("2025-03-03", name="other", project="Q"), task("2025-04-01", name="april")])
+    queued = billing_transition(client, admin)
+    assert queued["status"] == "queued" and queued["created_by"] == "admin-1"
+    client.portal.call(run_job, queued["id"])
+    done = job(client, admin, queued["id"])
+    assert (done["status"], done["progress_done"], done["progress_total"]) == ("succeeded", 5, 5)
+    assert done["result"] == {"moved": 5, "to_status": "billed"}
+    assert statuses(client, employee) == {**{f"t{i}": "billed" for i in range(5)},
+                                          "other": "pending", "april": "pending"}
+
+def test_from_status_limits_what_moves(client, employee, admin):
+    submit(client, employee, [task("2025-03-03", name="a"), task("2025-03-04", name="b", billing_status="billed")])
+    queued = billing_transition(client, admin, from_status="billed", to_status="invoiced")
+    client.portal.call(run_job, queued["id"])
+    assert statuses(client, employee) == {"a": "pending", "b": "invoiced"}
+
+def test_cancelling_a_queued_job(client, admin):
+    queued = billing_transition(client, admin)
+    cancelled = client.post(f"/api/jobs/{queued['id']}/cancel", headers=admin).json()
+    assert cancelled["status"] == "cancelled"
+    assert [j["id"] for j in client.get("/api/jobs/", params={"status": "cancelled"}, headers=admin).json()] == \
+        [queued["id"]]
+
+def test_running_job_stops_at_its_next_checkpoint(client, admin, monkeypatch):
+    async def cancelled_midway(ctx):
+        await ctx.checkpoint(1, 3)
+        await cancel_job(ctx.db, ctx.job_id)
+        await ctx.checkpoint(2)
+        return {"finished": True}
+
+    monkeypatch.setitem(JOB_TYPES, "cancelled_midway", cancelled_midway)
+    created = client.portal.call(enqueue, "cancelled_midway")
+    client.portal.call(run_job, created["id"])
+    stopped = job(client, admin, created["id"])
+    assert (stopped["status"], stopped["progress_done"], stopped["result"]) == ("cancelled", 2, None)
+
+def test_failed_job_keeps_the_error(client, admin, monkeypatch):
+    async def broken(ctx):
+        raise RuntimeError("no can do")
+
+    monkeypatch.setitem(JOB_TYPES, "broken", broken)
+    created = client.portal.call(enqueue, "broken")
+    client.portal.call(run_job, created["id"])
+    failed = job(client, admin, created["id"])
+    assert (failed["status"], failed["error"]) == ("failed", "RuntimeError: no can do")
+
+def test_stale_running_job_is_requeued_and_resumes(client, employee, admin):
+    submit(client, employee, [task("2025-03-03", name=f"t{i}") for i in range(3)])
+    queued = billing_transition(client, admin)
+
+    async def abandon():
+        async with AsyncSessionLocal() as db:
+            assert await job_service._claim(db) == queued["id"]
+            assert await job_service._claim(db) is None
+            stale = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+            await db.execute(update(Job).where(Job.id == queued["id"]).values(heartbeat_at=stale))
+            await db.commit()
+            return await job_service._requeue_stale(db)
+
+    assert client.portal.call(abandon) == 1
+    assert job(client, admin, queued["id"])["status"] == "queued"
+    client.portal.call(run_job, queued["id"])
+    assert job(client, admin, queued["id"])["status"] == "succeeded"
+    assert set(statuses(client, employee).values()) == {"billed"}
+
+def test_worker_runs_queued_jobs(client, employee, admin, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_SECONDS", 0.05)
+    submit(client, employee, [task("2025-03-03")])
+    queued = billing_transition(client, admin)
+
+    async def run_worker():
+        worker.start(1)
+        try:
+            for _ in range(100):
+                async with AsyncSessionLocal() as db:
+                    if (await job_service.get_job(db, queued["id"]))["status"] == "succeeded":
+                        return True
+                await asyncio.sleep(0.02)
+            return False
+        finally:
+            await worker.stop()
+
+    assert client.portal.call(run_worker)
+    assert statuses(client, employee) == {"work": "billed"}
+
+def test_job_api_errors(client, employee, admin, firestore):
+    assert client.get("/api/jobs/missing", headers=admin).status_code == 404
+    assert client.get("/api/jobs/", headers=employee).status_code == 403
+    body = {"project": "P", "date_from": "2025-03-31", "date_to": "2025-03-01", "to_status": "billed"}
+    assert client.post("/api/jobs/billing_transition", json=body, headers=admin).status_code == 422
+    # jobs work through the SQL tasks table
+    body["date_from"], body["date_to"] = body["date_to"], body["date_from"]
+    assert client.post("/api/jobs/billing_transition", json=body, headers=admin).status_code == 409
+
+def test_finished_job_cannot_be_cancelled(client, admin):
+    queued = billing_transition(client, admin)
+    client.portal.call(run_job, queued["id"])
+    assert client.post(f"/api/jobs/{queued['id']}/cancel", headers=admin).status_code == 409
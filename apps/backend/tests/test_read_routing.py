@@ -0,0 +1,120 @@
+# backend/tests/test_read_routing.py
+"""Read-replica routing: lag checks, read-your-writes and the write-tracking middleware"""
+import time
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core import read_routing
+from app.core.config import settings
+from app.core.read_routing import ReadRouter, ReadYourWritesMiddleware, db_reads
+from app.core.versions import versions, writer_scope
+from tests.conftest import auth, submit, task
+
+def replica_engine(path: str):
+    # a read-only connection to a SQLite file stands in for a streaming replica
+    return create_async_engine(f"sqlite+aiosqlite:///file:{path}?mode=ro&uri=true", connect_args={"uri": True})
+
+@pytest.fixture
+def settled(monkeypatch):
+    """Writers seen before the test started no longer count as recent"""
+    monkeypatch.setattr(versions, "started_at", time.time() - 3600)
+
+@pytest.fixture
+def replica():
+    return replica_engine(settings.DATABASE_URL.removeprefix("sqlite:///"))
+
+@pytest.mark.anyio
+async def test_measured_replica_serves_reads(replica, settled):
+    router = ReadRouter([replica])
+    assert await router.choose("emp-1") is None  # not measured yet
+    await router.measure()
+    assert router.stats()["replica0"]["lag"] == 0.0
+    assert (await router.choose("emp-1")).name == "replica0"
+    await replica.dispose()
+
+@pytest.mark.anyio
+async def test_recent_writer_reads_from_the_primary(replica, settled):
+    router = ReadRouter([replica])
+    await router.measure()
+    before = db_reads.value("primary_recent_write")
+    await versions.bump(writer_scope("emp-1"))
+    assert await router.choose("emp-1") is None
+    assert db_reads.value("primary_recent_write") == before + 1
+    # other users are not held back by emp-1's write
+    assert await router.choose("emp-2") is not None
+    await replica.dispose()
+
+@pytest.mark.anyio
+async def test_unreachable_or_lagging_replica_is_skipped(tmp_path, replica, settled):
+    missing = replica_engine(str(tmp_path / "missing.db"))
+    router = ReadRouter([missing, replica])
+    await router.measure()
+    stats = router.stats()
+    assert stats["replica0"]["lag"] == float("inf") and not stats["replica0"]["usable"]
+    assert {(await router.choose("emp-1")).name for _ in range(4)} == {"replica1"}
+    router.replicas[1].lag = settings.DB_REPLICA_MAX_LAG_SECONDS + 1
+    before = db_reads.value("primary_lagging")
+    assert await router.choose("emp-1") is None
+    assert db_reads.value("primary_lagging") == before + 1
+    # a measurement that is too old no longer vouches for the replica
+    router.replicas[1].lag = 0.0
+    router.replicas[1].measured_at -= 3 * settings.DB_REPLICA_LAG_CHECK_SECONDS
+    router._probed_at = time.monotonic()
+    assert await router.choose("emp-1") is None
+    await missing.dispose()
+    await replica.dispose()
+
+def test_read_routes_use_the_replica(client, admin, employee, replica, settled, monkeypatch):
+    submit(client, employee, [task("2025-03-03", hour=2)])
+    router = ReadRouter([replica])
+    client.portal.call(router.measure)
+    monkeypatch.setattr(read_routing, "read_router", router)
+    other = auth("emp-2")
+    before = db_reads.value("replica")
+    rows = client.get("/api/reports/daily", params={"userId": "emp-1"}, headers=admin).json()
+    assert [r["hours"] for r in rows] == [2.0]
+    assert client.get("/api/tasks/", headers=other).status_code == 200
+    assert db_reads.value("replica") == before + 2
+    # the writer reads their own tasks from the primary
+    client.portal.call(versions.bump, writer_scope("emp-1"))
+    before = db_reads.value("primary_recent_write")
+    assert len(client.get("/api/tasks/", headers=employee).json()["items"]) == 1
+    assert db_reads.value("primary_recent_write") == before + 1
+    client.portal.call(replica.dispose)
+
+async def _call(app, method: str, headers: list) -> list:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": "/", "headers": headers}
+    await app(scope, receive, send)
+    return sent
+
+def _responding(status: int):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("method, status, bumped", [
+    ("POST", 200, True), ("PUT", 201, True), ("POST", 409, False), ("GET", 200, False),
+])
+async def test_middleware_marks_successful_writes(method, status, bumped):
+    scope = writer_scope("mw-user")
+    before = (await versions.get([scope]))[scope][0]
+    token = auth("mw-user")["Authorization"].encode()
+    sent = await _call(ReadYourWritesMiddleware(_responding(status)), method, [(b"authorization", token)])
+    assert sent[0]["status"] == status
+    assert (await versions.get([scope]))[scope][0] == before + bumped
+
+@pytest.mark.anyio
+async def test_middleware_ignores_anonymous_writes():
+    scope = writer_scope("mw-user")
+    before = (await versions.get([scope]))[scope][0]
+    await _call(ReadYourWritesMiddleware(_responding(200)), "POST", [(b"authorization", b"Bearer nonsense")])
+    assert (await versions.get([scope]))[scope][0] == before
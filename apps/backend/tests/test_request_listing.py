@@ -0,0 +1,66 @@
+# backend/tests/test_request_listing.py
+"""The admin inbox: filtered, paginated edit-request listing and the pending count, on both backends"""
+from datetime import date, timedelta
+import pytest
+from tests.conftest import auth, submit, task
+
+@pytest.fixture(params=["sql", "firestore"], autouse=True)
+def backend(request):
+    if request.param == "firestore":
+        request.getfixturevalue("firestore")
+    return request.param
+
+@pytest.fixture
+def requests(client, employee, admin) -> dict:
+    """Three requests from emp-1 and two from emp-2, in submission order; emp-2's first is approved"""
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    made = {}
+    for user, headers in (("emp-1", employee), ("emp-2", auth("emp-2"))):
+        count = 3 if user == "emp-1" else 2
+        tasks = submit(client, headers, [task("2025-03-03", name=f"t{i}") for i in range(count)])["created"]
+        made[user] = [client.post(f"/api/requests/{t['id']}/request_edit", json={"proposedHour": 2},
+                                  headers=headers).json()["request"]["id"] for t in tasks]
+    client.post(f"/api/requests/{made['emp-2'][0]}/approve", headers=admin)
+    return made
+
+def listing(client, admin, **params) -> dict:
+    response = client.get("/api/requests/", params=params, headers=admin)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_pages_newest_first(client, admin, requests):
+    newest_first = list(reversed(requests["emp-1"] + requests["emp-2"]))
+    seen, cursor = [], None
+    while True:
+        page = listing(client, admin, limit=2, **({"cursor": cursor} if cursor else {}))
+        assert len(page["items"]) <= 2
+        seen += [r["id"] for r in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == newest_first
+
+def test_filters_combine(client, admin, requests):
+    pending = listing(client, admin, status="pending")["items"]
+    assert {r["id"] for r in pending} == set(requests["emp-1"] + requests["emp-2"][1:])
+    mine = listing(client, admin, employeeId="emp-2")["items"]
+    assert [r["id"] for r in mine] == list(reversed(requests["emp-2"]))
+    approved = listing(client, admin, status="approved", employeeId="emp-2")["items"]
+    assert [(r["id"], r["status"]) for r in approved] == [(requests["emp-2"][0], "approved")]
+    assert listing(client, admin, status="rejected")["items"] == []
+
+def test_date_range_is_inclusive(client, admin, requests):
+    today = date.today()
+    assert len(listing(client, admin, date_from=today, date_to=today)["items"]) == 5
+    assert listing(client, admin, date_from=today + timedelta(days=1))["items"] == []
+    assert listing(client, admin, date_to=today - timedelta(days=1))["items"] == []
+
+def test_pending_count(client, admin, requests):
+    assert client.get("/api/requests/pending_count", headers=admin).json() == {"pending": 4}
+    assert client.get("/api/requests/pending_count", params={"employeeId": "emp-2"},
+                      headers=admin).json() == {"pending": 1}
+
+def test_bad_cursor_and_non_admins_are_refused(client, admin, employee, requests):
+    assert client.get("/api/requests/", params={"cursor": "missing"}, headers=admin).status_code == 400
+    assert client.get("/api/requests/", headers=employee).status_code == 403
+    assert client.get("/api/requests/pending_count", headers=employee).status_code == 403
@@ -0,0 +1,82 @@
+# backend/tests/test_rollups.py
+"""Hours rollups kept in step with task creates, edits and removals"""
+import pytest
+from app.models.report_model import UserDayHours
+from app.services.report_service import _rollup_statements, _upserts
+from tests.conftest import submit, task
+
+def daily(client, admin) -> dict:
+    """(user, project, day, billing_status) -> (hours, task count) from GET /api/reports/daily"""
+    rows = client.get("/api/reports/daily", headers=admin).json()
+    return {(r["userId"], r["project"], r["day"], r["billing_status"]): (r["hours"], r["taskCount"]) for r in rows}
+
+def projects(client, admin, period="month") -> dict:
+    rows = client.get("/api/reports/projects", params={"period": period}, headers=admin).json()
+    return {(r["project"], r["periodStart"], r["billing_status"]): (r["hours"], r["taskCount"]) for r in rows}
+
+def test_create_adds_hours(client, employee, admin):
+    submit(client, employee, [task("2025-03-03", hour=2), task("2025-03-03", name="other", hour=1.5),
+                              task("2025-03-04", project="Q", hour=3)])
+    assert daily(client, admin) == {
+        ("emp-1", "P", "2025-03-03", "pending"): (3.5, 2),
+        ("emp-1", "Q", "2025-03-04", "pending"): (3.0, 1),
+    }
+    assert projects(client, admin) == {("P", "2025-03-01", "pending"): (3.5, 2), ("Q", "2025-03-01", "pending"): (3.0, 1)}
+    assert projects(client, admin, "week") == {("P", "2025-03-03", "pending"): (3.5, 2),
+                                               ("Q", "2025-03-03", "pending"): (3.0, 1)}
+
+def test_duplicate_update_moves_hours_instead_of_adding(client, employee, admin):
+    submit(client, employee, [task("2025-03-03", hour=2)])
+    body = submit(client, employee, [task("2025-03-03", hour=5, billing_status="billed")], on_duplicate="update")
+    assert body["updated"] == 1
+    assert daily(client, admin) == {("emp-1", "P", "2025-03-03", "billed"): (5.0, 1)}
+    body = submit(client, employee, [task("2025-03-03", hour=9)], on_duplicate="skip")
+    assert body["skipped"] == 1
+    assert daily(client, admin) == {("emp-1", "P", "2025-03-03", "billed"): (5.0, 1)}
+
+def test_approved_edit_moves_hours_between_projects(client, employee, admin):
+    created = submit(client, employee, [task("2025-03-03", hour=2)])["created"][0]
+    response = client.post(f"/api/requests/{created['id']}/request_edit",
+                           json={"proposedHour": 4, "proposedProject": "Q"}, headers=employee)
+    assert response.status_code == 200, response.text
+    # nothing moves until the edit is approved
+    assert daily(client, admin) == {("emp-1", "P", "2025-03-03", "pending"): (2.0, 1)}
+    request_id = response.json()["request"]["id"]
+    assert client.post(f"/api/requests/{request_id}/approve", headers=admin).status_code == 200
+    assert daily(client, admin) == {("emp-1", "Q", "2025-03-03", "pending"): (4.0, 1)}
+    assert projects(client, admin) == {("Q", "2025-03-01", "pending"): (4.0, 1)}
+
+def test_billing_transition_removes_hours_from_the_old_status(client, employee, admin):
+    from app.services.job_service import run_job
+
+    submit(client, employee, [task("2025-03-03", hour=2), task("2025-03-20", name="b", hour=1),
+                              task("2025-03-04", project="Q", hour=7)])
+    job = client.post("/api/jobs/billing_transition", headers=admin, json={
+        "project": "P", "date_from": "2025-03-01", "date_to": "2025-03-31", "to_status": "billed"}).json()
+    client.portal.call(run_job, job["id"])
+    assert client.get(f"/api/jobs/{job['id']}", headers=admin).json()["status"] == "succeeded"
+    assert projects(client, admin) == {("P", "2025-03-01", "billed"): (3.0, 2), ("Q", "2025-03-01", "pending"): (7.0, 1)}
+
+def test_rebuild_matches_the_incremental_rollups(client, employee, admin):
+    created = submit(client, employee, [task(f"2025-03-{d:02d}", project="PQ"[d % 2], hour=d / 2)
+                                        for d in range(1, 15)])["created"]
+    request_id = client.post(f"/api/requests/{created[0]['id']}/request_edit",
+                             json={"proposedHour": 6}, headers=employee).json()["request"]["id"]
+    client.post(f"/api/requests/{request_id}/approve", headers=admin)
+    before = daily(client, admin), projects(client, admin), projects(client, admin, "week")
+    assert client.post("/api/reports/rebuild", headers=admin).status_code == 200
+    assert (daily(client, admin), projects(client, admin), projects(client, admin, "week")) == before
+
+def test_upserts_touch_keys_in_sorted_order():
+    # a removal and an addition in one pass, given out of key order
+    changes = [([task("2025-03-04", project="Q") | {"userId": "b"}], -1),
+               ([task("2025-03-04", project="Q", hour=2) | {"userId": "b"}, task("2025-03-03") | {"userId": "a"}], 1)]
+    day_upsert = _rollup_statements("sqlite", changes)[0].compile().params
+    assert (day_upsert["user_id_m0"], day_upsert["user_id_m1"]) == ("a", "b")
+    assert (day_upsert["hours_m0"], day_upsert["hours_m1"]) == (1.0, 1.0)
+    # a removal and re-add of the same hours cancels out
+    assert not list(_upserts("sqlite", UserDayHours, ["user_id", "day"], {("a", "2025-03-03"): [0.0, 0]}))
+
+def test_unsupported_dialect_is_a_clear_error():
+    with pytest.raises(ValueError, match="PostgreSQL or SQLite"):
+        _rollup_statements("mysql", [([task("2025-03-03") | {"userId": "a"}], 1)])
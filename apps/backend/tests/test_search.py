@@ -0,0 +1,61 @@
+# backend/tests/test_search.py
+"""Admin task search: text matching, filters, paging and facet counts"""
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.models.task_model import Task
+from app.services.search_service import text_match
+from tests.conftest import auth, submit, task
+
+def search(client, admin, **params) -> dict:
+    response = client.get("/api/tasks/search", params=params, headers=admin)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def seed(client, admin, employee):
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    submit(client, employee, [task("2025-03-03", project="Falcon", name="Database migration"),
+                              task("2025-03-10", project="Falcon", name="Migration review"),
+                              task("2025-04-01", project="Falcon", name="Standup")])
+    submit(client, auth("emp-2"), [task("2025-04-02", project="Heron", name="migration scripts"),
+                                   task("2025-04-03", project="Migrations", name="Planning")])
+
+def names(result) -> list:
+    return [t["taskName"] for t in result["items"]]
+
+def test_text_matches_name_or_project_newest_first(client, admin, employee):
+    seed(client, admin, employee)
+    result = search(client, admin, q="migration")
+    assert names(result) == ["Planning", "migration scripts", "Migration review", "Database migration"]
+    assert result["total"] == 4
+    assert names(search(client, admin, q="migration -review")) == \
+        ["Planning", "migration scripts", "Database migration"]
+    assert search(client, admin, q="100%")["items"] == []
+
+def test_filters_narrow_the_matches(client, admin, employee):
+    seed(client, admin, employee)
+    assert names(search(client, admin, q="migration", project="Falcon", date_from="2025-03-05")) == \
+        ["Migration review"]
+    assert names(search(client, admin, q="migration", userId="emp-2")) == ["Planning", "migration scripts"]
+
+def test_facets_count_every_match_across_pages(client, admin, employee):
+    seed(client, admin, employee)
+    first = search(client, admin, q="migration", limit=3)
+    second = search(client, admin, q="migration", limit=3, cursor=first["next_cursor"])
+    assert names(first) + names(second) == names(search(client, admin, q="migration"))
+    assert second["next_cursor"] is None
+    assert first["facets"] == second["facets"] == {
+        "project": [{"value": "Falcon", "count": 2}, {"value": "Heron", "count": 1},
+                    {"value": "Migrations", "count": 1}],
+        "user": [{"value": "emp-1", "count": 2}, {"value": "emp-2", "count": 2}],
+        "month": [{"value": "2025-03", "count": 2}, {"value": "2025-04", "count": 2}],
+    }
+    assert search(client, admin, q="migration", facets=False)["facets"] == {}
+
+def test_search_is_admin_only_and_sql_only(client, admin, employee, firestore):
+    assert client.get("/api/tasks/search", params={"q": "x"}, headers=employee).status_code == 403
+    assert client.get("/api/tasks/search", params={"q": "x"}, headers=admin).status_code == 409
+
+def test_postgresql_uses_the_full_text_index():
+    stmt = select(Task.id).where(*text_match('"data migration" -draft', "postgresql"))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "websearch_to_tsquery" in sql and "@@" in sql
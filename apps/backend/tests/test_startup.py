@@ -0,0 +1,54 @@
+# backend/tests/test_startup.py
+"""Cold start: nothing slow or external at import, no schema work on boot, and the startup report"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from benchmarks.bench_startup import DEFERRED
+
+BACKEND = Path(__file__).parent.parent
+
+# run in a fresh interpreter, since this test session has imported everything already
+BOOT = """
+import json, os, sys
+import app.main
+from app.core import firestore_client
+report = {
+    "modules": sorted(sys.modules),
+    "db_after_import": os.path.exists(os.environ["DB_PATH"]),
+    "firestore_client": firestore_client._client is not None,
+}
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+with TestClient(app.main.app) as client:
+    report["home"] = client.get("/").status_code
+report["tables"] = inspect(create_engine("sqlite:///" + os.environ["DB_PATH"])).get_table_names()
+print(json.dumps(report))
+"""
+
+def boot(tmp_path, **env) -> dict:
+    db_path = str(tmp_path / "boot.db")
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "ASYNC_DATABASE_URL": "", "DB_PATH": db_path,
+           "STORAGE_BACKEND": "firestore", "CACHE_BACKEND": "memory", "JOB_WORKERS": "0",
+           "DB_AUTO_CREATE": "false", "STARTUP_WARMUP": "false", **env}
+    proc = subprocess.run([sys.executable, "-c", BOOT], cwd=BACKEND, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def test_import_defers_sdks_and_connections(tmp_path):
+    report = boot(tmp_path)
+    eager = {d for d in DEFERRED for m in report["modules"] if m == d or m.startswith(d + ".")}
+    assert eager == set()
+    # no database connection and no Firestore client until something needs them
+    assert not report["db_after_import"] and not report["firestore_client"]
+    assert report["home"] == 200
+    assert report["tables"] == []
+
+def test_auto_create_builds_the_schema_on_boot(tmp_path):
+    assert "tasks" in boot(tmp_path, DB_AUTO_CREATE="true")["tables"]
+
+def test_startup_report(client, admin, employee):
+    report = client.get("/api/health/startup", headers=admin).json()
+    assert "imports" in report["phases_ms"] and report["ready_ms"] is not None
+    assert client.get("/api/health/startup", headers=employee).status_code == 403
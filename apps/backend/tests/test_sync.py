@@ -0,0 +1,78 @@
+# backend/tests/test_sync.py
+"""Delta sync (GET /api/tasks/changes): cursors, settling, paging and expiry"""
+from sqlalchemy import delete, func, select
+from app.core.config import settings
+from app.core.database import engine
+from app.models.change_model import TaskChange
+from tests.conftest import auth, submit, task
+
+def changes(client, headers, since=None, **params):
+    params = {**params, **({"since": since} if since is not None else {})}
+    response = client.get("/api/tasks/changes", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_unsettled_changes_are_sent_again(client, employee):
+    start = changes(client, employee)["cursor"]
+    created = submit(client, employee, [task("2025-03-03")])["created"]
+    # younger than SYNC_SETTLE_SECONDS: delivered, but the cursor does not pass them
+    body = changes(client, employee, start)
+    assert [t["id"] for t in body["changed"]] == [created[0]["id"]]
+    assert body["cursor"] == start and not body["has_more"]
+    assert changes(client, employee, body["cursor"])["changed"] == body["changed"]
+
+def test_settled_changes_advance_the_cursor(client, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    start = changes(client, employee)["cursor"]
+    submit(client, employee, [task("2025-03-03")])
+    body = changes(client, employee, start)
+    assert len(body["changed"]) == 1 and body["cursor"] > start
+    caught_up = changes(client, employee, body["cursor"])
+    assert caught_up["changed"] == [] and caught_up["cursor"] == body["cursor"]
+
+def test_other_users_changes_skip_the_cursor_ahead(client, admin, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    client.post("/api/users/", json={"userId": "emp-2", "firstName": "Emp", "lastName": "Two"}, headers=admin)
+    start = changes(client, employee)["cursor"]
+    submit(client, auth("emp-2"), [task("2025-03-03")])
+    body = changes(client, employee, start)
+    assert body["changed"] == [] and body["cursor"] > start
+
+def test_pages_follow_has_more(client, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    start = changes(client, employee)["cursor"]
+    submit(client, employee, [task("2025-03-03", name=f"t{i}") for i in range(5)])
+    seen, cursor = [], start
+    for expected_more in (True, True, False):
+        body = changes(client, employee, cursor, limit=2)
+        assert body["has_more"] is expected_more
+        seen += [t["taskName"] for t in body["changed"]]
+        cursor = body["cursor"]
+    assert sorted(seen) == [f"t{i}" for i in range(5)]
+
+def test_edits_come_back_as_current_state(client, admin, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    created = submit(client, employee, [task("2025-03-03", hour=1)])["created"][0]
+    cursor = changes(client, employee)["cursor"]
+    request_id = client.post(f"/api/requests/{created['id']}/request_edit", json={"proposedHour": 3},
+                             headers=employee).json()["request"]["id"]
+    client.post(f"/api/requests/{request_id}/approve", headers=admin)
+    body = changes(client, employee, cursor)
+    assert [(t["id"], t["hour"]) for t in body["changed"]] == [(created["id"], 3.0)]
+
+def test_swept_cursor_is_410(client, employee, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    start = changes(client, employee)["cursor"]
+    for d in range(1, 4):
+        submit(client, employee, [task(f"2025-03-0{d}")])
+    with engine.begin() as conn:
+        newest = conn.execute(select(func.max(TaskChange.seq))).scalar()
+        conn.execute(delete(TaskChange).where(TaskChange.seq < newest))
+    response = client.get("/api/tasks/changes", params={"since": start}, headers=employee)
+    assert response.status_code == 410
+    # a cursor the retained log still covers is fine
+    assert changes(client, employee, newest - 1)["changed"][0]["date"].startswith("2025-03-03")
+
+def test_other_users_changes_are_admin_only(client, employee):
+    response = client.get("/api/tasks/changes", params={"userId": "someone", "since": 0}, headers=employee)
+    assert response.status_code == 403
@@ -0,0 +1,49 @@
+# backend/tests/test_tasks.py
+"""Keyset pagination of GET /api/tasks"""
+from tests.conftest import submit, task
+
+def pages(client, headers, **params):
+    """Every page of GET /api/tasks, following next_cursor"""
+    out, cursor = [], None
+    while True:
+        body = client.get("/api/tasks/", params={**params, **({"cursor": cursor} if cursor else {})},
+                          headers=headers).json()
+        out.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return out
+
+def test_pages_cover_every_task_once(client, employee):
+    submit(client, employee, [task(f"2025-03-{d:02d}", name=f"t{d}-{k}") for d in range(1, 11) for k in range(3)])
+    got = pages(client, employee, limit=7)
+    assert [len(p) for p in got] == [7, 7, 7, 7, 2]
+    ids = [t["id"] for p in got for t in p]
+    assert len(ids) == len(set(ids)) == 30
+
+def test_cursor_is_stable_under_inserts_before_it(client, employee):
+    submit(client, employee, [task(f"2025-03-{d:02d}", name=f"t{d}") for d in range(10, 20)])
+    first = client.get("/api/tasks/", params={"limit": 4}, headers=employee).json()
+    # rows landing on the already-read side of the cursor must not shift the next page
+    submit(client, employee, [task("2025-03-25", name="late"), task("2025-03-01", name="early")])
+    rest = pages(client, employee, limit=4, cursor=first["next_cursor"])
+    seen = [t["id"] for t in first["items"]] + [t["id"] for p in rest for t in p]
+    assert len(seen) == len(set(seen))
+    names = {t["taskName"] for p in rest for t in p}
+    assert not names & {t["taskName"] for t in first["items"]}
+
+def test_filters_apply_on_every_page(client, employee):
+    submit(client, employee, [task(f"2025-04-{d:02d}", project="A" if d % 2 else "B", name=f"t{d}")
+                              for d in range(1, 21)])
+    got = pages(client, employee, limit=3, project="A", date_from="2025-04-05", date_to="2025-04-15")
+    items = [t for p in got for t in p]
+    assert {t["project"] for t in items} == {"A"}
+    assert sorted(t["date"][:10] for t in items) == [f"2025-04-{d:02d}" for d in (5, 7, 9, 11, 13, 15)]
+
+def test_bad_cursor_is_400(client, employee):
+    assert client.get("/api/tasks/", params={"cursor": "not-a-cursor"}, headers=employee).status_code == 400
+
+def test_other_users_tasks_are_admin_only(client, employee, admin):
+    submit(client, employee, [task("2025-03-01")])
+    assert client.get("/api/tasks/", params={"userId": "someone"}, headers=employee).status_code == 403
+    body = client.get("/api/tasks/", params={"userId": "emp-1"}, headers=admin).json()
+    assert len(body["items"]) == 1
@@ -0,0 +1,55 @@
+# backend/tests/test_user_cache.py
+"""Read-through user cache: profile and list reads, invalidation on writes, and the TTL/LRU primitive"""
+import time
+from sqlalchemy import text
+from app.core.cache import TTLCache
+from app.core.database import engine
+from app.crud.user_crud import user_cache
+
+def create(client, admin, user_id: str):
+    response = client.post("/api/users/", json={"userId": user_id, "firstName": "First", "lastName": user_id},
+                           headers=admin)
+    assert response.status_code == 200, response.text
+
+def rename_behind_the_cache(user_id: str, last_name: str):
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE users SET last_name = :name WHERE id = :id"), {"name": last_name, "id": user_id})
+
+def test_profile_reads_are_served_from_the_cache(client, admin):
+    create(client, admin, "u1")
+    assert client.get("/api/users/u1", headers=admin).json()["name"] == "First u1"
+    rename_behind_the_cache("u1", "Renamed")
+    hits = user_cache.stats()["hits"]
+    # the database is not read again until the entry is invalidated or expires
+    assert client.get("/api/users/u1", headers=admin).json()["name"] == "First u1"
+    assert user_cache.stats()["hits"] == hits + 1
+    user_cache.invalidate("u1")
+    assert client.get("/api/users/u1", headers=admin).json()["name"] == "First Renamed"
+
+def test_creating_a_user_invalidates_the_list(client, admin):
+    create(client, admin, "u1")
+    assert [u["id"] for u in client.get("/api/users/", headers=admin).json()] == ["u1"]
+    create(client, admin, "u2")
+    assert sorted(u["id"] for u in client.get("/api/users/", headers=admin).json()) == ["u1", "u2"]
+
+def test_missing_users_are_not_cached(client, admin):
+    assert client.get("/api/users/u1", headers=admin).status_code == 404
+    create(client, admin, "u1")
+    assert client.get("/api/users/u1", headers=admin).status_code == 200
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_cache_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    cache.set("never", 3, ttl=0)
+    time.sleep(0.06)
+    assert (cache.get("a"), cache.get("b"), cache.get("never")) == (None, 2, None)